@@ -0,0 +1,93 @@
+import unittest
+import tempfile
+import sys, os
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("services/audio_cache_service.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from services.audio_cache_service import AudioCache
+from services.synthesis_service import SynthesisService
+from services.text_to_speech_service import TTSBackend
+from classes.AudioClip import AudioClip
+
+class ToneBackend(TTSBackend):
+    NAME = 'tone'
+
+    def __init__(self):
+        super().__init__()
+        self.spoken = []
+
+    def _load(self):
+        pass
+
+    def synthesize(self, text, speaker_wav=None, language=None):
+        self.spoken.append(text)
+        return AudioClip(text.encode('utf-8') * 100, 16000)
+
+class TestAudioCache(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = ToneBackend()
+        self.tts = SynthesisService(self.backend)
+        self.addCleanup(self.tts.close)
+
+    def create_cache(self, **options):
+        cache = AudioCache(self.tts, **options)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_renders_once_and_then_hits(self):
+        cache = self.create_cache()
+        self.assertEqual(cache.get('hola').data, b'hola' * 100)
+        cache.get('hola')
+        self.assertEqual(self.backend.spoken, ['hola'])
+        statistics = cache.get_statistics()
+        self.assertEqual((statistics['hits'], statistics['misses'], statistics['entries']), (1, 1, 1))
+
+    def test_evicts_least_recently_used_beyond_size(self):
+        cache = self.create_cache(max_bytes=500)
+        cache.get('aa')
+        cache.get('bb')
+        cache.get('aa')
+        cache.get('cc')  # 600 bytes are over the bound, 'bb' is the least recently used
+        self.assertEqual(cache.get_statistics()['entries'], 2)
+        cache.get('aa')
+        cache.get('bb')
+        self.assertEqual(self.backend.spoken, ['aa', 'bb', 'cc', 'bb'])
+
+    def test_prerendered_clips_are_persisted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = AudioCache(self.tts, directory=directory)
+            cache.prerender(['hola', 'adios'])
+            cache.get('adios')
+            cache.get('hola')
+            cache.close()
+
+            cache = AudioCache(self.tts, directory=directory)
+            self.assertEqual(cache.get('hola').data, b'hola' * 100)
+            cache.close()
+            self.assertEqual(sorted(self.backend.spoken), ['adios', 'hola'])
+            self.assertEqual(cache.get_statistics()['loaded'], 1)
+
+    def test_storing_a_cached_clip_again_does_not_count_it_twice(self):
+        cache = self.create_cache(max_bytes=1000)
+        clip = AudioClip(bytes(400), 16000)
+        key = cache.get_key('hola')
+        cache._AudioCache__store(key, clip)
+        cache._AudioCache__store(key, clip)
+        self.assertEqual((cache.get_statistics()['entries'], cache.get_statistics()['bytes']), (1, 400))
+        cache._AudioCache__store(cache.get_key('adios'), clip)
+        self.assertEqual(cache.get_statistics()['evicted'], 0)
+
+    def test_phrases_are_joined_from_word_clips_or_synthesized_whole(self):
+        cache = self.create_cache()
+        joined = cache.get_phrase(('hola', 'amigo'), gap=0.001)
+        self.assertEqual(joined.data, b'hola' * 100 + bytes(32) + b'amigo' * 100)
+        self.assertEqual(cache.get_phrase(('hola', 'amigo'), join=False).data, b'hola amigo' * 100)
+        self.assertEqual(self.backend.spoken, ['hola', 'amigo', 'hola amigo'])
+        self.assertEqual(cache.get_statistics()['entries'], 2)  # The synthesized phrase is not cached
+
+if __name__ == '__main__':
+    unittest.main()
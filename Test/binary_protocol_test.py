@@ -0,0 +1,63 @@
+import unittest
+import threading
+import time
+import sys, os
+import numpy as np
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("controllers/binary_protocol.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from controllers.binary_protocol import encode_frame, FrameStreamSplitter, BinaryFrameDecoder, FRAME_SIZE
+from controllers.frame_parser import FRAME_WIDTH
+from controllers.glove_simulator import GloveSimulator
+from controllers.bno055_controller import SerialPortReader
+from controllers.frame_handoff import FrameHandoff
+
+FRAME = np.array([344.5, -10.25, 70.0, 0.125, -0.5, 1.25, 0.0, -0.125, 9.75, 891, 893, 890, 893, 159, 3, 2, 1, 0])
+TEXT_LINE = b'344.44,-10.88,70.25*0.12,-0.50,1.25*0.03,-0.11,9.70*891,893,890,893,159*3,2,1,0\r\n'
+
+class TestBinaryProtocol(unittest.TestCase):
+
+    def test_frames_round_trip_and_gaps_are_counted(self):
+        decoder = BinaryFrameDecoder()
+        row = np.zeros(FRAME_WIDTH)
+        for sequence in (65534, 65535, 0, 3):
+            self.assertTrue(decoder.decode_into(encode_frame(FRAME, sequence, 1000 + sequence), row))
+        np.testing.assert_array_equal(row, FRAME)
+        self.assertEqual(decoder.lost, 2)
+        self.assertEqual(decoder.device_time, 1003)
+
+    def test_splitter_separates_text_and_binary_and_drops_corrupted_frames(self):
+        first, second = encode_frame(FRAME, 1, 10), encode_frame(FRAME, 2, 20)
+        corrupted = first[:10] + bytes([first[10] ^ 0xFF]) + first[11:]
+        stream = TEXT_LINE + TEXT_LINE[:20] + first + corrupted + second
+        splitter = FrameStreamSplitter()
+        pieces = [piece for i in range(0, len(stream), 7) for piece in splitter.feed(stream[i:i + 7])]
+        self.assertEqual(pieces, [TEXT_LINE, first, second])
+        self.assertEqual(splitter.crc_errors, 1)
+        self.assertEqual(splitter.skipped_bytes, 20 + FRAME_SIZE)
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'pseudo-terminals are simulated on Linux')
+    def test_reader_switches_simulated_gloves_to_binary(self):
+        simulator = GloveSimulator(rate=200, seed=0)
+        left, right = simulator.open()
+        simulator.start()
+        self.addCleanup(simulator.stop)
+        stop_event = threading.Event()
+        reader = SerialPortReader(left, right, FrameHandoff(), stop_event, startup_delay=0, binary=True)
+        thread = threading.Thread(target=reader.start)
+        thread.start()
+        time.sleep(0.5)
+        stop_event.set()
+        thread.join()
+
+        statistics = reader.get_statistics()
+        self.assertGreater(statistics['paired'], 20)
+        self.assertEqual(statistics['crc_errors'], {'left': 0, 'right': 0})
+        self.assertEqual(statistics['lost'], {'left': 0, 'right': 0})
+        self.assertLessEqual(sum(statistics['invalid'].values()), 2)  # Text lines cut by the switch to binary
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import sys, os
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("services/calibration_service.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from services.calibration_service import BNO055Calibrator, CalibrationMonitor
+
+CALIBRATED = [3, 3, 3, 3]
+LOST = [1, 3, 3, 0]
+
+class TestBNO055Calibrator(unittest.TestCase):
+
+    def setUp(self):
+        self.events = []
+        self.calibrator = BNO055Calibrator(self.events.append)
+
+    def kinds(self, hand):
+        return [(event.kind, event.stage) for event in self.events if event.hand == hand]
+
+    def test_sensors_are_calibrated_in_parallel_through_the_stages(self):
+        self.calibrator.start()
+        self.assertFalse(self.calibrator.update([0, 1, 0, 0], [3, 3, 1, 0]))
+        self.assertEqual(self.calibrator.get_stages(), {'left': 'gyroscope', 'right': 'magnetometer'})
+        self.assertFalse(self.calibrator.update([0, 3, 3, 1], CALIBRATED))
+        self.assertEqual(self.calibrator.get_stages(), {'left': 'accelerometer'})
+        self.assertTrue(self.calibrator.is_calibrating)
+        self.assertTrue(self.calibrator.update(CALIBRATED, CALIBRATED))
+        self.assertFalse(self.calibrator.is_calibrating)
+
+        self.assertEqual(self.kinds('left'), [('started', 'gyroscope'), ('progress', 'gyroscope'), ('progress', 'gyroscope'),
+                                              ('stage', 'accelerometer'), ('progress', 'accelerometer'), ('calibrated', None)])
+        self.assertEqual(self.kinds('right'), [('started', 'gyroscope'), ('progress', 'gyroscope'), ('stage', 'magnetometer'),
+                                               ('progress', 'magnetometer'), ('calibrated', None)])
+        self.assertEqual(self.events[-1].kind, 'finished')
+
+    def test_unchanged_values_report_no_progress(self):
+        self.calibrator.start(['left'])
+        for _ in range(3):
+            self.calibrator.update([1, 1, 1, 1], [0, 0, 0, 0])
+        self.assertEqual([event.kind for event in self.events], ['started', 'progress'])
+        self.assertEqual(self.calibrator.get_stages(), {'left': 'gyroscope'})
+
+    def test_calibration_recovered_on_its_own_stops_the_sensor(self):
+        self.calibrator.start()
+        self.calibrator.stop(['right'])
+        self.calibrator.stop(['left'])
+        self.assertFalse(self.calibrator.is_calibrating)
+        self.assertEqual(self.events[-1].kind, 'finished')
+
+    def test_a_new_loss_after_calibration_starts_over(self):
+        # Lost, calibrated, flickering between 2 and 3 without ever holding 3, then lost completely
+        phases = ((1.5, LOST), (0.5, CALIBRATED), (10.0, None), (10.0, [0, 0, 0, 0]))
+        now = 0.0
+        for duration, calibration in phases:
+            for i in range(int(duration * 10)):
+                left = calibration if calibration is not None else ([2, 3, 3, 3] if i % 2 else CALIBRATED)
+                self.calibrator.observe(left, CALIBRATED, now)
+                now += 0.1
+        self.assertEqual(len([event for event in self.events if event.kind == 'started']), 2)
+        self.assertEqual(self.calibrator.monitor.episodes, 2)
+        self.assertTrue(self.calibrator.is_calibrating)
+
+class TestCalibrationMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.monitor = CalibrationMonitor(enter_after=1.0, exit_after=0.5, enter_ratio=0.8)
+
+    def feed(self, start, end, left, right=CALIBRATED, rate=10):
+        changes = []
+        for i in range(int((end - start) * rate)):
+            entered, recovered = self.monitor.update(left, right, start + i / rate)
+            changes += [('entered', hand) for hand in entered] + [('recovered', hand) for hand in recovered]
+        return changes
+
+    def test_flickering_status_is_not_a_loss(self):
+        for second in range(5):
+            self.assertEqual(self.feed(second, second + 0.7, CALIBRATED), [])
+            self.assertEqual(self.feed(second + 0.7, second + 1.0, LOST), [])
+        self.assertEqual(self.monitor.episodes, 0)
+
+    def test_sustained_loss_enters_and_recovery_exits_with_hysteresis(self):
+        self.assertEqual(self.feed(0.0, 1.2, CALIBRATED, LOST), [('entered', 'right')])
+        self.assertEqual(self.monitor.needed_hands, ['right'])
+        self.assertEqual(self.feed(1.2, 3.0, CALIBRATED, [2, 3, 3, 0]), [])  # Not low anymore, but not recovered either
+        self.assertEqual(self.feed(3.0, 3.7, CALIBRATED, CALIBRATED), [('recovered', 'right')])
+        self.assertEqual(self.monitor.needed_hands, [])
+
+    def test_exit_thresholds_must_not_be_below_enter_thresholds(self):
+        with self.assertRaises(ValueError):
+            CalibrationMonitor(enter_below=(2, 2, 2, 2), exit_at=(3, 3, 3, 1))
+
+if __name__ == '__main__':
+    unittest.main()
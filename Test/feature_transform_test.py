@@ -0,0 +1,80 @@
+import unittest
+import tempfile
+import sys, os
+import numpy as np
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("classes/FeatureTransform.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from classes.FeatureTransform import FeatureTransform, HAND_FEATURES
+from repositories.gesture_index import GestureIndex, GestureTree
+
+def hand(roll, pitch, yaw, flex=500.0):
+    return np.array([roll, pitch, yaw, flex, flex, flex, flex, flex, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+
+class TestFeatureTransform(unittest.TestCase):
+
+    def test_default_transform_is_identity(self):
+        points = np.random.default_rng(0).uniform(-100, 900, (5, 2 * HAND_FEATURES))
+        np.testing.assert_array_equal(FeatureTransform().transform(points), points)
+
+    def test_sincos_brings_angles_across_zero_together(self):
+        transform = FeatureTransform('sincos')
+        near_zero = transform.transform(hand(359.0, 0.0, 0.0))
+        just_past_zero = transform.transform(hand(1.0, 0.0, 0.0))
+        half_turn = transform.transform(hand(180.0, 0.0, 0.0))
+        self.assertLess(np.linalg.norm(near_zero - just_past_zero), 0.05)
+        self.assertGreater(np.linalg.norm(near_zero - half_turn), 1.9)
+
+    def test_quaternion_is_unit_with_non_negative_scalar_part(self):
+        transform = FeatureTransform('quaternion')
+        points = np.stack([hand(roll, pitch, yaw) for roll, pitch, yaw in np.random.default_rng(1).uniform(0, 360, (20, 3))])
+        quaternions = transform.transform(points)[:, :4]
+        np.testing.assert_allclose(np.linalg.norm(quaternions, axis=1), 1.0)
+        self.assertTrue(np.all(quaternions[:, 0] >= 0.0))
+        np.testing.assert_allclose(transform.transform(hand(360.0, 0.0, 0.0)), transform.transform(hand(0.0, 0.0, 0.0)), atol=1e-12)
+
+    def test_transforms_each_hand_of_a_two_hand_vector(self):
+        transform = FeatureTransform.normalized()
+        both = np.concatenate((hand(10.0, 20.0, 30.0), hand(40.0, 50.0, 60.0)))
+        transformed = transform.transform(both)
+        self.assertEqual(transformed.shape, (2 * transform.hand_size,))
+        np.testing.assert_allclose(transformed[transform.hand_size:], transform.transform(hand(40.0, 50.0, 60.0)))
+
+    def test_unknown_orientation_is_rejected(self):
+        with self.assertRaises(ValueError):
+            FeatureTransform('matrix')
+
+class TestGestureTree(unittest.TestCase):
+
+    def test_missing_values_and_empty_trees_give_no_match(self):
+        tree = GestureTree(np.array(['A', 'B']), np.stack([hand(0, 0, 0), hand(90, 0, 0)]), FeatureTransform.normalized())
+        distances, indexes = tree.query(np.stack([hand(89, 0, 0), np.full(HAND_FEATURES, np.nan)]))
+        self.assertEqual(indexes[0], 1)
+        self.assertEqual(indexes[1], -1)
+        self.assertEqual(distances[1], np.inf)
+
+        empty = GestureTree(np.array([], dtype=str), np.empty((0, HAND_FEATURES)), FeatureTransform())
+        self.assertEqual(empty.query(hand(0, 0, 0)), (np.inf, -1))
+
+    def test_cached_index_rebuilds_its_trees_from_memory_mapped_arrays(self):
+        transform = FeatureTransform.normalized()
+        single = GestureTree(np.array(['A', 'B']), np.stack([hand(0, 0, 0), hand(90, 0, 0)]), transform)
+        both = GestureTree(np.array([], dtype=str), np.empty((0, 2 * HAND_FEATURES)), transform)
+        key = {'sha256': 'abc'}
+        with tempfile.TemporaryDirectory() as directory:
+            GestureIndex(single, both, transform).save(directory, key)
+            self.assertFalse(any(name.endswith('.pkl') for name in os.listdir(directory)))
+            index = GestureIndex.load(directory, key, transform)
+            self.assertIsInstance(index.single.transformed, np.memmap)
+            self.assertEqual(index.single.query(hand(89, 0, 0))[1], 1)
+
+            with open(os.path.join(directory, 'single_transformed.npy'), 'wb') as file:
+                file.write(b'not an array')
+            self.assertIsNone(GestureIndex.load(directory, key, transform))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import threading
+import time
+import sys, os
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("controllers/frame_handoff.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from controllers.frame_handoff import FrameHandoff
+
+class TestFrameHandoff(unittest.TestCase):
+
+    def test_latest_keeps_the_most_recent_pair(self):
+        handoff = FrameHandoff('latest')
+        now = time.monotonic()
+        for i in range(5):
+            self.assertTrue(handoff.put(i, now))
+        self.assertEqual(handoff.get(0), 4)
+        self.assertIsNone(handoff.get(0))
+        statistics = handoff.get_statistics()
+        self.assertEqual((statistics['offered'], statistics['delivered'], statistics['dropped']), (5, 1, 4))
+
+    def test_fifo_drops_the_oldest_pair_when_full(self):
+        handoff = FrameHandoff('fifo', capacity=3)
+        now = time.monotonic()
+        for i in range(5):
+            handoff.put(i, now)
+        self.assertEqual([handoff.get(0) for _ in range(3)], [2, 3, 4])
+        self.assertEqual(handoff.get_statistics()['dropped'], 2)
+
+    def test_decimate_limits_the_rate(self):
+        handoff = FrameHandoff('decimate', rate=0.5)
+        accepted = [i for i in range(40) if handoff.put(i, i * 0.25)]  # Ten seconds of pairs at 4 Hz
+        self.assertEqual(accepted, [0, 8, 16, 24, 32])
+        self.assertEqual(handoff.get_statistics()['decimated'], 35)
+        with self.assertRaises(ValueError):
+            FrameHandoff('decimate')
+
+    def test_stale_pairs_are_skipped(self):
+        handoff = FrameHandoff('fifo', max_age=0.5)
+        now = time.monotonic()
+        handoff.put('old', now - 1.0)
+        handoff.put('new', now)
+        self.assertEqual(handoff.get(0), 'new')
+        self.assertEqual(handoff.get_statistics()['stale'], 1)
+
+    def test_close_wakes_a_waiting_get(self):
+        handoff = FrameHandoff()
+        threading.Timer(0.05, handoff.close).start()
+        start = time.monotonic()
+        self.assertIsNone(handoff.get(5.0))
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertFalse(handoff.put('late', time.monotonic()))
+
+    def test_lossless_waits_for_room_instead_of_dropping(self):
+        handoff = FrameHandoff('lossless', capacity=2)
+        now = time.monotonic()
+        reader = threading.Thread(target=lambda: [handoff.put(i, now) for i in range(10)])
+        reader.start()
+        time.sleep(0.05)
+        self.assertTrue(reader.is_alive())  # Waiting for the main loop to take a pair
+        self.assertEqual([handoff.get(1.0) for _ in range(10)], list(range(10)))
+        reader.join(1.0)
+        statistics = handoff.get_statistics()
+        self.assertEqual((statistics['offered'], statistics['delivered'], statistics['dropped']), (10, 10, 0))
+
+    def test_close_wakes_a_reader_waiting_for_room(self):
+        handoff = FrameHandoff('lossless', capacity=1)
+        handoff.put('waiting', time.monotonic())
+        threading.Timer(0.05, handoff.close).start()
+        self.assertFalse(handoff.put('blocked', time.monotonic()))
+
+if __name__ == '__main__':
+    unittest.main()
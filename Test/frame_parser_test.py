@@ -0,0 +1,47 @@
+import unittest
+import sys, os
+import numpy as np
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("controllers/frame_parser.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from controllers.frame_parser import FrameParser, FRAME_WIDTH, EULER, GYRO, ACCEL, FLEX, CALIBRATION
+
+class TestFrameParser(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = FrameParser()
+        self.row = np.zeros(FRAME_WIDTH)
+
+    def test_parses_firmware_line(self):
+        line = b'344.44,-10.88,70.25*0.12,-0.50,1.25*0.03,-0.11,9.70*891,893,890,893,159*3,2,1,0\r\n'
+        self.assertTrue(self.parser.parse_into(line, self.row))
+        np.testing.assert_allclose(self.row[EULER], [344.44, -10.88, 70.25])
+        np.testing.assert_allclose(self.row[GYRO], [0.12, -0.50, 1.25])
+        np.testing.assert_allclose(self.row[ACCEL], [0.03, -0.11, 9.70])
+        np.testing.assert_array_equal(self.row[FLEX], [891, 893, 890, 893, 159])
+        np.testing.assert_array_equal(self.row[CALIBRATION], [3, 2, 1, 0])
+
+    def test_rejects_wrong_segment_count(self):
+        self.assertFalse(self.parser.parse_into(b'1,2,3*1,2,3*1,2,3*1,2,3,4,5\r\n', self.row))
+        self.assertFalse(self.parser.parse_into(b'1,2,3*1,2,3*1,2,3*1,2,3,4,5*1,2,3,4*\r\n', self.row))
+
+    def test_rejects_wrong_segment_length(self):
+        self.assertFalse(self.parser.parse_into(b'1,2*1,2,3*1,2,3*1,2,3,4,5*1,2,3,4,5\r\n', self.row))
+        self.assertFalse(self.parser.parse_into(b'1,2,3*1,2,3*1,2,3*1,2,3,4*1,2,3,4,5\r\n', self.row))
+
+    def test_rejects_non_numeric_and_empty_values(self):
+        self.assertFalse(self.parser.parse_into(b'1,x,3*1,2,3*1,2,3*1,2,3,4,5*1,2,3,4\r\n', self.row))
+        self.assertFalse(self.parser.parse_into(b'1,,3*1,2,3*1,2,3*1,2,3,4,5*1,2,3,4\r\n', self.row))
+        self.assertFalse(self.parser.parse_into(b'No BNO055 detected ... Check your wiring or I2C ADDR!', self.row))
+
+    def test_parse_returns_new_row(self):
+        row = self.parser.parse(b'1,2,3*4,5,6*7,8,9*10,11,12,13,14*3,3,3,3')
+        np.testing.assert_array_equal(row, np.arange(1, 15).tolist() + [3, 3, 3, 3])
+        self.assertIsNone(self.parser.parse(b''))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import sys, os
+import numpy as np
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("classes/FrameRingBuffer.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from classes.FrameRingBuffer import FrameRingBuffer
+
+class TestFrameRingBuffer(unittest.TestCase):
+
+    def write(self, buffer, value, timestamp):
+        buffer.next_slot()[:] = value
+        buffer.commit(timestamp)
+
+    def test_empty_buffer(self):
+        buffer = FrameRingBuffer(capacity=4, width=2)
+        frames, timestamps = buffer.latest(3)
+        self.assertEqual(frames.shape, (0, 2))
+        self.assertEqual(len(timestamps), 0)
+        self.assertIsNone(buffer.last())
+
+    def test_latest_window_is_ordered_oldest_first_across_wraparound(self):
+        buffer = FrameRingBuffer(capacity=4, width=2)
+        for value in range(11):
+            self.write(buffer, value, value / 10)
+        frames, timestamps = buffer.latest(4)
+        np.testing.assert_array_equal(frames[:, 0], [7, 8, 9, 10])
+        np.testing.assert_allclose(timestamps, [0.7, 0.8, 0.9, 1.0])
+        self.assertEqual(buffer.last()[0], 10)
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(buffer.count, 11)
+
+    def test_window_is_a_read_only_view(self):
+        buffer = FrameRingBuffer(capacity=4, width=2)
+        for value in range(3):
+            self.write(buffer, value, value)
+        frames, _ = buffer.latest(2)
+        self.assertFalse(frames.flags.owndata)
+        with self.assertRaises(ValueError):
+            frames[0, 0] = 42
+
+    def test_uncommitted_slot_is_not_visible(self):
+        buffer = FrameRingBuffer(capacity=3, width=1)
+        for value in range(5):
+            self.write(buffer, value, value)
+        buffer.next_slot()[:] = -1
+        frames, _ = buffer.latest(3)
+        np.testing.assert_array_equal(frames[:, 0], [2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
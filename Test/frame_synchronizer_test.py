@@ -0,0 +1,48 @@
+import unittest
+import sys, os
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("controllers/frame_synchronizer.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from controllers.frame_synchronizer import FrameSynchronizer
+
+class TestFrameSynchronizer(unittest.TestCase):
+
+    def test_pairs_frames_within_skew(self):
+        synchronizer = FrameSynchronizer(max_skew=0.05)
+        self.assertIsNone(synchronizer.push('left', 1.00, 'L1'))
+        self.assertEqual(synchronizer.push('right', 1.02, 'R1'), ('L1', 'R1'))
+        self.assertEqual(synchronizer.paired, 1)
+        self.assertAlmostEqual(synchronizer.last_skew, 0.02)
+
+    def test_pair_is_ordered_left_right_whichever_arrives_first(self):
+        synchronizer = FrameSynchronizer(max_skew=0.05)
+        synchronizer.push('right', 1.00, 'R1')
+        self.assertEqual(synchronizer.push('left', 1.01, 'L1'), ('L1', 'R1'))
+
+    def test_pairs_with_the_nearest_pending_frame(self):
+        synchronizer = FrameSynchronizer(max_skew=0.1)
+        synchronizer.push('left', 1.00, 'L1')
+        synchronizer.push('left', 1.06, 'L2')
+        self.assertEqual(synchronizer.push('right', 1.07, 'R1'), ('L2', 'R1'))
+        self.assertEqual(synchronizer.unpaired['left'], 1)
+
+    def test_frames_outside_skew_are_counted_as_unpaired(self):
+        synchronizer = FrameSynchronizer(max_skew=0.05)
+        synchronizer.push('left', 1.00, 'L1')
+        self.assertIsNone(synchronizer.push('right', 1.20, 'R1'))
+        self.assertEqual(synchronizer.unpaired['left'], 1)
+        self.assertEqual(synchronizer.push('left', 1.21, 'L2'), ('L2', 'R1'))
+
+    def test_full_pending_list_drops_oldest(self):
+        synchronizer = FrameSynchronizer(max_skew=10.0, max_pending=2)
+        for index in range(3):
+            synchronizer.push('left', 1.0 + index * 0.01, f'L{index}')
+        self.assertEqual(synchronizer.dropped['left'], 1)
+        self.assertEqual(synchronizer.push('right', 1.03, 'R0'), ('L2', 'R0'))
+
+
+if __name__ == '__main__':
+    unittest.main()
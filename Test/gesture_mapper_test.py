@@ -0,0 +1,70 @@
+import unittest
+import sys, os
+import numpy as np
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("services/gesture_mapper_service.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from services.gesture_mapper_service import GestureMapperService
+from classes.SlidingWindowStatistics import SlidingWindowStatistics
+
+class TestSlidingWindowStatistics(unittest.TestCase):
+
+    def test_matches_numpy_over_the_window(self):
+        samples = np.random.default_rng(1).normal(50.0, 20.0, (200, 3))
+        statistics = SlidingWindowStatistics(window=16, size=3)
+        for index, sample in enumerate(samples):
+            statistics.update(sample)
+            window = samples[max(0, index - 15):index + 1]
+            np.testing.assert_allclose(statistics.mean, window.mean(axis=0))
+            np.testing.assert_allclose(statistics.std, window.std(axis=0), atol=1e-9)
+        self.assertEqual(statistics.count, 16)
+
+class TestGestureMapperStreaming(unittest.TestCase):
+
+    def random_frames(self, count, seed):
+        rng = np.random.default_rng(seed)
+        frames = np.empty((count, 18))
+        frames[:, 0:9] = rng.uniform(-5.0, 5.0, (count, 9))
+        frames[:, 9:14] = rng.integers(0, 1024, (count, 5))
+        frames[:, 14:18] = 3
+        return frames
+
+    def assert_same_hand(self, streamed, batch):
+        for attribute in ('roll', 'pitch', 'yaw', 'mean_acceleration', 'std_acceleration', 'mean_angular_velocity', 'std_angular_velocity'):
+            self.assertAlmostEqual(getattr(streamed, attribute), getattr(batch, attribute), places=9)
+        self.assertEqual(streamed.gyro_axis, batch.gyro_axis)
+        self.assertEqual(streamed.accel_axis, batch.accel_axis)
+
+    def test_streamed_window_matches_batch_window(self):
+        window = 8
+        mapper = GestureMapperService(stream_window=window)
+        left, right = self.random_frames(40, 2), self.random_frames(40, 3)
+        for index in range(len(left)):
+            mapper.update_stream('left', left[index])
+            mapper.update_stream('right', right[index])
+            if index + 1 < window:
+                self.assertFalse(mapper.is_stream_ready())
+                continue
+            self.assertTrue(mapper.is_stream_ready())
+            streamed = mapper.stream_to_dynamic_gesture()
+            batch = mapper.frames_to_dynamic_gesture(left[index + 1 - window:index + 1], right[index + 1 - window:index + 1])
+            self.assert_same_hand(streamed.left_hand, batch.left_hand)
+            self.assert_same_hand(streamed.right_hand, batch.right_hand)
+
+    def test_moving_flag_follows_the_window(self):
+        mapper = GestureMapperService(stream_window=3)
+        still = np.zeros(18)
+        moving = np.zeros(18)
+        moving[3:9] = 1.0
+        mapper.update_stream('left', moving)
+        self.assertTrue(mapper.is_stream_moving())
+        for _ in range(3):
+            mapper.update_stream('left', still)
+        self.assertFalse(mapper.is_stream_moving())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import sys, os
+import numpy as np
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("services/gesture_service.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from services.gesture_service import GestureService
+from classes.FeatureTransform import FeatureTransform
+import classes.StaticGesture as StaticGesture
+import classes.DynamicGesture as DynamicGesture
+
+class TestBatchRecognition(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.services = [GestureService(), GestureService(FeatureTransform.normalized())]
+        rng = np.random.default_rng(7)
+        cls.frames = np.zeros((300, 2, 18))
+        cls.frames[:, :, 0:3] = rng.uniform(0.0, 360.0, (300, 2, 3))
+        cls.frames[:, :, 3:9] = rng.normal(0.0, 2.0, (300, 2, 6))
+        cls.frames[:, :, 9:14] = rng.integers(0, 1023, (300, 2, 5))
+
+    def static_gesture(self, frame):
+        hands = [StaticGesture.Hand(row[0], row[1], row[2], row[3:6], row[6:9], row[9:14].astype(int).tolist(), [3, 3, 3, 3]) for row in frame]
+        return StaticGesture.StaticGesture(hands[0], hands[1])
+
+    def test_static_batch_matches_single_recognition(self):
+        for service in self.services:
+            features = service.static_features_from_frames(self.frames[:, 0], self.frames[:, 1])
+            names, distances = service.recognise_static_gestures(features)
+            expected = [service.recognise_static_gesture(self.static_gesture(frame)) for frame in self.frames]
+            self.assertEqual(names.tolist(), expected)
+            self.assertTrue(np.all(np.isinf(distances[names == None])))
+
+    def test_dynamic_batch_matches_single_recognition(self):
+        rng = np.random.default_rng(8)
+        gestures = []
+        for _ in range(200):
+            hands = [DynamicGesture.Hand(*rng.uniform(0.0, 360.0, 3), rng.integers(0, 1023, 5).tolist(),
+                                         gyro_axis=int(rng.integers(0, 4)), accel_axis=int(rng.integers(0, 4)),
+                                         mean_acceleration=rng.uniform(0, 2), std_acceleration=rng.uniform(-1, 1),
+                                         mean_angular_velocity=rng.uniform(0, 2), std_angular_velocity=rng.uniform(-1, 1)) for _ in range(2)]
+            gestures.append(DynamicGesture.DynamicGesture(hands[0], hands[1]))
+
+        for service in self.services:
+            features = np.stack([np.concatenate((service._extract_dynamic_hand_features(g.left_hand), service._extract_dynamic_hand_features(g.right_hand))) for g in gestures])
+            names, _ = service.recognise_dynamic_gestures(features)
+            expected = [service.recognise_dynamic_gesture(gesture) for gesture in gestures]
+            self.assertEqual(names.tolist(), expected)
+
+    def test_rows_with_missing_hands_do_not_match_two_hand_gestures(self):
+        service = self.services[0]
+        features = service.static_features_from_frames(self.frames[:5, 0], self.frames[:5, 1])
+        features[:, :14] = np.nan
+        names, _ = service.recognise_static_gestures(features)
+        self.assertNotIn('DIAS', names.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
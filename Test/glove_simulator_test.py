@@ -0,0 +1,35 @@
+import unittest
+import sys, os
+import numpy as np
+import serial
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("controllers/glove_simulator.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from controllers.glove_simulator import GloveSimulator
+from controllers.frame_parser import FrameParser
+
+class TestGloveSimulator(unittest.TestCase):
+
+    def test_lines_follow_the_firmware_format(self):
+        frame = np.array([344.444, -10.88, 70.25, 0.12, -0.5, 1.25, 0.03, -0.11, 9.7, 891, 893, 890, 893, 159, 3, 2, 1, 0])
+        line = GloveSimulator.format_frame(frame)
+        self.assertEqual(line, b'344.44,-10.88,70.25*0.12,-0.50,1.25*0.03,-0.11,9.70*891,893,890,893,159*3,2,1,0\r\n')
+        np.testing.assert_allclose(FrameParser().parse(line), np.round(frame, 2))
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'pseudo-terminals are simulated on Linux')
+    def test_serial_port_reads_simulated_gloves(self):
+        simulator = GloveSimulator(rate=100, seed=0)
+        left, right = simulator.open()
+        simulator.start()
+        self.addCleanup(simulator.stop)
+        parser = FrameParser()
+        for port in (left, right):
+            with serial.Serial(port, 115200, timeout=1) as ser:
+                ser.readline()  # May start in the middle of a line
+                self.assertIsNotNone(parser.parse(ser.readline()))
+
+if __name__ == '__main__':
+    unittest.main()
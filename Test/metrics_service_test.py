@@ -0,0 +1,50 @@
+import unittest
+import json
+import urllib.request
+import sys, os
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("services/metrics_service.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from services.metrics_service import MetricsRegistry, MetricsServer, MetricsLogger
+
+class TestMetricsService(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        histogram = self.registry.stage('parse', hand='left')
+        for value in (0.00001, 0.0002, 0.0002, 20.0):
+            histogram.observe(value)
+        self.registry.counter('signify_recognitions_total', 'Lookups.', kind='static').inc(3)
+        self.registry.add_collector(lambda: [('signify_frames_total', 'counter', 'Frames.', {'hand': 'right'}, 7)])
+
+    def test_render_prometheus_text(self):
+        text = self.registry.render()
+        self.assertIn('# TYPE signify_stage_seconds histogram', text)
+        self.assertIn('signify_stage_seconds_bucket{hand="left",stage="parse",le="1e-05"} 1', text)
+        self.assertIn('signify_stage_seconds_bucket{hand="left",stage="parse",le="0.00025"} 3', text)
+        self.assertIn('signify_stage_seconds_bucket{hand="left",stage="parse",le="+Inf"} 4', text)
+        self.assertIn('signify_stage_seconds_count{hand="left",stage="parse"} 4', text)
+        self.assertIn('signify_recognitions_total{kind="static"} 3', text)
+        self.assertIn('signify_frames_total{hand="right"} 7', text)
+
+    def test_server_and_logger(self):
+        server = MetricsServer(self.registry, port=0)
+        self.addCleanup(server.close)
+        with urllib.request.urlopen(f'http://127.0.0.1:{server.port}/metrics', timeout=5) as response:
+            self.assertIn('signify_frames_total{hand="right"} 7', response.read().decode('utf-8'))
+
+        lines = []
+        logger = MetricsLogger(self.registry, interval=60, write=lines.append)
+        logger.log()
+        self.registry.counter('signify_recognitions_total', 'Lookups.', kind='static').inc(3)
+        logger.close()
+        first, last = (json.loads(line)['metrics'] for line in lines)
+        self.assertEqual(first['histograms']['signify_stage_seconds{hand="left",stage="parse"}']['count'], 4)
+        self.assertEqual(last['counters']['signify_recognitions_total{kind="static"}'], 6)
+        self.assertGreater(last['rates']['signify_recognitions_total{kind="static"}'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import sys, os
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("services/phrase_service.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from services.phrase_service import PhraseAssembler
+
+class TestPhraseAssembler(unittest.TestCase):
+
+    def setUp(self):
+        self.spoken = []
+        self.assembler = PhraseAssembler(self.spoken.append, pause=1.0, end_gestures=['fin'], max_words=3)
+
+    def test_pause_ends_the_phrase(self):
+        self.assembler.add('yo', now=10.0)
+        self.assembler.add('comer', now=10.6)
+        self.assembler.poll(now=11.5)
+        self.assertEqual(self.spoken, [])
+        self.assembler.poll(now=11.6)
+        self.assertEqual(self.spoken, [('yo', 'comer')])
+        self.assembler.poll(now=20.0)
+        self.assertEqual(len(self.spoken), 1)
+
+    def test_end_gesture_and_length_end_the_phrase(self):
+        self.assembler.add('hola', now=0.0)
+        self.assembler.add('fin', now=0.1)
+        for word in ('uno', 'dos', 'tres', 'cuatro'):
+            self.assembler.add(word, now=1.0)
+        self.assertEqual(self.spoken, [('hola',), ('uno', 'dos', 'tres')])
+        self.assertEqual(self.assembler.pending_words, ('cuatro',))
+
+if __name__ == '__main__':
+    unittest.main()
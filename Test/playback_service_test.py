@@ -0,0 +1,92 @@
+import unittest
+import threading
+import sys, os
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("services/playback_service.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from services.playback_service import PlaybackWorker
+
+class FakePlayObject:
+    def __init__(self):
+        self.finished = threading.Event()
+
+    def wait_done(self):
+        self.finished.wait(5)
+
+    def stop(self):
+        self.finished.set()
+
+class FakePlayer:
+    def __init__(self):
+        self.started = []
+        self.playing = None
+        self.playing_changed = threading.Semaphore(0)
+
+    def start_clip(self, clip):
+        self.started.append(clip)
+        self.playing = FakePlayObject()
+        self.playing_changed.release()
+        return self.playing
+
+    def finish(self):
+        self.playing.finished.set()
+        self.assertNextStarted()
+
+    def assertNextStarted(self):
+        if not self.playing_changed.acquire(timeout=5):
+            raise AssertionError('No clip started.')
+
+class TestPlaybackWorker(unittest.TestCase):
+
+    def create_worker(self, policy, **options):
+        self.player = FakePlayer()
+        worker = PlaybackWorker(self.player, lambda text: text, policy, **options)
+        self.addCleanup(worker.close)
+        return worker
+
+    def test_queue_speaks_in_order_and_rejects_when_full(self):
+        worker = self.create_worker('queue', max_pending=2)
+        self.assertTrue(worker.speak('a'))
+        self.player.assertNextStarted()  # The caller did not wait for 'a' to be spoken
+        self.assertTrue(worker.speak('b'))
+        self.assertTrue(worker.speak('c'))
+        self.assertFalse(worker.speak('d'))
+        self.player.finish()
+        self.player.finish()
+        self.assertEqual(self.player.started, ['a', 'b', 'c'])
+        self.assertEqual(worker.get_statistics()['rejected'], 1)
+
+    def test_coalesce_merges_repeats_and_drops_oldest(self):
+        worker = self.create_worker('coalesce', max_pending=2)
+        worker.speak('a')
+        self.player.assertNextStarted()
+        self.assertFalse(worker.speak('a'))  # Being spoken
+        for word in ('b', 'b', 'c', 'd'):
+            worker.speak(word)
+        self.player.finish()
+        self.player.finish()
+        self.assertEqual(self.player.started, ['a', 'c', 'd'])
+        statistics = worker.get_statistics()
+        self.assertEqual((statistics['coalesced'], statistics['dropped']), (2, 1))
+
+    def test_cancel_stops_playback_and_discards_waiting_words(self):
+        worker = self.create_worker('drop_stale')
+        worker.speak('a')
+        self.player.assertNextStarted()
+        worker.speak('b')
+        worker.cancel()
+        self.assertTrue(self.player.playing.finished.is_set())
+        worker.speak('c')
+        self.player.assertNextStarted()
+        self.assertEqual(self.player.started, ['a', 'c'])
+        self.assertEqual(worker.get_statistics()['cancelled'], 2)
+
+    def test_unknown_policy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            PlaybackWorker(FakePlayer(), lambda text: text, 'shuffle')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import tempfile
+import json
+import time
+import sys, os
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("controllers/port_discovery.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from controllers.port_discovery import PortDiscovery
+from controllers.glove_simulator import GloveSimulator
+from controllers.frame_parser import FrameParser
+
+@unittest.skipUnless(sys.platform.startswith('linux'), 'pseudo-terminals are simulated on Linux')
+class TestPortDiscovery(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_path = os.path.join(directory.name, 'ports.json')
+
+    def start_simulator(self, **options):
+        simulator = GloveSimulator(rate=20, seed=0, **options)
+        left, right = simulator.open()
+        simulator.start()
+        self.addCleanup(simulator.stop)
+        return left, right
+
+    def discover(self, devices):
+        ports = PortDiscovery(cache_path=self.cache_path).discover(devices)
+        for ser in ports.values():
+            self.addCleanup(ser.close)
+        return ports
+
+    def test_gloves_are_identified_by_their_handshake(self):
+        left, right = self.start_simulator()
+        ports = self.discover([right, left])
+        self.assertEqual((ports['left'].port, ports['right'].port), (left, right))
+        ports['left'].timeout = 1
+        ports['left'].readline()  # May start in the middle of a line
+        self.assertIsNotNone(FrameParser().parse(ports['left'].readline()))
+        with open(self.cache_path) as file:
+            self.assertEqual(json.load(file), {left: 'left', right: 'right'})
+
+    def test_gloves_without_handshake_use_the_cached_mapping(self):
+        left, right = self.start_simulator(handshake=False)
+        with open(self.cache_path, 'w') as file:
+            json.dump({left: 'right'}, file)
+        ports = self.discover([left, right])
+        self.assertEqual((ports['left'].port, ports['right'].port), (right, left))
+
+    def test_silent_ports_do_not_delay_the_discovery(self):
+        left, right = self.start_simulator()
+        master, slave = os.openpty()  # A serial device that never sends anything
+        self.addCleanup(os.close, master)
+        self.addCleanup(os.close, slave)
+        start = time.monotonic()
+        ports = self.discover([os.ttyname(slave), left, right])
+        self.assertLess(time.monotonic() - start, 1.5)  # The probe timeout is 3 s
+        self.assertEqual((ports['left'].port, ports['right'].port), (left, right))
+
+if __name__ == '__main__':
+    unittest.main()
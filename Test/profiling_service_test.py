@@ -0,0 +1,76 @@
+import unittest
+import cProfile
+from unittest.mock import patch
+import tempfile
+import threading
+import time
+import sys, os
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("services/profiling_service.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from services.profiling_service import PipelineProfiler
+
+def busy_loop(stop_event):
+    while not stop_event.is_set():
+        sum(i * i for i in range(1000))
+
+class TestPipelineProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_sampling_writes_a_profile_per_thread(self):
+        profiler = PipelineProfiler(self.directory.name, 'sample', interval=0.002)
+        profiler.start()
+        stop_event = threading.Event()
+        thread = threading.Thread(target=busy_loop, args=(stop_event,), name='busy-worker')
+        thread.start()
+        time.sleep(0.3)
+        profiler.stop()
+        stop_event.set()
+        thread.join()
+        with open(os.path.join(self.directory.name, 'busy-worker.folded'), encoding='utf-8') as file:
+            self.assertIn('busy_loop (profiling_service_test.py', file.read())
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, 'MainThread.folded')))
+
+    @unittest.skipIf(sys.version_info >= (3, 12), 'cProfile profiles a single thread at a time from Python 3.12')
+    def test_cprofile_and_allocations_stop_after_the_frame_window(self):
+        profiler = PipelineProfiler(self.directory.name, 'cprofile', trace_memory=True, frames=3)
+        profiler.start()
+        stop_event = threading.Event()
+        thread = threading.Thread(target=busy_loop, args=(stop_event,), name='busy-worker')
+        thread.start()
+        time.sleep(0.1)
+        for _ in range(3):
+            profiler.on_frame()
+        stop_event.set()
+        thread.join()
+
+        files = os.listdir(self.directory.name)
+        for name in ('busy-worker.pstats', 'MainThread.pstats', 'tracemalloc.txt', 'tracemalloc.snapshot'):
+            self.assertIn(name, files)
+
+    def test_threads_that_cannot_be_profiled_get_no_file(self):
+        class MainThreadOnlyProfile(cProfile.Profile):
+            def enable(self, *args, **kwargs):
+                if threading.current_thread() is not threading.main_thread():
+                    raise ValueError('Another profiling tool is already active')
+                super().enable(*args, **kwargs)
+
+        with patch('services.profiling_service.cProfile.Profile', MainThreadOnlyProfile):
+            profiler = PipelineProfiler(self.directory.name, 'cprofile')
+            profiler.start()
+            stop_event = threading.Event()
+            stop_event.set()
+            thread = threading.Thread(target=busy_loop, args=(stop_event,), name='busy-worker')
+            thread.start()
+            thread.join()
+            profiler.stop()
+        self.assertEqual(os.listdir(self.directory.name), ['MainThread.pstats'])
+
+if __name__ == '__main__':
+    unittest.main()
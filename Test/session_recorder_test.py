@@ -0,0 +1,79 @@
+import unittest
+import tempfile
+import threading
+import sys, os
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("controllers/session_recorder.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from controllers.session_recorder import SessionRecorder, SessionReplayer
+from controllers.bno055_controller import SerialPortReader
+from controllers.frame_handoff import FrameHandoff
+
+LINE = b'10.0,20.0,30.0*0.1,0.2,0.3*1.0,2.0,3.0*100,200,300,400,500*3,3,3,3\r\n'
+
+class TestSessionRecorder(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'session.sgn')
+
+    def test_records_round_trip_and_append(self):
+        recorder = SessionRecorder(self.path)
+        recorder.record('left', 1.0, LINE)
+        recorder.record('right', 1.01, b'garbage\n')
+        recorder.close()
+        recorder = SessionRecorder(self.path)
+        recorder.record('left', 1.3, LINE)
+        recorder.close()
+
+        self.assertEqual(list(SessionReplayer.read_records(self.path)),
+                         [('left', 1.0, LINE), ('right', 1.01, b'garbage\n'), ('left', 1.3, LINE)])
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not a session log')
+        with self.assertRaises(ValueError):
+            list(SessionReplayer.read_records(self.path))
+
+    def test_replay_feeds_the_reader_queue(self):
+        recorder = SessionRecorder(self.path)
+        for i in range(5):
+            recorder.record('left', i * 0.3, LINE)
+            recorder.record('right', i * 0.3 + 0.01, LINE)
+        recorder.record('right', 1.6, b'1,2*broken\n')
+        recorder.close()
+
+        queue = FrameHandoff('fifo')
+        stop_event = threading.Event()
+        reader = SerialPortReader('left', 'right', queue, stop_event)
+        replayer = SessionReplayer(self.path, reader, stop_event, speed=0)
+        replayer.start()
+
+        self.assertEqual(replayer.replayed, 11)
+        self.assertEqual(queue.get_statistics()['offered'], 5)
+        left, right, timestamp = queue.get(0)
+        self.assertEqual(left[0], 10.0)
+        self.assertEqual(right[13], 500)
+        self.assertEqual(reader.get_statistics()['invalid'], {'left': 0, 'right': 1})
+
+    def test_replay_keeps_the_recorded_skew(self):
+        recorder = SessionRecorder(self.path)
+        for i in range(5):
+            recorder.record('left', i * 1.0, LINE)
+            recorder.record('right', i * 1.0 + 0.5, LINE)  # Far more than max_skew behind the left glove
+        recorder.close()
+
+        queue = FrameHandoff('fifo')
+        stop_event = threading.Event()
+        reader = SerialPortReader('left', 'right', queue, stop_event)
+        SessionReplayer(self.path, reader, stop_event, speed=0).start()
+
+        self.assertEqual(reader.get_statistics()['paired'], 0)
+        self.assertEqual(queue.get_statistics()['offered'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
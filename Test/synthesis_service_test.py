@@ -0,0 +1,75 @@
+import unittest
+import threading
+import sys, os
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("services/synthesis_service.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from services.synthesis_service import SynthesisService, SPEAK_NOW, PRERENDER
+from services.text_to_speech_service import TTSBackend, Pyttsx3Backend
+from classes.AudioClip import AudioClip
+
+class GatedBackend(TTSBackend):
+    NAME = 'gated'
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.threads = set()
+        self.spoken = []
+
+    def _load(self):
+        self.threads.add(threading.current_thread().name)
+
+    def synthesize(self, text, speaker_wav=None, language=None):
+        self.release.wait(5)
+        self.threads.add(threading.current_thread().name)
+        self.spoken.append(text)
+        if text == 'error':
+            raise OSError('no voice')
+        return AudioClip(text.encode('utf-8'), 16000)
+
+class TestSynthesisService(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = GatedBackend()
+        self.service = SynthesisService(self.backend)
+        self.addCleanup(self.service.close)
+
+    def test_engine_stays_on_one_worker_and_urgent_words_go_first(self):
+        first = self.service.submit('uno', PRERENDER)
+        later = self.service.submit('dos', PRERENDER)
+        urgent = self.service.submit('tres', SPEAK_NOW)
+        self.assertIs(self.service.submit('dos', PRERENDER), later)  # Identical requests are synthesized once
+        self.backend.release.set()
+        self.assertEqual(later.result(5).data, b'dos')
+        self.assertEqual(first.result(5).data, b'uno')
+        self.assertEqual(urgent.result(5).data, b'tres')
+        self.assertLess(self.backend.spoken.index('tres'), self.backend.spoken.index('dos'))
+        self.assertEqual(self.backend.threads, {'tts-worker-0'})
+
+    def test_errors_fail_only_their_request(self):
+        self.backend.release.set()
+        with self.assertRaises(RuntimeError):
+            self.service.convert_text_to_clip('error')
+        self.assertEqual(self.service.convert_text_to_clip('hola').data, b'hola')
+
+    def test_close_fails_waiting_requests(self):
+        self.service.submit('uno')
+        waiting = self.service.submit('dos')
+        threading.Timer(0.1, self.backend.release.set).start()
+        self.service.close()  # Waits for the word being synthesized only
+        with self.assertRaises(RuntimeError):
+            waiting.result(5)
+        with self.assertRaises(RuntimeError):
+            self.service.submit('tres')
+
+    def test_backends_that_cannot_run_in_parallel_get_one_worker(self):
+        service = SynthesisService(Pyttsx3Backend, workers=4)
+        self.addCleanup(service.close)
+        self.assertEqual(service.workers, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import tempfile
+import threading
+import sys, os
+
+# Get the directory where the script lives
+script_dir = os.path.dirname("services/text_to_speech_service.py")
+# Add the parent directory to sys.path
+sys.path.append(os.path.join(script_dir, '..'))
+
+from services.text_to_speech_service import TTSConverter, TTSBackend, create_backend, CoquiBackend
+from classes.AudioClip import AudioClip
+
+class SlowBackend(TTSBackend):
+    WARM_UP_IN_BACKGROUND = True
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.loads = 0
+        self.spoken = []
+
+    def _load(self):
+        self.release.wait(5)
+        self.loads += 1
+
+    def synthesize(self, text, speaker_wav=None, language=None):
+        self.spoken.append(text)
+        return None
+
+class TestTextToSpeech(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.output_file = os.path.join(self.directory, 'tracks', 'audio.wav')
+
+    def test_backends_load_nothing_until_used(self):
+        backend = create_backend('coqui', model_name='tts_models/es/css10/vits')
+        self.assertIsInstance(backend, CoquiBackend)
+        self.assertFalse(backend.is_loaded)
+        self.assertIsNone(backend.tts)
+        with self.assertRaises(ValueError):
+            create_backend('espeak')
+
+    def test_slow_backend_is_warmed_up_once_in_background(self):
+        backend = SlowBackend()
+        converter = TTSConverter(backend, output_file=self.output_file)
+        self.assertFalse(backend.is_loaded)  # The constructor did not wait for the load
+        backend.release.set()
+        converter.convert_text_to_audio_with_engine('hola')
+        self.assertEqual(backend.loads, 1)
+        self.assertEqual(backend.spoken, ['hola'])
+
+    def test_file_backend_reads_recorded_clip_into_memory(self):
+        AudioClip.from_float_samples([0.0, 0.5, -1.0], 22050).to_wave_file(os.path.join(self.directory, 'hola.wav'))
+        converter = TTSConverter('file', output_file=self.output_file, directory=self.directory)
+        clip = converter.convert_text_to_clip('hola')
+        self.assertEqual(clip.sample_rate, 22050)
+        self.assertEqual(clip.samples[:, 0].tolist(), [0, 16383, -32767])
+        self.assertIsNone(converter.convert_text_to_clip('adios'))
+        self.assertFalse(os.path.exists(self.output_file))
+
+if __name__ == '__main__':
+    unittest.main()
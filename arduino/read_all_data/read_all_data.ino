@@ -25,6 +25,16 @@
 /** Set the delay between fresh samples **/
 # define BNO055_SAMPLERATE_DELAY_MS (300)
 
+/** Delay between samples in binary mode, whose frames are small enough for the 100 Hz output of the fusion algorithm **/
+# define BINARY_SAMPLERATE_DELAY_MS (10)
+
+/** Binary frames start with these sync bytes, see controllers/binary_protocol.py **/
+# define SYNC_0 (0xA5)
+# define SYNC_1 (0x5A)
+
+/** The hand this glove is worn on, sent to the host when it asks for it with '?'. Set it to "right" on the right glove **/
+# define GLOVE_HAND "left"
+
 /** The sensor mode will be Nine Degrees of Freedom mode, enabling all sensors and the fusion algorithm **/
 # define BNO055_OPERATION_MODE ()
 
@@ -44,6 +54,22 @@ int V4 = 0;  // variable to store the value coming from the little finger sensor
 Adafruit_BNO055 bno = Adafruit_BNO055(55, 0x28, &Wire);
 int8_t temp;
 
+bool binaryMode = false;  // Switched with 'B' and 'T' from the host
+uint16_t sequence = 0;    // Sequence number of the frames, so the host can count the lost ones
+
+/** A binary frame, little-endian and packed as the host expects it **/
+struct __attribute__((packed)) BinaryFrame {
+  uint8_t sync[2];
+  uint16_t sequence;
+  uint32_t time;
+  float euler[3];
+  float gyro[3];
+  float accel[3];
+  uint16_t flex[5];
+  uint8_t calibration[4];
+  uint16_t crc;
+};
+
 void setup(void){
   
   Serial.begin(115200);
@@ -81,11 +107,19 @@ void setup(void){
  */
 void loop(void){
 
+  handshakeEvent();
+
   sensors_event_t orientationData, angVelocityData , linearAccelData;
   bno.getEvent(&orientationData, Adafruit_BNO055::VECTOR_EULER);
   bno.getEvent(&angVelocityData, Adafruit_BNO055::VECTOR_GYROSCOPE);
   bno.getEvent(&linearAccelData, Adafruit_BNO055::VECTOR_LINEARACCEL);
 
+  if (binaryMode) {
+    binaryEvent(&orientationData, &angVelocityData, &linearAccelData);
+    delay(BINARY_SAMPLERATE_DELAY_MS);
+    return;
+  }
+
   eulerEvent(&orientationData);
   gyroEvent(&angVelocityData);
   accelEvent(&linearAccelData);
@@ -96,6 +130,79 @@ void loop(void){
   delay(BNO055_SAMPLERATE_DELAY_MS);
 }
 
+/*!
+* @brief  Answer the commands of the host: '?' asks which hand this glove is, 'B' switches to binary frames and 'T'
+*         back to text lines
+*
+* @return void
+*/
+void handshakeEvent() {
+  while (Serial.available() > 0) {
+    char command = Serial.read();
+    if (command == '?') {
+      Serial.print("SIGNIFY,");
+      Serial.println(GLOVE_HAND);
+    } else if (command == 'B') {
+      binaryMode = true;
+    } else if (command == 'T') {
+      binaryMode = false;
+    }
+  }
+}
+
+/*!
+* @brief  CRC-16/CCITT-FALSE, the CRC of Python's binascii.crc_hqx with an initial value of 0xFFFF
+*
+* @return the CRC of the bytes
+*/
+uint16_t crc16(const uint8_t* data, size_t length) {
+  uint16_t crc = 0xFFFF;
+  while (length--) {
+    crc ^= (uint16_t)(*data++) << 8;
+    for (uint8_t bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+    }
+  }
+  return crc;
+}
+
+/*!
+* @brief  Send all the data of a sample as one binary frame
+*
+* @return void
+*/
+void binaryEvent(sensors_event_t* orientationEvent, sensors_event_t* gyroEvent, sensors_event_t* accelEvent) {
+  BinaryFrame frame;
+  frame.sync[0] = SYNC_0;
+  frame.sync[1] = SYNC_1;
+  frame.sequence = sequence++;
+  frame.time = millis();
+  frame.euler[0] = orientationEvent->orientation.x;
+  frame.euler[1] = orientationEvent->orientation.y;
+  frame.euler[2] = orientationEvent->orientation.z;
+  frame.gyro[0] = gyroEvent->gyro.x;
+  frame.gyro[1] = gyroEvent->gyro.y;
+  frame.gyro[2] = gyroEvent->gyro.z;
+  frame.accel[0] = accelEvent->acceleration.x;
+  frame.accel[1] = accelEvent->acceleration.y;
+  frame.accel[2] = accelEvent->acceleration.z;
+  frame.flex[0] = analogRead(P0);
+  frame.flex[1] = analogRead(P1);
+  frame.flex[2] = analogRead(P2);
+  frame.flex[3] = analogRead(P3);
+  frame.flex[4] = analogRead(P4);
+
+  uint8_t system, gyro, accel, mag = 0;
+  bno.getCalibration(&system, &gyro, &accel, &mag);
+  frame.calibration[0] = accel;
+  frame.calibration[1] = gyro;
+  frame.calibration[2] = mag;
+  frame.calibration[3] = system;
+
+  frame.crc = crc16((const uint8_t*)&frame + 2, sizeof(frame) - 4);
+  Serial.write((const uint8_t*)&frame, sizeof(frame));
+}
+
 /*!
 * @brief  Display the flexor data
 *
@@ -0,0 +1,94 @@
+"""
+Measures how many glove lines per second each frame parsing path can handle.
+
+`legacy` reproduces what a line used to go through before reaching a StaticGesture: the utf-8 decode and the
+`np.fromstring` segments of `SerialPortReader.__low_pass_filter`, then the `list(map(int, ...))` conversions of
+`ApiController._parse_sensor_data`. `bytes` is `FrameParser.parse_into` writing into a preallocated row, followed by
+the same conversions `ApiController` now applies to that row.
+
+Usage:
+    python benchmarks/frame_parser_benchmark.py [--lines 200000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from controllers.frame_parser import FrameParser, FRAME_WIDTH, FLEX, CALIBRATION
+
+SAMPLE_LINES = [
+    b'344.44,-10.88,70.25*0.12,-0.50,1.25*0.03,-0.11,9.70*891,893,890,893,159*3,3,3,3\r\n',
+    b'82.00,-78.50,97.50*0.00,0.00,0.00*0.01,0.02,0.03*54,16,28,106,160*3,3,2,3\r\n',
+    b'179.56,-12.06,0.94*1.50,0.20,-2.25*0.10,0.40,0.00*40,887,26,52,196*2,3,3,1\r\n',
+]
+
+EXPECTED_LENGTHS = [3, 3, 3, 5, 4]
+
+
+def legacy_parse(line: bytes):
+    """The string based path the reader and ApiController used before FrameParser."""
+    segments = line.decode('utf-8').rstrip().split('*')
+    if len(segments) != len(EXPECTED_LENGTHS):
+        return None
+    try:
+        parsed_data = [np.fromstring(segment, sep=',', dtype=float) for segment in segments]
+        if any(len(elements) != expected_length for elements, expected_length in zip(parsed_data, EXPECTED_LENGTHS)):
+            return None
+    except ValueError:
+        return None
+    return parsed_data[0], parsed_data[1], parsed_data[2], list(map(int, parsed_data[3])), list(map(int, parsed_data[4]))
+
+
+def run(lines: int):
+    """
+    Parses `lines` lines with both paths and returns the throughput of each.
+
+    Returns:
+        dict: Lines per second for the legacy and the byte-level parser.
+    """
+    parser = FrameParser()
+    row = np.empty(FRAME_WIDTH)
+    workload = [SAMPLE_LINES[index % len(SAMPLE_LINES)] for index in range(lines)]
+    results = {}
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        start = time.perf_counter()
+        for line in workload:
+            legacy_parse(line)
+        results['legacy'] = lines / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for line in workload:
+        if parser.parse_into(line, row):
+            row[FLEX].astype(int).tolist()
+            row[CALIBRATION].astype(int).tolist()
+    results['bytes'] = lines / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for line in workload:
+        parser.parse_into(line, row)
+    results['bytes (parse only)'] = lines / (time.perf_counter() - start)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=200000, help='Number of lines parsed by each path.')
+    args = parser.parse_args()
+
+    results = run(args.lines)
+    baseline = results['legacy']
+    for name, lines_per_second in results.items():
+        print(f"{name:<20}{lines_per_second:>14,.0f} lines/s{lines_per_second / baseline:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
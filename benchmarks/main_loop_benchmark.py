@@ -0,0 +1,147 @@
+"""
+Compares the CPU use and latency of the ApiController main loop before and after the move to a blocking hand-off.
+
+The loops are measured without gloves, the TTS model or audio devices: `busy_poll_loop` reproduces the loop
+`ApiController.run` used to have (spin on `empty()` of a queue.Queue, clear it after every frame), and `blocking_loop`
+takes frames from the shipped FrameHandoff exactly as `ApiController._next_frame` does, once per hand-off policy.
+
+Usage:
+    python benchmarks/main_loop_benchmark.py [--rate 100] [--seconds 3] [--work-ms 2]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from queue import Queue, Full
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from controllers.frame_handoff import FrameHandoff
+
+_STOP_SENTINEL = object()
+
+
+def _simulate_processing(work_s: float):
+    """Burns CPU for `work_s` seconds, standing in for parsing and recognition of a frame."""
+    end = time.perf_counter() + work_s
+    while time.perf_counter() < end:
+        pass
+
+
+def busy_poll_loop(data_queue: Queue, stop_event: threading.Event, work_s: float, latencies: list):
+    """The original main loop: spins on `empty()` and wipes the queue after each processed frame."""
+    while not stop_event.is_set():
+        if not data_queue.empty():
+            sent_at = data_queue.get()
+            if sent_at is _STOP_SENTINEL:
+                continue
+            latencies.append(time.perf_counter() - sent_at)
+            _simulate_processing(work_s)
+            with data_queue.mutex: data_queue.queue.clear()
+
+
+def blocking_loop(handoff: FrameHandoff, stop_event: threading.Event, work_s: float, latencies: list, poll_timeout: float = 0.1):
+    """The event-driven main loop: takes the frames the hand-off policy lets through, as `ApiController._next_frame`."""
+    while not stop_event.is_set():
+        sent_at = handoff.get(poll_timeout)
+        if sent_at is None:
+            continue
+        latencies.append(time.perf_counter() - sent_at)
+        _simulate_processing(work_s)
+
+
+def _offer(channel, sent_at: float):
+    """Offers a frame the way the serial reader does: `put` on a FrameHandoff, or a non-blocking put on a queue."""
+    if isinstance(channel, FrameHandoff):
+        channel.put(sent_at, time.monotonic())
+        return
+    try:
+        channel.put_nowait(sent_at)
+    except Full:
+        pass
+
+
+def _produce(channel, rate: float, seconds: float):
+    """Offers timestamps at `rate` Hz for `seconds`, like the serial reader does with parsed frames."""
+    period = 1.0 / rate
+    deadline = time.perf_counter() + seconds
+    next_put = time.perf_counter()
+    while next_put < deadline:
+        _offer(channel, time.perf_counter())
+        next_put += period
+        time.sleep(max(0.0, next_put - time.perf_counter()))
+
+
+def run_scenario(loop, channel, rate: float, seconds: float, work_s: float):
+    """
+    Runs one loop through an idle phase and a streaming phase, then stops it.
+
+    Args:
+        loop (callable): `busy_poll_loop` or `blocking_loop`.
+        channel (Queue or FrameHandoff): What the frames are handed over through.
+        rate (float): The frame rate in Hz.
+        seconds (float): The duration of each phase.
+        work_s (float): The processing time of a frame in seconds.
+
+    Returns:
+        dict: Process CPU use per phase, frame latencies and the time the loop took to stop.
+    """
+    stop_event = threading.Event()
+    latencies = []
+
+    thread = threading.Thread(target=loop, args=(channel, stop_event, work_s, latencies), daemon=True)
+    process_cpu_start = time.process_time()
+    thread.start()
+
+    time.sleep(seconds)  # Idle: gloves connected but nothing arriving
+    process_cpu_idle = time.process_time() - process_cpu_start
+
+    stream_cpu_start = time.process_time()
+    _produce(channel, rate, seconds)
+    process_cpu_stream = time.process_time() - stream_cpu_start
+
+    stop_requested = time.perf_counter()
+    stop_event.set()
+    if isinstance(channel, FrameHandoff):
+        channel.close()  # As ApiController.stop does
+    else:
+        try:
+            channel.put_nowait(_STOP_SENTINEL)
+        except Full:
+            pass
+    thread.join()
+    stop_latency = time.perf_counter() - stop_requested
+
+    return {
+        'idle_cpu_percent': 100.0 * process_cpu_idle / seconds,
+        'stream_cpu_percent': 100.0 * process_cpu_stream / seconds,
+        'frames_processed': len(latencies),
+        'latency_median_ms': 1000.0 * statistics.median(latencies) if latencies else float('nan'),
+        'latency_p99_ms': 1000.0 * sorted(latencies)[int(0.99 * (len(latencies) - 1))] if latencies else float('nan'),
+        'stop_latency_ms': 1000.0 * stop_latency,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rate', type=float, default=100.0, help='Simulated frame rate in Hz.')
+    parser.add_argument('--seconds', type=float, default=3.0, help='Duration of the idle and of the streaming phase.')
+    parser.add_argument('--work-ms', type=float, default=2.0, help='Simulated processing time per frame in milliseconds.')
+    args = parser.parse_args()
+
+    scenarios = [('busy-poll', busy_poll_loop, lambda: Queue(maxsize=50))]
+    scenarios += [(policy, blocking_loop, lambda policy=policy: FrameHandoff(policy, rate=args.rate / 2))  # 'decimate' keeps half the frames
+                  for policy in FrameHandoff.POLICIES]
+
+    print(f"{'loop':<12}{'idle CPU %':>12}{'stream CPU %':>14}{'frames':>8}{'lat p50 ms':>12}{'lat p99 ms':>12}{'stop ms':>10}")
+    for name, loop, make_channel in scenarios:
+        result = run_scenario(loop, make_channel(), args.rate, args.seconds, args.work_ms / 1000.0)
+        print(f"{name:<12}{result['idle_cpu_percent']:>12.1f}{result['stream_cpu_percent']:>14.1f}{result['frames_processed']:>8}"
+              f"{result['latency_median_ms']:>12.3f}{result['latency_p99_ms']:>12.3f}{result['stop_latency_ms']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,310 @@
+"""
+Benchmark suite of the recognition pipeline, runnable without the gloves.
+
+Times each stage a frame goes through, from the raw serial line to the recognised sign:
+
+* `serial_reader.handle_line`: validation and parsing of raw lines by SerialPortReader, valid and malformed, and
+  decoding of binary frames.
+* `frame_stream_splitter.feed`: splitting the bytes read from a port into text lines or binary frames.
+* `api_controller.parse_sensor_data`: building a StaticGesture from a pair of parsed frames.
+* `gesture_mapper.static_gesture_to_dynamic_gesture`: summarising a window of static gestures.
+* `gesture_service.recognise_static_gesture` / `recognise_dynamic_gesture`, and their batch counterparts, against the
+  shipped vocabulary and vocabularies grown with synthetic templates.
+* `pipeline`: a recorded session replayed through ApiController.run as fast as possible, with the 'null' speech backend
+  and playback replaced by a silent stand-in.
+
+Results are written as JSON, and a previous results file can be given to print the speed-up of every benchmark.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--output benchmarks/results.json] [--sizes 1000 10000 100000]
+                                        [--frames 2000] [--repeat 5] [--compare old_results.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from controllers.bno055_controller import SerialPortReader
+from controllers.binary_protocol import encode_frame, FrameStreamSplitter
+from controllers.frame_handoff import FrameHandoff
+from controllers.frame_parser import FRAME_WIDTH
+from controllers.session_recorder import SessionRecorder
+from classes.FeatureTransform import HAND_FEATURES
+import classes.GestureFactory as GestureFactory
+import classes.StaticGesture as StaticGesture
+from repositories.gesture_index import GestureIndex, GestureTree
+from services.gesture_mapper_service import GestureMapperService
+from services.gesture_service import GestureService
+from services.synthesis_service import SynthesisService
+from services.metrics_service import MetricsRegistry
+
+REPOSITORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MALFORMED_LINES = [b'344.44,-10.88*0.12,-0.50,1.25\r\n', b'\xff\xfe3,3,3,3\r\n', b'1,2,3*a,b,c*1,2,3*1,2,3,4,5*3,3,3,3\r\n']
+
+
+def frame_line(frame: np.ndarray) -> bytes:
+    """Formats a frame the way read_all_data.ino prints it."""
+    segments = (frame[0:3], frame[3:6], frame[6:9], frame[9:14].astype(int), frame[14:18].astype(int))
+    return ('*'.join(','.join(f'{value:.2f}' if isinstance(value, float) else str(value) for value in segment.tolist()) for segment in segments) + '\r\n').encode('ascii')
+
+
+def random_frames(rng: np.random.Generator, count: int) -> np.ndarray:
+    """Creates plausible calibrated frames: any orientation, some movement and bent or straight fingers."""
+    frames = np.empty((count, FRAME_WIDTH))
+    frames[:, 0:3] = rng.uniform((0, -90, -180), (360, 90, 180), (count, 3))
+    frames[:, 3:6] = rng.normal(0.0, 1.5, (count, 3))
+    frames[:, 6:9] = rng.normal(0.0, 2.0, (count, 3))
+    frames[:, 9:14] = rng.integers(0, 1024, (count, 5))
+    frames[:, 14:18] = 3
+    return frames
+
+
+def synthetic_index(index: GestureIndex, size: int, rng: np.random.Generator) -> GestureIndex:
+    """
+    Grows a vocabulary to `size` templates, three quarters single-hand and one quarter two-hand.
+
+    The shipped gestures are kept, so queries built from them still find their sign.
+    """
+    extra = max(0, size - len(index.single) - len(index.both))
+    extra_both = extra // 4
+    trees = []
+    for tree, count, hands in ((index.single, extra - extra_both, 1), (index.both, extra_both, 2)):
+        templates = np.empty((count, hands, HAND_FEATURES))
+        templates[..., 0:3] = rng.uniform((0, -90, -180), (360, 90, 180), (count, hands, 3))
+        templates[..., 3:8] = rng.integers(0, 1024, (count, hands, 5))
+        templates[..., 8:12] = rng.uniform(0.0, 5.0, (count, hands, 4))
+        templates[..., 12:14] = rng.integers(0, 3, (count, hands, 2))
+        names = np.concatenate((tree.names, [f'synthetic-{hands}-{i}' for i in range(count)])).astype(str)
+        features = np.concatenate((tree.features, templates.reshape(count, hands * HAND_FEATURES)))
+        trees.append(GestureTree(names, features, index.transform))
+    return GestureIndex(trees[0], trees[1], index.transform)
+
+
+def measure(name: str, params: dict, run, operations: int, repeat: int, setup=None) -> dict:
+    """
+    Runs `run` `repeat` times and reports the time per operation. What the code under test prints is discarded.
+
+    Args:
+        name (str): The benchmark name.
+        params (dict): The parameters the benchmark was run with.
+        run (callable): Performs `operations` operations.
+        operations (int): The number of operations performed by one call of `run`.
+        repeat (int): The number of timed calls.
+        setup (callable, optional): Called, untimed, before each call of `run`.
+
+    Returns:
+        dict: The benchmark result, with median and best seconds per operation and operations per second.
+    """
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) / operations)
+    median = float(np.median(timings))
+    result = {'name': name, 'params': params, 'operations': operations, 'repeat': repeat,
+              'median_s': median, 'min_s': float(min(timings)), 'ops_per_s': 1.0 / median}
+    print(f"{name:<52}{json.dumps(params):<24}{median * 1e6:>12.2f} us{1.0 / median:>14,.0f} ops/s")
+    return result
+
+
+class SilentPlayer:
+    """Stand-in for SpeechFileManager that plays nothing."""
+
+    def start_clip(self, clip):
+        return None
+
+
+def bench_serial_reader(rng, repeat):
+    frames = random_frames(rng, 2000)
+    lines = [frame_line(frame) for frame in frames]
+    binary_frames = [encode_frame(frame, sequence, sequence * 10) for sequence, frame in enumerate(frames)]
+    results = []
+    workloads = (('valid', lines, False), ('valid', lines, True), ('malformed', MALFORMED_LINES * 300, False), ('binary', binary_frames, False))
+    for kind, workload, metrics in workloads:
+        reader = None
+
+        def setup():
+            nonlocal reader
+            reader = SerialPortReader('left', 'right', FrameHandoff('fifo'), threading.Event(), metrics=MetricsRegistry() if metrics else None)
+
+        def run():
+            for i, line in enumerate(workload):
+                reader.handle_line('left' if i % 2 == 0 else 'right', i * 0.01, line)
+
+        params = {'lines': kind, 'metrics': True} if metrics else {'lines': kind}
+        results.append(measure('serial_reader.handle_line', params, run, len(workload), repeat, setup))
+
+    histogram = MetricsRegistry().stage('parse')
+    durations = rng.exponential(1e-4, 10000).tolist()
+    results.append(measure('metrics.histogram.observe', {}, lambda: [histogram.observe(duration) for duration in durations], len(durations), repeat))
+
+    for kind, workload in (('text', lines), ('binary', binary_frames)):
+        stream = b''.join(workload)
+        chunks = [stream[i:i + 256] for i in range(0, len(stream), 256)]
+
+        def run():
+            splitter = FrameStreamSplitter()
+            for chunk in chunks:
+                splitter.feed(chunk)
+
+        results.append(measure('frame_stream_splitter.feed', {'format': kind, 'bytes_per_frame': len(stream) // len(workload)}, run, len(workload), repeat))
+    return results
+
+
+def bench_mapper(rng, repeat):
+    factory = GestureFactory.GestureFactory()
+    mapper = GestureMapperService()
+    window = []
+    for left, right in zip(random_frames(rng, 20), random_frames(rng, 20)):
+        hands = [StaticGesture.Hand(*frame[0:3].tolist(), gyro=frame[3:6], accel=frame[6:9], finger_flex=frame[9:14].astype(int).tolist(),
+                                    calibration=frame[14:18].astype(int).tolist()) for frame in (left, right)]
+        window.append(factory.create_static_gesture(*hands))
+
+    results = []
+    for size in (2, 20):
+        gestures = window[:size]
+        results.append(measure('gesture_mapper.static_gesture_to_dynamic_gesture', {'window': size},
+                               lambda: [mapper.static_gesture_to_dynamic_gesture(gestures) for _ in range(200)], 200, repeat))
+    return results
+
+
+def bench_recognition(service, sizes, rng, repeat):
+    factory = GestureFactory.GestureFactory()
+    mapper = GestureMapperService()
+    shipped = service._GestureService__index
+    left_frames, right_frames = random_frames(rng, 1000), random_frames(rng, 1000)
+    static_gestures = [factory.create_static_gesture(*[StaticGesture.Hand(*frame[0:3].tolist(), gyro=frame[3:6], accel=frame[6:9],
+                                                                          finger_flex=frame[9:14].astype(int).tolist(), calibration=[3, 3, 3, 3])
+                                                       for frame in (left, right)]) for left, right in zip(left_frames, right_frames)]
+    dynamic_gestures = [mapper.frames_to_dynamic_gesture(left_frames[i:i + 2], right_frames[i:i + 2]) for i in range(0, 1000, 2)]
+    static_features = service.static_features_from_frames(left_frames, right_frames)
+    dynamic_features = np.array([np.concatenate((service._extract_dynamic_hand_features(gesture.left_hand),
+                                                 service._extract_dynamic_hand_features(gesture.right_hand))) for gesture in dynamic_gestures])
+
+    results = []
+    for size in [len(shipped.single) + len(shipped.both)] + sorted(sizes):
+        service.swap_index(synthetic_index(shipped, size, rng))
+        params = {'vocabulary': size}
+        for name, run, operations in (
+            ('gesture_service.recognise_static_gesture', lambda: [service.recognise_static_gesture(g) for g in static_gestures], len(static_gestures)),
+            ('gesture_service.recognise_dynamic_gesture', lambda: [service.recognise_dynamic_gesture(g) for g in dynamic_gestures], len(dynamic_gestures)),
+            ('gesture_service.recognise_static_gestures', lambda: service.recognise_static_gestures(static_features), len(static_features)),
+            ('gesture_service.recognise_dynamic_gestures', lambda: service.recognise_dynamic_gestures(dynamic_features), len(dynamic_features)),
+        ):
+            results.append(measure(name, params, run, operations, repeat))
+    service.swap_index(shipped)
+    return results
+
+
+def bench_controller(rng, frames, repeat):
+    """Benchmarks ApiController, or reports why it could not be imported."""
+    try:
+        from signify import ApiController
+    except ImportError as e:
+        print(f"Skipping the ApiController benchmarks: {e}")
+        return [{'name': name, 'skipped': str(e)} for name in ('api_controller.parse_sensor_data', 'pipeline')]
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        session = os.path.join(directory, 'session.sgn')
+        recorder = SessionRecorder(session)
+        for i, (left, right) in enumerate(zip(random_frames(rng, frames), random_frames(rng, frames))):
+            recorder.record('left', i * 0.3, frame_line(left))
+            recorder.record('right', i * 0.3 + 0.01, frame_line(right))
+        recorder.close()
+
+        def build():
+            return ApiController(hot_reload=False, replay_path=session, replay_speed=0, tts=SynthesisService('null'), file_controller=SilentPlayer())
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller = build()
+        pairs = list(zip(random_frames(rng, 1000), random_frames(rng, 1000)))
+        results.append(measure('api_controller.parse_sensor_data', {}, lambda: [controller._parse_sensor_data(left, right) for left, right in pairs], len(pairs), repeat))
+        controller._gesture_service.close()
+
+        runs = []
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                controller = build()
+                controller.run()
+            latencies = np.array(controller._latencies)
+            runs.append({'elapsed_s': controller._replayer.elapsed, 'processed': controller._processed_frames, 'dropped': controller._serial_data_queue.get_statistics()['dropped'],
+                         'latency_median_s': float(np.median(latencies)) if len(latencies) else None,
+                         'latency_p99_s': float(np.percentile(latencies, 99)) if len(latencies) else None})
+        run = sorted(runs, key=lambda r: r['elapsed_s'])[len(runs) // 2]
+        result = {'name': 'pipeline', 'params': {'frames': frames, 'speed': 'max'}, 'repeat': repeat, **run,
+                  'ops_per_s': run['processed'] / run['elapsed_s']}
+        print(f"{'pipeline':<52}{json.dumps(result['params']):<24}{result['ops_per_s']:>29,.0f} frames/s "
+              f"({run['dropped']} dropped, p99 latency {(run['latency_p99_s'] or 0) * 1e3:.2f} ms)")
+        results.append(result)
+    return results
+
+
+def environment() -> dict:
+    """Describes the machine and the version of the code the benchmarks ran on."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPOSITORY_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'date': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'python': platform.python_version(),
+            'numpy': np.__version__, 'platform': platform.platform(), 'processor': platform.processor() or platform.machine()}
+
+
+def compare(results: list, baseline_path: str):
+    """Prints the speed-up of every benchmark over a previous results file."""
+    with open(baseline_path, 'r', encoding='utf-8') as file:
+        baseline = {(r['name'], json.dumps(r.get('params'), sort_keys=True)): r for r in json.load(file)['results']}
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        previous = baseline.get((result['name'], json.dumps(result.get('params'), sort_keys=True)))
+        if previous is None or 'ops_per_s' not in previous or 'ops_per_s' not in result:
+            continue
+        print(f"{result['name']:<52}{json.dumps(result['params']):<24}{result['ops_per_s'] / previous['ops_per_s']:>10.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default=os.path.join('benchmarks', 'results.json'), help='File the results are written to.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000], help='Vocabulary sizes, besides the shipped one.')
+    parser.add_argument('--frames', type=int, default=2000, help='Number of frame pairs replayed through the pipeline.')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed runs of each benchmark.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic data.')
+    parser.add_argument('--compare', metavar='FILE', help='A previous results file to compare with.')
+    args = parser.parse_args()
+
+    os.chdir(REPOSITORY_DIR)  # The services open the gestures database relative to the repository
+    rng = np.random.default_rng(args.seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = GestureService()
+
+    results = bench_serial_reader(rng, args.repeat)
+    results += bench_controller(rng, args.frames, args.repeat)
+    results += bench_mapper(rng, args.repeat)
+    results += bench_recognition(service, args.sizes, rng, args.repeat)
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump({'environment': environment(), 'arguments': vars(args), 'results': results}, file, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import wave
+import numpy as np
+
+class AudioClip:
+    """
+    A piece of speech held in memory as interleaved PCM samples, ready to be played as a buffer.
+
+    Attributes:
+        data (bytes): The PCM samples.
+        sample_rate (int): The number of frames per second.
+        channels (int): The number of channels.
+        sample_width (int): The number of bytes per sample.
+    """
+
+    def __init__(self, data: bytes, sample_rate: int, channels: int = 1, sample_width: int = 2):
+        self.data = data
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+
+    @classmethod
+    def from_float_samples(cls, samples, sample_rate: int):
+        """
+        Creates a 16-bit mono clip from floating point samples, as neural speech models produce them.
+
+        Args:
+            samples (array_like): The samples, between -1.0 and 1.0.
+            sample_rate (int): The number of samples per second.
+
+        Returns:
+            AudioClip: The clip.
+        """
+        samples = np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0)
+        return cls((samples * 32767.0).astype('<i2').tobytes(), sample_rate, 1, 2)
+
+    @classmethod
+    def from_wave_file(cls, file_path: str):
+        """
+        Reads a `.wav` file into memory.
+
+        Args:
+            file_path (str): The path of the file.
+
+        Returns:
+            AudioClip: The samples of the file.
+        """
+        with wave.open(file_path, 'rb') as file:
+            return cls(file.readframes(file.getnframes()), file.getframerate(), file.getnchannels(), file.getsampwidth())
+
+    @classmethod
+    def concatenate(cls, clips, gap: float = 0.0):
+        """
+        Joins clips one after the other, with an optional silence between them.
+
+        Args:
+            clips (list): The clips, all with the same sample rate, channels and sample width.
+            gap (float): Seconds of silence between two clips.
+
+        Returns:
+            AudioClip: The joined clip.
+
+        Raises:
+            ValueError: If there are no clips or their formats differ.
+        """
+        if not clips:
+            raise ValueError('There are no clips to join.')
+        first = clips[0]
+        audio_format = (first.sample_rate, first.channels, first.sample_width)
+        if any((clip.sample_rate, clip.channels, clip.sample_width) != audio_format for clip in clips):
+            raise ValueError('Clips with different formats cannot be joined.')
+        silence = bytes(int(gap * first.sample_rate) * first.channels * first.sample_width)
+        return cls(silence.join(clip.data for clip in clips), *audio_format)
+
+    def to_wave_file(self, file_path: str):
+        """
+        Writes the clip to a `.wav` file.
+
+        Args:
+            file_path (str): The path of the file.
+        """
+        with wave.open(file_path, 'wb') as file:
+            file.setnchannels(self.channels)
+            file.setsampwidth(self.sample_width)
+            file.setframerate(self.sample_rate)
+            file.writeframes(self.data)
+
+    @property
+    def samples(self):
+        """
+        Gets the samples of a 16-bit clip without copying them.
+
+        Returns:
+            np.ndarray: The read-only samples, of shape (frames, channels).
+        """
+        return np.frombuffer(self.data, dtype='<i2').reshape(-1, self.channels)
+
+    @property
+    def duration(self):
+        """
+        Gets the length of the clip.
+
+        Returns:
+            float: The duration in seconds.
+        """
+        return len(self.data) / (self.sample_rate * self.channels * self.sample_width)
+
+    def __len__(self):
+        return len(self.data)
@@ -0,0 +1,150 @@
+import numpy as np
+
+# Layout of the raw features of one hand, as stored in the gesture database and extracted by GestureService
+HAND_FEATURES = 14
+ORIENTATION = slice(0, 3)
+FLEX = slice(3, 8)
+ACCELERATION = slice(8, 10)
+ANGULAR_VELOCITY = slice(10, 12)
+AXES = slice(12, 14)
+
+class FeatureTransform:
+    """
+    Maps raw hand features to the space the gesture KD-trees are built and queried in.
+
+    The same transform has to be applied when the index is built and when it is queried. Each group of features is
+    multiplied by its own scale so that no group dominates the distance, and the orientation can be encoded so that
+    angles on both sides of 0/360 degrees end up close together:
+
+    * 'euler': roll, pitch and yaw in degrees, as stored.
+    * 'sincos': the sine and cosine of each angle, so 359 and 1 degrees are as close as 0 and 2.
+    * 'quaternion': the unit quaternion of the euler angles, with a non-negative scalar part.
+
+    The default transform is the identity, so distances and thresholds stay in the raw units.
+
+    Attributes:
+        orientation (str): The orientation encoding.
+        scales (dict): The factor applied to each feature group.
+        error_ranges (dict): Recognition thresholds expressed in the units of this transform, or None to keep the
+            GestureService defaults.
+    """
+
+    ORIENTATIONS = ('euler', 'sincos', 'quaternion')
+    __ORIENTATION_SIZES = {'euler': 3, 'sincos': 6, 'quaternion': 4}
+
+    def __init__(self, orientation: str = 'euler', orientation_scale: float = 1.0, flex_scale: float = 1.0,
+                 acceleration_scale: float = 1.0, angular_velocity_scale: float = 1.0, axis_scale: float = 1.0,
+                 error_ranges: dict = None):
+        """
+        Initializes the FeatureTransform class.
+
+        Args:
+            orientation (str): The orientation encoding, one of ORIENTATIONS.
+            orientation_scale (float): The factor applied to the encoded orientation.
+            flex_scale (float): The factor applied to the finger flex values.
+            acceleration_scale (float): The factor applied to the mean and std of the resultant acceleration.
+            angular_velocity_scale (float): The factor applied to the mean and std of the resultant angular velocity.
+            axis_scale (float): The factor applied to the accelerometer and gyroscope movement axes.
+            error_ranges (dict, optional): Thresholds for GestureService, keyed by 'static', 'static_both' and 'dynamic'.
+
+        Raises:
+            ValueError: If the orientation encoding is unknown.
+        """
+        if orientation not in self.ORIENTATIONS:
+            raise ValueError(f"Unknown orientation encoding '{orientation}', expected one of {self.ORIENTATIONS}.")
+        self.orientation = orientation
+        self.scales = {
+            'orientation': orientation_scale,
+            'flex': flex_scale,
+            'acceleration': acceleration_scale,
+            'angular_velocity': angular_velocity_scale,
+            'axis': axis_scale,
+        }
+        self.error_ranges = error_ranges
+        self.hand_size = self.__ORIENTATION_SIZES[orientation] + HAND_FEATURES - 3
+
+    @classmethod
+    def normalized(cls):
+        """
+        Creates the transform with sin/cos orientation and every feature group brought to a comparable range.
+
+        Angles contribute the chord between them on the unit circle, flex values are divided by the 10-bit range of the
+        analog readings, and the motion statistics by typical peak values of the BNO055 in m/s^2 and rad/s.
+
+        Returns:
+            FeatureTransform: The normalized transform, with thresholds in its own units.
+        """
+        return cls(
+            orientation='sincos',
+            orientation_scale=1.0,
+            flex_scale=1.0 / 1023.0,
+            acceleration_scale=1.0 / 10.0,
+            angular_velocity_scale=1.0 / 5.0,
+            axis_scale=0.1,
+            error_ranges={'static': 0.45, 'static_both': 0.65, 'dynamic': 0.45}
+        )
+
+    def get_config(self) -> dict:
+        """
+        Returns the parameters of the transform, so that indexes built with a different transform can be told apart.
+
+        Returns:
+            dict: The orientation encoding and the scales.
+        """
+        return {'orientation': self.orientation, **self.scales}
+
+    def transform(self, points) -> np.ndarray:
+        """
+        Transforms raw feature vectors of one or more hands.
+
+        Args:
+            points (array_like): Raw features of shape (..., k * HAND_FEATURES), k hands laid out one after the other.
+
+        Returns:
+            np.ndarray: The transformed features, of shape (..., k * hand_size).
+        """
+        points = np.asarray(points, dtype=float)
+        hands = points.reshape(points.shape[:-1] + (-1, HAND_FEATURES))
+        out = np.empty(hands.shape[:-1] + (self.hand_size,))
+
+        orientation_size = self.__ORIENTATION_SIZES[self.orientation]
+        out[..., :orientation_size] = self.__encode_orientation(hands[..., ORIENTATION])
+        out[..., :orientation_size] *= self.scales['orientation']
+
+        rest = out[..., orientation_size:]
+        rest[..., 0:5] = hands[..., FLEX] * self.scales['flex']
+        rest[..., 5:7] = hands[..., ACCELERATION] * self.scales['acceleration']
+        rest[..., 7:9] = hands[..., ANGULAR_VELOCITY] * self.scales['angular_velocity']
+        rest[..., 9:11] = hands[..., AXES] * self.scales['axis']
+
+        return out.reshape(points.shape[:-1] + (-1,))
+
+    def __encode_orientation(self, angles: np.ndarray) -> np.ndarray:
+        """
+        Encodes roll, pitch and yaw in degrees with the configured orientation encoding.
+
+        Args:
+            angles (np.ndarray): Angles of shape (..., 3).
+
+        Returns:
+            np.ndarray: The encoded orientation of shape (..., 3), (..., 6) or (..., 4).
+        """
+        if self.orientation == 'euler':
+            return angles
+
+        radians = np.radians(angles)
+        if self.orientation == 'sincos':
+            return np.concatenate((np.sin(radians), np.cos(radians)), axis=-1)
+
+        # Z-Y-X (yaw, pitch, roll) rotation, the same composition as pyquaternion's axis-angle products
+        half = radians / 2.0
+        cr, cp, cy = np.moveaxis(np.cos(half), -1, 0)
+        sr, sp, sy = np.moveaxis(np.sin(half), -1, 0)
+        quaternion = np.stack((
+            cr * cp * cy + sr * sp * sy,
+            sr * cp * cy - cr * sp * sy,
+            cr * sp * cy + sr * cp * sy,
+            cr * cp * sy - sr * sp * cy
+        ), axis=-1)
+        # q and -q are the same rotation; keep the scalar part non-negative so they map to the same point
+        return quaternion * np.where(quaternion[..., :1] < 0.0, -1.0, 1.0)
@@ -0,0 +1,119 @@
+import numpy as np
+from controllers.frame_parser import FRAME_WIDTH
+
+class FrameRingBuffer:
+    """
+    Preallocated history of the most recent parsed frames of one hand, with the host time of each frame.
+
+    Every frame is stored twice, at its slot and at the same slot in a mirrored second half, so the latest `n` frames
+    are always contiguous in memory and can be handed out as a view without copying. One slot more than the capacity
+    is allocated, so the slot being written by the reader is never part of a window returned to a reader.
+
+    The buffer has a single writer (the port reader thread). Views returned by `latest` stay valid until `capacity`
+    further frames have been committed.
+
+    Attributes:
+        capacity (int): The largest window that can be read.
+    """
+
+    def __init__(self, capacity: int = 256, width: int = FRAME_WIDTH):
+        """
+        Initializes the FrameRingBuffer class.
+
+        Args:
+            capacity (int): The number of frames kept.
+            width (int): The number of values in a frame.
+        """
+        self.capacity = capacity
+        self._slots = capacity + 1
+        self._frames = np.zeros((2 * self._slots, width))
+        self._timestamps = np.zeros(2 * self._slots)
+        self._count = 0
+
+    def next_slot(self) -> np.ndarray:
+        """
+        Returns the row the next frame has to be written into before calling `commit`.
+
+        Returns:
+            np.ndarray: A writable view of the next slot.
+        """
+        return self._frames[self._count % self._slots]
+
+    def commit(self, timestamp: float):
+        """
+        Publishes the frame written into `next_slot`.
+
+        Args:
+            timestamp (float): The monotonic host time at which the frame was read.
+        """
+        slot = self._count % self._slots
+        mirror = slot + self._slots
+        self._frames[mirror] = self._frames[slot]
+        self._timestamps[slot] = timestamp
+        self._timestamps[mirror] = timestamp
+        self._count += 1  # Single assignment, so readers never see a half-published frame
+
+    def latest(self, n: int):
+        """
+        Returns the most recent frames, oldest first.
+
+        Args:
+            n (int): The number of frames wanted. Fewer are returned if fewer have been committed.
+
+        Returns:
+            tuple: A (frames, timestamps) pair of read-only views of shape (n, width) and (n,).
+        """
+        frames, timestamps, _ = self.__window(self._count, n)
+        return frames, timestamps
+
+    def since(self, count: int):
+        """
+        Returns the frames committed after the buffer had `count` frames, oldest first.
+
+        Only the last `capacity` of them are returned if more were committed in between.
+
+        Args:
+            count (int): A value previously returned by `count` or `since`.
+
+        Returns:
+            tuple: A (frames, timestamps, count) triple, where count is the value to pass to the next call.
+        """
+        current = self._count
+        return self.__window(current, current - count)
+
+    def __window(self, count: int, n: int):
+        """
+        Returns read-only views of the last `n` frames as of when the buffer held `count` frames.
+        """
+        n = max(0, min(n, self.capacity, count))
+        end = count % self._slots + self._slots
+        frames = self._frames[end - n:end]
+        timestamps = self._timestamps[end - n:end]
+        frames.flags.writeable = False
+        timestamps.flags.writeable = False
+        return frames, timestamps, count
+
+    def last(self) -> np.ndarray:
+        """
+        Returns the most recent frame.
+
+        Returns:
+            np.ndarray or None: A view of the last committed frame, or None if the buffer is empty.
+        """
+        count = self._count
+        if count == 0:
+            return None
+        return self._frames[count % self._slots + self._slots - 1]
+
+    @property
+    def count(self):
+        """
+        Gets the total number of frames committed since the buffer was created.
+
+        Returns:
+            int: The number of committed frames.
+        """
+        return self._count
+
+    def __len__(self):
+        return min(self._count, self.capacity)
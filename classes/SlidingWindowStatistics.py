@@ -0,0 +1,100 @@
+import numpy as np
+
+class SlidingWindowStatistics:
+    """
+    Running mean and standard deviation of a vector of values over the last `window` samples.
+
+    Samples are added and the one leaving the window is removed with Welford's update, so the cost per sample is
+    constant regardless of the window size. The samples still inside the window are kept in a preallocated array so
+    they can be removed when they fall out of it.
+
+    Attributes:
+        window (int): The number of samples the statistics are computed over.
+    """
+
+    def __init__(self, window: int, size: int):
+        """
+        Initializes the SlidingWindowStatistics class.
+
+        Args:
+            window (int): The number of samples the statistics are computed over.
+            size (int): The number of values in a sample.
+        """
+        self.window = window
+        self._samples = np.zeros((window, size))
+        self._mean = np.zeros(size)
+        self._m2 = np.zeros(size)
+        self._delta = np.zeros(size)
+        self._next = 0
+        self._count = 0
+
+    def update(self, sample: np.ndarray):
+        """
+        Adds a sample, removing the oldest one if the window is full.
+
+        Args:
+            sample (np.ndarray): The values of the new sample.
+        """
+        if self._count == self.window:
+            self.__remove(self._samples[self._next])
+        self._samples[self._next] = sample
+        self._next = (self._next + 1) % self.window
+        self.__add(sample)
+
+    def __add(self, sample: np.ndarray):
+        self._count += 1
+        np.subtract(sample, self._mean, out=self._delta)
+        self._mean += self._delta / self._count
+        self._m2 += self._delta * (sample - self._mean)
+
+    def __remove(self, sample: np.ndarray):
+        self._count -= 1
+        if self._count == 0:
+            self._mean[:] = 0.0
+            self._m2[:] = 0.0
+            return
+        np.subtract(sample, self._mean, out=self._delta)
+        self._mean -= self._delta / self._count
+        self._m2 -= self._delta * (sample - self._mean)
+        np.maximum(self._m2, 0.0, out=self._m2)  # Rounding can leave tiny negative values
+
+    def reset(self):
+        """
+        Discards every sample.
+        """
+        self._mean[:] = 0.0
+        self._m2[:] = 0.0
+        self._next = 0
+        self._count = 0
+
+    @property
+    def count(self):
+        """
+        Gets the number of samples currently in the window.
+
+        Returns:
+            int: The number of samples.
+        """
+        return self._count
+
+    @property
+    def mean(self):
+        """
+        Gets the mean of the samples in the window.
+
+        Returns:
+            np.ndarray: The mean of each value.
+        """
+        return self._mean
+
+    @property
+    def std(self):
+        """
+        Gets the population standard deviation of the samples in the window, as np.std computes it.
+
+        Returns:
+            np.ndarray: The standard deviation of each value.
+        """
+        if self._count == 0:
+            return np.zeros_like(self._m2)
+        return np.sqrt(self._m2 / self._count)
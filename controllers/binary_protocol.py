@@ -0,0 +1,149 @@
+import binascii
+import struct
+
+import numpy as np
+
+from controllers.frame_parser import FRAME_WIDTH
+
+# Commands the host sends to switch the firmware between its text lines and binary frames
+BINARY_MODE_REQUEST = b'B'
+TEXT_MODE_REQUEST = b'T'
+
+# Layout of a binary frame, little-endian and packed, as read_all_data.ino sends it in binary mode:
+# sync (2 bytes), sequence number (uint16), device time in ms (uint32), euler, gyro and accel (9 float32),
+# finger flex (5 uint16), calibration status (4 uint8) and the CRC-16/CCITT-FALSE of everything between the sync bytes
+# and the CRC (uint16).
+SYNC = b'\xa5\x5a'
+_BODY = struct.Struct('<HI9f5H4B')
+_CRC = struct.Struct('<H')
+FRAME_SIZE = len(SYNC) + _BODY.size + _CRC.size
+
+# Longest text line kept while waiting for its line break, anything longer is noise
+_MAX_LINE = 512
+
+def encode_frame(row, sequence: int, device_time: int) -> bytes:
+    """
+    Encodes a frame the way the firmware sends it in binary mode.
+
+    Args:
+        row (array_like): The FRAME_WIDTH values of the frame, laid out as described in controllers.frame_parser.
+        sequence (int): The sequence number of the frame, wrapping around at 65536.
+        device_time (int): The milliseconds since the glove started, wrapping around at 2**32.
+
+    Returns:
+        bytes: The FRAME_SIZE bytes of the frame.
+    """
+    row = np.asarray(row)
+    body = _BODY.pack(sequence & 0xFFFF, device_time & 0xFFFFFFFF, *row[:9].tolist(), *row[9:14].astype(int).tolist(), *row[14:18].astype(int).tolist())
+    return SYNC + body + _CRC.pack(binascii.crc_hqx(body, 0xFFFF))
+
+class FrameStreamSplitter:
+    """
+    Splits the bytes read from a glove into text lines and binary frames.
+
+    Binary frames start with the sync bytes and are kept only when their CRC matches. After a corrupted frame the
+    splitter resynchronizes on the next sync bytes. Everything else is split into text lines at their line break, so a
+    glove that sends text, or switches from text to binary, is read without configuration.
+
+    Attributes:
+        crc_errors (int): The number of binary frames discarded because their CRC did not match.
+        skipped_bytes (int): The number of bytes discarded while resynchronizing.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.crc_errors = 0
+        self.skipped_bytes = 0
+
+    def feed(self, data: bytes) -> list:
+        """
+        Adds bytes read from the port.
+
+        Args:
+            data (bytes): The bytes.
+
+        Returns:
+            list: The complete text lines and valid binary frames, in the order they were received.
+        """
+        buffer = self._buffer
+        buffer += data
+        pieces = []
+        while buffer:
+            if buffer[0] == SYNC[0] and (len(buffer) < 2 or buffer[1] == SYNC[1]):
+                if len(buffer) < FRAME_SIZE:
+                    break
+                frame = bytes(buffer[:FRAME_SIZE])
+                if is_valid_frame(frame):
+                    pieces.append(frame)
+                    del buffer[:FRAME_SIZE]
+                else:
+                    # Resynchronize on the next sync bytes, the rest of a damaged frame is not text either
+                    self.crc_errors += 1
+                    skip = buffer.find(SYNC, 1)
+                    skip = skip if skip != -1 else len(buffer) - 1
+                    self.skipped_bytes += skip
+                    del buffer[:skip]
+                continue
+
+            end = buffer.find(b'\n')
+            sync = buffer.find(SYNC)
+            if sync != -1 and (end == -1 or sync < end):
+                self.skipped_bytes += sync  # The rest of a line cut off by a binary frame
+                del buffer[:sync]
+                continue
+            if end == -1:
+                if len(buffer) > _MAX_LINE:
+                    self.skipped_bytes += len(buffer)
+                    buffer.clear()
+                break
+            pieces.append(bytes(buffer[:end + 1]))
+            del buffer[:end + 1]
+        return pieces
+
+def is_valid_frame(data: bytes) -> bool:
+    """
+    Checks whether bytes are a whole binary frame with a matching CRC.
+
+    Args:
+        data (bytes): The bytes.
+
+    Returns:
+        bool: True if the bytes are a valid binary frame.
+    """
+    return (len(data) == FRAME_SIZE and data[:2] == SYNC
+            and binascii.crc_hqx(data[2:-2], 0xFFFF) == _CRC.unpack_from(data, FRAME_SIZE - 2)[0])
+
+class BinaryFrameDecoder:
+    """
+    Decodes the binary frames of one glove and counts the frames lost in between from their sequence numbers.
+
+    Attributes:
+        lost (int): The number of frames missing between the decoded ones.
+        device_time (int): The device time, in milliseconds, of the last decoded frame.
+    """
+
+    def __init__(self):
+        self._last_sequence = None
+        self.lost = 0
+        self.device_time = None
+
+    def decode_into(self, frame: bytes, out: np.ndarray) -> bool:
+        """
+        Writes the values of a binary frame into a row.
+
+        Args:
+            frame (bytes): A binary frame, as split by FrameStreamSplitter.
+            out (np.ndarray): A float row of FRAME_WIDTH elements to write the values into.
+
+        Returns:
+            bool: True if the frame was valid and `out` holds its values, False otherwise.
+        """
+        if not is_valid_frame(frame):
+            return False
+        values = _BODY.unpack_from(frame, len(SYNC))
+        sequence, device_time = values[0], values[1]
+        out[:FRAME_WIDTH] = values[2:]
+        if self._last_sequence is not None and device_time >= self.device_time:  # A rebooted glove starts over at 0
+            self.lost += (sequence - self._last_sequence - 1) & 0xFFFF
+        self._last_sequence, self.device_time = sequence, device_time
+        return True
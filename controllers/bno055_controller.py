@@ -1,20 +1,41 @@
 import serial
 import time
-from queue import Queue
-import psutil
+import threading
 from threading import Event
 import numpy as np
+from controllers.frame_synchronizer import FrameSynchronizer
+from controllers.frame_parser import FrameParser
+from classes.FrameRingBuffer import FrameRingBuffer
+from controllers.session_recorder import SessionRecorder
+from controllers.port_discovery import PortDiscovery
+from controllers.frame_handoff import FrameHandoff
+from services.metrics_service import MetricsRegistry
+from controllers.binary_protocol import BinaryFrameDecoder, FrameStreamSplitter, SYNC, BINARY_MODE_REQUEST, TEXT_MODE_REQUEST
 
 class SerialPortReader:
-    def __init__(self, port_left: str, port_right: str, data_queue: Queue, stop_event: Event, baud_rate: int = 115200, timeout: float = 0.3):
+    def __init__(self, port_left: str, port_right: str, data_queue: FrameHandoff, stop_event: Event, baud_rate: int = 115200, timeout: float = 0.3, max_skew: float = 0.15, frame_buffers: dict = None, recorder: SessionRecorder = None, startup_delay: float = 4.0, discovery: PortDiscovery = None, binary: bool = False, metrics: MetricsRegistry = None):
         """
         Initializes the SerialPortReader class with two serial ports.
 
         Args:
-            port_left (str): The name of the left serial port.
-            port_right (str): The name of the right serial port.
+            port_left (str, optional): The name of the left serial port. Both ports are discovered when it is None.
+            port_right (str, optional): The name of the right serial port. Both ports are discovered when it is None.
+            data_queue (FrameHandoff): Hands the completed pairs over to the consumer under its overload policy. The
+                reader never waits on it.
             baud_rate (int): The baud rate for both serial ports.
             timeout (float): The timeout for reading data from the serial ports.
+            max_skew (float): The largest time difference, in seconds, between the left and right frames of a pair.
+            frame_buffers (dict): The FrameRingBuffer of each hand, keyed by 'left' and 'right', that parsed frames are
+                written into. Frames put into the queue are views into these buffers. Defaults to new buffers.
+            recorder (SessionRecorder, optional): Records every raw line read from the ports, for later replay.
+            startup_delay (float): Seconds to wait after opening ports given by name, while the boards reboot.
+            discovery (PortDiscovery, optional): Finds the gloves and tells which is left and which is right. When it
+                is given with both ports, only those two are probed, so they can be given in any order. Defaults to a
+                PortDiscovery when the ports are not given.
+            binary (bool): Whether to ask the gloves for binary frames instead of text lines. Gloves that keep sending
+                text are still read, and asked again every second.
+            metrics (MetricsRegistry, optional): Receives the time spent parsing, validating and pairing each frame,
+                per hand, and the reader counters.
         """
         self.port_left = port_left
         self.port_right = port_right
@@ -22,47 +43,61 @@ class SerialPortReader:
         self.timeout = timeout
         self._data_queue = data_queue
         self._stop_event = stop_event
+        self._synchronizer = FrameSynchronizer(max_skew)
+        self._recorder = recorder
+        self._startup_delay = startup_delay
+        self._discovery = discovery
+        self.binary = binary
 
         # Initialize serial port objects
         self.ser_left = None
         self.ser_right = None
-        self.__data_left = None
-        self.__data_right = None
-        self.__expected_lengths = [3, 3, 3, 5, 4]
+        self.__reader_threads = []
+        self.__invalid_lines = {'left': 0, 'right': 0}
+        self.__valid_frames = {'left': 0, 'right': 0}
+        self.__parser = FrameParser()
+        self.__decoders = {'left': BinaryFrameDecoder(), 'right': BinaryFrameDecoder()}
+        self.__splitters = {'left': FrameStreamSplitter(), 'right': FrameStreamSplitter()}
+        self.frame_buffers = frame_buffers if frame_buffers is not None else {hand: FrameRingBuffer() for hand in ('left', 'right')}
         
+        if metrics is not None:
+            self.__parse_seconds = {hand: metrics.stage('parse', hand=hand) for hand in ('left', 'right')}
+            metrics.add_collector(self.__collect_metrics)
+        else:
+            self.__parse_seconds = None
+
         print('BNO055 controller initialized successfully.')
 
 
     def start(self):
         """
-        Starts reading from the configured serial ports and puts the data into a queue.
+        Starts reading from the configured serial ports and puts the paired data into the queue.
 
-        Args:
-            data_queue (Queue): The queue to store read data.
-            stop_event (Event): An event used to stop the serial reading.
+        Each port is read by its own thread, so a slow glove never stalls the other one. This call returns once the
+        stop event is set and both reader threads have finished.
         """
         try:
-            #make sure the ports are not in use
-            if self.__is_port_in_use(self.port_left) or self.__is_port_in_use(self.port_right):
-                self.__reset_arduino()
-                
-            # Open the serial ports
-            self.ser_left = serial.Serial(self.port_left, self.baud_rate, timeout=self.timeout)
-            self.ser_right = serial.Serial(self.port_right, self.baud_rate, timeout=self.timeout)
-            print(f"Serial ports {self.port_left} and {self.port_right} opened successfully.")
-            # Allow some time for ports to initialize
-            time.sleep(4)
+            if self._discovery is not None or self.port_left is None or self.port_right is None:
+                # The gloves are ready once they have been identified, there is nothing to wait for
+                self.__open_discovered_ports()
+            else:
+                # Open the serial ports, failing if another process already has them open
+                self.ser_left = serial.Serial(self.port_left, self.baud_rate, timeout=self.timeout, exclusive=True)
+                self.ser_right = serial.Serial(self.port_right, self.baud_rate, timeout=self.timeout, exclusive=True)
+                print(f"Serial ports {self.port_left} and {self.port_right} opened successfully.")
+                # Allow some time for ports to initialize
+                time.sleep(self._startup_delay)
+            for ser in (self.ser_left, self.ser_right):
+                ser.write(BINARY_MODE_REQUEST if self.binary else TEXT_MODE_REQUEST)
 
-            while not self._stop_event.is_set():
-                # Read and decode data from both ports
-                data_left = self.ser_left.readline().decode('utf-8').rstrip()
-                data_right = self.ser_right.readline().decode('utf-8').rstrip()
-                    
-                # If data is available, put it in the queue
-                if self._data_queue.not_full and self.__low_pass_filter(data_left, data_right):
-                    self._data_queue.put((self.__data_left, self.__data_right))
-                    self.ser_left.reset_input_buffer()
-                    self.ser_right.reset_input_buffer()
+            self.__reader_threads = [
+                threading.Thread(target=self._read_port, args=(self.ser_left, 'left'), name='serial-reader-left', daemon=True),
+                threading.Thread(target=self._read_port, args=(self.ser_right, 'right'), name='serial-reader-right', daemon=True)
+            ]
+            for thread in self.__reader_threads:
+                thread.start()
+                
+            self._stop_event.wait()
                     
         except serial.SerialException as e:
             print(f"Error opening the serial port: {e}")
@@ -71,86 +106,88 @@ class SerialPortReader:
             print(f"Permission denied accessing the serial port: {e}. Try running as Administrator or using sudo.")
             self._stop_event.set()
         except Exception as e:
-            self._data_queue.get()  # Remove the invalid data
+            print(f"Error reading the serial ports: {e}")
+            self._stop_event.set()
         finally:
+            for thread in self.__reader_threads:
+                thread.join()
             self.__close_ports()
             
-    def __reset_arduino(self):
-        """
-        Reset the Arduino by toggling the DTR (Data Terminal Ready) line.
-        
-        :param ser: The serial connection object.
-        """
-        self.ser_left.close()
-        self.ser_right.close()
-        time.sleep(1)
-        self.ser_left.open()
-        self.ser_right.open()
-                    
-    def __is_port_in_use(self, port):
+    def __open_discovered_ports(self):
         """
-        Check if a given serial port is currently in use by any process.
-        
-        :param port: The serial port to check (e.g., 'COM3', '/dev/ttyUSB0').
-        :return: Boolean indicating whether the port is in use.
+        Opens the ports of the gloves found by the discovery, among the given ports if both were given.
         """
-        for proc in psutil.process_iter(['pid', 'name', 'connections']):
-            for conn in proc.info['connections']:
-                if conn.laddr.port == int(port.split('COM')[1]) or port in conn.laddr:
-                    return True
-        return False
-    
-    def __low_pass_filter(self, string_left: str, string_right: str):
+        discovery = self._discovery if self._discovery is not None else PortDiscovery(self.baud_rate)
+        given = [self.port_left, self.port_right] if self.port_left is not None and self.port_right is not None else None
+        ports = discovery.discover(given)
+        self.ser_left, self.ser_right = ports['left'], ports['right']
+        for ser in (self.ser_left, self.ser_right):
+            ser.timeout = self.timeout
+        self.port_left, self.port_right = self.ser_left.port, self.ser_right.port
+
+    def _read_port(self, ser: serial.Serial, hand: str):
         """
-        Applies a low-pass filter to the input strings and returns wether the filtered data is usable or not.
+        Reads from one serial port until the stop event is set, stamping what is read with the host monotonic time.
+
+        The bytes are split into text lines and binary frames, which are recorded if a recorder is set, then handed to
+        `handle_line`. Reading whatever is waiting at once costs one call per burst instead of one per byte.
 
         Args:
-            string_left (str): The left string to be filtered.
-            string_right (str): The right string to be filtered.
+            ser (serial.Serial): The open serial port of the glove.
+            hand (str): 'left' or 'right'.
+        """
+        try:
+            splitter = self.__splitters[hand]
+            last_request = time.monotonic()
+            while not self._stop_event.is_set():
+                data = ser.read(ser.in_waiting or 1)
+                timestamp = time.monotonic()
+                if not data:
+                    continue
+                for line in splitter.feed(data):
+                    if self._recorder is not None:
+                        self._recorder.record(hand, timestamp, line)
+                    self.handle_line(hand, timestamp, line)
+                    if self.binary and not line.startswith(SYNC) and timestamp - last_request > 1.0:
+                        ser.write(BINARY_MODE_REQUEST)  # The glove rebooted or missed the request
+                        last_request = timestamp
+                    
+        except serial.SerialException as e:
+            print(f"Error reading the {hand} serial port: {e}")
+            self._stop_event.set()
 
-        Returns:
-            bool: True if the filtering is successful, False otherwise.
+    def handle_line(self, hand: str, timestamp: float, line: bytes):
         """
-        def validate_and_parse(string: str):
-            """
-            Validates and parses a string into a list of float arrays.
+        Processes one raw line or binary frame of a glove, read from its port or replayed from a recorded session.
 
-            Args:
-                string (str): The string to be validated and parsed.
+        The line is parsed, or the frame decoded, into the next slot of the hand's frame buffer, a valid frame is committed to the buffer and
+        handed to the synchronizer, and a completed left/right pair is put into the queue together with the time at
+        which it was completed. Lines of one hand must come from a single thread.
 
-            Returns:
-                list: A list of float arrays if the string is valid and can be parsed, None otherwise.
-            """
-            segments = string.split('*')
-            
-            # Validate the number of segments
-            if len(segments) != len(self.__expected_lengths):
-                return None
-            
-            try:
-                # Split each segment by ',' and convert to float arrays
-                parsed_data = [
-                    np.fromstring(segment, sep=',', dtype=float)
-                    for segment in segments
-                ]
-                
-                # Validate the length of each segment
-                if any(len(elements) != expected_length 
-                    for elements, expected_length in zip(parsed_data, self.__expected_lengths)):
-                    return None
-            except ValueError:
-                return None
-            
-            return parsed_data
-        
-        self.__data_left = validate_and_parse(string_left)
-        self.__data_right = validate_and_parse(string_right)
-        
-        if self.__data_left is None or self.__data_right is None:
-            return False
+        Args:
+            hand (str): 'left' or 'right'.
+            timestamp (float): The monotonic host time at which the line was read.
+            line (bytes): The raw line or binary frame, as sent by the glove.
+        """
+        started = time.perf_counter()
+        frame_buffer = self.frame_buffers[hand]
+        data = frame_buffer.next_slot()
+        if line.startswith(SYNC):
+            valid = self.__decoders[hand].decode_into(line, data)
+        else:
+            valid = self.__parser.parse_into(line, data)
+        if not valid:
+            self.__invalid_lines[hand] += 1
+            return
+        frame_buffer.commit(timestamp)
+        self.__valid_frames[hand] += 1
         
-        return True
-
+        pair = self._synchronizer.push(hand, timestamp, data)
+        if pair is not None:
+            self._data_queue.put(pair + (timestamp,), timestamp)
+        if self.__parse_seconds is not None:
+            self.__parse_seconds[hand].observe(time.perf_counter() - started)
+            
     def __close_ports(self):
         """Close the serial ports if they are open."""
         if self.ser_left and self.ser_left.is_open:
@@ -158,6 +195,37 @@ class SerialPortReader:
         if self.ser_right and self.ser_right.is_open:
             self.ser_right.close()
             
+    def get_statistics(self):
+        """
+        Returns the reader counters.
+
+        Returns:
+            dict: The synchronizer counters plus, per hand, the number of valid frames read, of malformed lines
+                discarded, of binary frames discarded for a wrong CRC, and of binary frames lost on the way according to
+                their sequence numbers.
+        """
+        statistics = self._synchronizer.get_statistics()
+        statistics['frames'] = dict(self.__valid_frames)
+        statistics['invalid'] = dict(self.__invalid_lines)
+        statistics['crc_errors'] = {hand: splitter.crc_errors for hand, splitter in self.__splitters.items()}
+        statistics['lost'] = {hand: decoder.lost for hand, decoder in self.__decoders.items()}
+        return statistics
+            
+    def __collect_metrics(self):
+        """
+        Reports the reader counters as metrics samples, see MetricsRegistry.add_collector.
+        """
+        statistics = self.get_statistics()
+        yield 'signify_pairs_total', 'counter', 'Left/right frame pairs handed to the main loop.', {}, statistics['paired']
+        for name, key, description in (('signify_frames_total', 'frames', 'Valid frames read from each glove.'),
+                                       ('signify_invalid_lines_total', 'invalid', 'Malformed lines discarded.'),
+                                       ('signify_crc_errors_total', 'crc_errors', 'Binary frames discarded for a wrong CRC.'),
+                                       ('signify_lost_frames_total', 'lost', 'Binary frames lost on the way, from their sequence numbers.'),
+                                       ('signify_unpaired_frames_total', 'unpaired', 'Frames that found no partner of the other hand.'),
+                                       ('signify_sync_dropped_frames_total', 'dropped', 'Frames pushed out while waiting for a partner.')):
+            for hand, value in statistics[key].items():
+                yield name, 'counter', description, {'hand': hand}, value
+
     def stop(self):
         self._stop_event.set()
 
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import deque
+
+class FrameHandoff:
+    """
+    Hands the frame pairs of the serial reader over to the main loop, under an explicit overload policy.
+
+    The reader never blocks on `put` with the live policies, so the gloves are always read at their own pace:
+
+    * 'latest': only the most recent pair is kept. Pairs the main loop did not take in time are dropped, for the lowest
+      latency.
+    * 'fifo': pairs are delivered in order, up to `capacity` waiting. When the main loop falls further behind, the
+      oldest pair is dropped, so no motion data is lost under short bursts of load.
+    * 'decimate': pairs are delivered in order at no more than `rate` per second, the others are decimated at once.
+      Up to `capacity` pairs wait, as with 'fifo'.
+    * 'lossless': pairs are delivered in order and none is ever dropped. When `capacity` pairs are waiting, `put` blocks
+      until the main loop takes one. Meant for replaying a recorded session, which can wait for the main loop, unlike
+      the gloves.
+
+    With `max_age`, pairs that waited longer than that are skipped as stale when their turn comes.
+    """
+
+    POLICIES = ('latest', 'fifo', 'decimate', 'lossless')
+
+    def __init__(self, policy: str = 'latest', capacity: int = 50, rate: float = None, max_age: float = None):
+        """
+        Initializes the FrameHandoff class.
+
+        Args:
+            policy (str): The overload policy, one of POLICIES.
+            capacity (int): The largest number of waiting pairs, for the 'fifo', 'decimate' and 'lossless' policies.
+            rate (float, optional): The largest number of pairs per second delivered by the 'decimate' policy.
+            max_age (float, optional): Seconds after which a waiting pair is stale, None to never skip pairs.
+
+        Raises:
+            ValueError: If the policy is unknown, or 'decimate' is given no rate.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown handoff policy '{policy}', expected one of {self.POLICIES}.")
+        if policy == 'decimate' and not rate:
+            raise ValueError("The 'decimate' policy needs a rate.")
+        self.policy = policy
+        self.capacity = 1 if policy == 'latest' else capacity
+        self.rate = rate
+        self.max_age = max_age
+        self._interval = 1.0 / rate if rate else 0.0
+        self._next_due = None
+        self._pairs = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._statistics = {'offered': 0, 'delivered': 0, 'dropped': 0, 'decimated': 0, 'stale': 0}
+
+    def put(self, pair: tuple, timestamp: float) -> bool:
+        """
+        Offers a pair to the main loop, without blocking except with the 'lossless' policy while it is full.
+
+        Args:
+            pair (tuple): The (left, right, timestamp) pair.
+            timestamp (float): The monotonic time at which the pair was completed.
+
+        Returns:
+            bool: False if the pair was decimated or the handoff is closed, True if it is waiting to be taken.
+        """
+        with self._condition:
+            if self._closed:
+                return False
+            self._statistics['offered'] += 1
+            if self.policy == 'decimate':
+                if self._next_due is not None and timestamp < self._next_due:
+                    self._statistics['decimated'] += 1
+                    return False
+                self._next_due = (self._next_due or timestamp) + self._interval
+                if self._next_due <= timestamp:
+                    self._next_due = timestamp + self._interval  # Do not make up for an idle stretch with a burst
+
+            if self.policy == 'lossless':
+                while len(self._pairs) >= self.capacity and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return False
+            elif len(self._pairs) >= self.capacity:
+                self._pairs.popleft()
+                self._statistics['dropped'] += 1
+            self._pairs.append((pair, timestamp))
+            self._condition.notify_all()  # Wakes the main loop, not just another reader waiting for room
+            return True
+
+    def get(self, timeout: float = None):
+        """
+        Takes the next pair, waiting for one if there is none.
+
+        Args:
+            timeout (float, optional): The longest time to wait, None to wait until a pair arrives or the handoff is
+                closed.
+
+        Returns:
+            tuple or None: The next pair, or None if the timeout expired or the handoff was closed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                while not self._pairs and not self._closed:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self._condition.wait(remaining)
+                if self._closed:
+                    return None
+
+                pair, timestamp = self._pairs.popleft()
+                if self.policy == 'lossless':
+                    self._condition.notify_all()  # Makes room for a reader waiting in put
+                if self.max_age is not None and time.monotonic() - timestamp > self.max_age:
+                    self._statistics['stale'] += 1
+                    continue
+                self._statistics['delivered'] += 1
+                return pair
+
+    def empty(self) -> bool:
+        """
+        Checks whether no pair is waiting.
+
+        Returns:
+            bool: True if there is no pair to take.
+        """
+        with self._condition:
+            return not self._pairs
+
+    def close(self):
+        """
+        Wakes the main loop if it is waiting for a pair, and a reader waiting for room. Later pairs are refused.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def get_statistics(self):
+        """
+        Returns the handoff counters.
+
+        Returns:
+            dict: The number of pairs offered by the reader, delivered to the main loop, dropped because the main loop
+                fell behind, decimated and skipped as stale.
+        """
+        with self._condition:
+            return dict(self._statistics)
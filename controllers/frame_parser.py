@@ -0,0 +1,69 @@
+import numpy as np
+
+# Layout of a parsed frame row, in the order the firmware prints the segments
+FRAME_WIDTH = 18
+EULER = slice(0, 3)
+GYRO = slice(3, 6)
+ACCEL = slice(6, 9)
+FLEX = slice(9, 14)
+CALIBRATION = slice(14, 18)
+
+class FrameParser:
+    """
+    Parses the lines printed by the gloves straight from the raw bytes read from the serial port.
+
+    A line holds five '*'-separated segments of ','-separated numbers: euler angles (3), angular velocity (3),
+    linear acceleration (3), finger flex (5) and calibration status (accel, gyro, mag, system). The 18 values are
+    written into a caller-provided float row, so no intermediate strings or arrays are kept per frame.
+    """
+
+    EXPECTED_LENGTHS = (3, 3, 3, 5, 4)
+
+    def __init__(self):
+        """
+        Initializes the FrameParser class.
+        """
+        self.__expected_separators = tuple(length - 1 for length in self.EXPECTED_LENGTHS)
+
+    def parse_into(self, line: bytes, out: np.ndarray) -> bool:
+        """
+        Validates a line and writes its values into `out`.
+
+        The line is rejected when it does not have exactly five segments, when a segment does not hold the expected
+        number of values, or when a value is not a number. `out` may be partially written when the line is rejected.
+
+        Args:
+            line (bytes): The raw line, with or without the trailing line break.
+            out (np.ndarray): A float row of FRAME_WIDTH elements to write the values into.
+
+        Returns:
+            bool: True if the line was valid and `out` holds its values, False otherwise.
+        """
+        segments = line.split(b'*')
+        if len(segments) != len(self.__expected_separators):
+            return False
+
+        for segment, separators in zip(segments, self.__expected_separators):
+            if segment.count(b',') != separators:
+                return False
+
+        try:
+            # numpy converts the byte tokens to float itself and tolerates the trailing '\r\n'
+            out[:] = line.replace(b'*', b',').split(b',')
+        except ValueError:
+            return False
+
+        return True
+
+    def parse(self, line: bytes):
+        """
+        Validates a line and returns its values in a new row.
+
+        Args:
+            line (bytes): The raw line, with or without the trailing line break.
+
+        Returns:
+            np.ndarray or None: The FRAME_WIDTH values of the line, or None if the line is malformed.
+        """
+        row = np.empty(FRAME_WIDTH)
+        return row if self.parse_into(line, row) else None
@@ -0,0 +1,101 @@
+import threading
+from collections import deque
+
+class FrameSynchronizer:
+    """
+    Pairs the frames of the left and right gloves by their host arrival time.
+
+    Each port reader pushes its frames independently, stamped with `time.monotonic()`. A frame is paired with the
+    pending frame of the other hand whose timestamp is nearest to its own, provided they are no more than `max_skew`
+    seconds apart. Frames that can no longer find a partner are discarded and counted as unpaired, and frames pushed
+    out of a full pending list are counted as dropped.
+    """
+
+    HANDS = ('left', 'right')
+
+    def __init__(self, max_skew: float = 0.15, max_pending: int = 8):
+        """
+        Initializes the FrameSynchronizer class.
+
+        Args:
+            max_skew (float): The largest time difference, in seconds, allowed between the two frames of a pair.
+            max_pending (int): The number of frames kept per hand while waiting for a partner.
+        """
+        self.max_skew = max_skew
+        self._max_pending = max_pending
+        self._pending = {hand: deque() for hand in self.HANDS}
+        self._lock = threading.Lock()
+
+        self.paired = 0
+        self.unpaired = {hand: 0 for hand in self.HANDS}
+        self.dropped = {hand: 0 for hand in self.HANDS}
+        self.last_skew = 0.0
+
+    def push(self, hand: str, timestamp: float, frame):
+        """
+        Adds a frame of one hand and pairs it with the nearest pending frame of the other hand, if any.
+
+        Args:
+            hand (str): 'left' or 'right'.
+            timestamp (float): The monotonic host time at which the frame was read.
+            frame: The parsed frame.
+
+        Returns:
+            tuple or None: The (left_frame, right_frame) pair if one was completed, None otherwise.
+        """
+        other = 'right' if hand == 'left' else 'left'
+
+        with self._lock:
+            self.__expire(timestamp - self.max_skew)
+
+            candidates = self._pending[other]
+            if candidates:
+                nearest = min(range(len(candidates)), key=lambda i: abs(candidates[i][0] - timestamp))
+                skew = abs(candidates[nearest][0] - timestamp)
+
+                if skew <= self.max_skew:
+                    # Older frames of the other hand were skipped over by this pairing and cannot be used anymore
+                    for _ in range(nearest):
+                        candidates.popleft()
+                        self.unpaired[other] += 1
+                    _, other_frame = candidates.popleft()
+
+                    self.paired += 1
+                    self.last_skew = skew
+                    return (frame, other_frame) if hand == 'left' else (other_frame, frame)
+
+            pending = self._pending[hand]
+            if len(pending) >= self._max_pending:
+                pending.popleft()
+                self.dropped[hand] += 1
+            pending.append((timestamp, frame))
+
+        return None
+
+    def __expire(self, oldest_usable: float):
+        """
+        Discards the pending frames that are too old to be paired with any frame arriving from now on.
+
+        Args:
+            oldest_usable (float): Frames stamped before this time are discarded.
+        """
+        for hand in self.HANDS:
+            pending = self._pending[hand]
+            while pending and pending[0][0] < oldest_usable:
+                pending.popleft()
+                self.unpaired[hand] += 1
+
+    def get_statistics(self):
+        """
+        Returns the pairing counters.
+
+        Returns:
+            dict: Paired frame count, unpaired and dropped counts per hand and the skew of the last pair in seconds.
+        """
+        with self._lock:
+            return {
+                'paired': self.paired,
+                'unpaired': dict(self.unpaired),
+                'dropped': dict(self.dropped),
+                'last_skew': self.last_skew,
+            }
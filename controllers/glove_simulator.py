@@ -0,0 +1,306 @@
+"""
+Simulates the two gloves on a pair of Linux pseudo-terminals, so the pipeline can run without hardware.
+
+Each glove writes lines in the format of arduino/read_all_data/read_all_data.ino to its own pty. SerialPortReader opens
+the pty paths as it would open the real ports.
+
+Usage:
+    python -m controllers.glove_simulator [--rate 3.33] [--jitter 0] [--corrupt 0] [--skew 0]
+                                          [--disconnect-every 0] [--disconnect-for 2] [--duration 0]
+
+    then, in another terminal, with the two paths it prints:
+    python signify.py --ports /dev/pts/N /dev/pts/M
+
+    The ports can be given in any order, the gloves are told apart by their handshake:
+    python signify.py --ports /dev/pts/M /dev/pts/N --identify
+"""
+
+import argparse
+import errno
+import math
+import os
+import threading
+import time
+import tty
+from threading import Event
+
+import numpy as np
+
+from controllers.port_discovery import HANDSHAKE_REQUEST, HANDSHAKE_REPLY
+from controllers.binary_protocol import encode_frame, BINARY_MODE_REQUEST, TEXT_MODE_REQUEST
+
+_HANDS = ('left', 'right')
+
+class GloveSimulator:
+    """
+    Writes synthetic glove frames to two pseudo-terminals, one per hand.
+
+    Frames follow a slow random motion of the hand and its fingers, with calibration status 3. On top of that the
+    simulator can add the faults seen with real gloves: jitter on the send period, corrupted lines, disconnections that
+    cut a line in half and go silent for a while, and a constant delay of the right glove behind the left one.
+
+    Like a real UART, the simulator never waits for a slow reader: lines that do not fit in the pty buffer are dropped.
+    Like the firmware, each glove answers the handshake of PortDiscovery with its hand before its next line, and
+    switches to binary frames, or back to text lines, when the host asks for it.
+
+    Attributes:
+        ports (dict): The pty path of each hand, once `open` has been called.
+        statistics (dict): Per hand counters of lines written, corrupted, dropped and of disconnections.
+    """
+
+    def __init__(self, rate: float = 1000.0 / 300.0, jitter: float = 0.0, corruption: float = 0.0, skew: float = 0.0,
+                 disconnect_every: float = 0.0, disconnect_duration: float = 2.0, seed: int = None, handshake: bool = True):
+        """
+        Initializes the GloveSimulator class.
+
+        Args:
+            rate (float): Lines per second sent by each glove. The firmware sends one every 300 ms.
+            jitter (float): The largest random deviation, in seconds, of the time between two lines.
+            corruption (float): The probability of a line being corrupted.
+            skew (float): Seconds the right glove lags behind the left one.
+            disconnect_every (float): Mean seconds between two disconnections of a glove, 0 to never disconnect.
+            disconnect_duration (float): Seconds a disconnected glove stays silent.
+            seed (int, optional): Seed of the random generator, for reproducible runs.
+            handshake (bool): Whether the gloves answer the handshake, as the current firmware does.
+        """
+        self.rate = rate
+        self.jitter = jitter
+        self.corruption = corruption
+        self.skew = skew
+        self.disconnect_every = disconnect_every
+        self.disconnect_duration = disconnect_duration
+        self.handshake = handshake
+        self.ports = {}
+        self.statistics = {hand: {'written': 0, 'corrupted': 0, 'dropped': 0, 'disconnections': 0} for hand in _HANDS}
+        self._seed = seed
+        self._stop_event = Event()
+        self._masters = {}
+        self._slaves = {}
+        self._threads = []
+
+    def open(self):
+        """
+        Creates the two pseudo-terminals.
+
+        Returns:
+            tuple: The (left, right) pty paths to give to SerialPortReader.
+        """
+        for hand in _HANDS:
+            master, slave = os.openpty()
+            tty.setraw(slave)  # No echo and no CR/LF translation, the reader must get the bytes as written
+            os.set_blocking(master, False)
+            self._masters[hand] = master
+            self._slaves[hand] = slave  # Kept open so the pty survives the reader closing and reopening it
+            self.ports[hand] = os.ttyname(slave)
+        return self.ports['left'], self.ports['right']
+
+    def start(self):
+        """
+        Starts one writer thread per glove. `open` is called first if needed.
+        """
+        if not self.ports:
+            self.open()
+        start = time.monotonic()
+        seeds = np.random.SeedSequence(self._seed).spawn(len(_HANDS))
+        self._threads = [
+            threading.Thread(target=self._write_glove, args=(hand, start + (self.skew if hand == 'right' else 0.0), np.random.default_rng(seed)),
+                             name=f'glove-simulator-{hand}', daemon=True)
+            for hand, seed in zip(_HANDS, seeds)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """
+        Stops the writer threads and closes the pseudo-terminals.
+        """
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+        for fd in list(self._masters.values()) + list(self._slaves.values()):
+            os.close(fd)
+        self._masters.clear()
+        self._slaves.clear()
+
+    def _write_glove(self, hand: str, start: float, rng: np.random.Generator):
+        """
+        Writes the lines of one glove until the simulator is stopped.
+
+        Args:
+            hand (str): 'left' or 'right'.
+            start (float): The monotonic time of the first line.
+            rng (np.random.Generator): The random generator of this glove.
+        """
+        statistics = self.statistics[hand]
+        period = 1.0 / self.rate
+        state = self.__initial_state(rng)
+        next_time = start
+        next_disconnection = start + self.__time_to_disconnection(rng)
+        binary = False
+        sequence = 0
+
+        while not self._stop_event.is_set():
+            delay = next_time - time.monotonic()
+            if delay > 0 and self._stop_event.wait(delay):
+                break
+
+            for command in self.__read(hand):
+                if command == HANDSHAKE_REQUEST[0] and self.handshake:
+                    self.__write(hand, HANDSHAKE_REPLY + hand.encode('ascii') + b'\r\n')
+                elif command in BINARY_MODE_REQUEST + TEXT_MODE_REQUEST:
+                    binary = command == BINARY_MODE_REQUEST[0]
+
+            frame = self.__next_frame(state, period, rng)
+            if binary:
+                line = encode_frame(frame, sequence, int((next_time - start) * 1000))
+            else:
+                line = self.format_frame(frame)
+            sequence += 1
+            if next_time >= next_disconnection:
+                # The glove goes away in the middle of a line and comes back after a while
+                self.__write(hand, line[:rng.integers(1, len(line))])
+                statistics['disconnections'] += 1
+                next_time += self.disconnect_duration
+                next_disconnection = next_time + self.__time_to_disconnection(rng)
+                continue
+
+            if rng.random() < self.corruption:
+                line = self.__flip_byte(line, rng) if binary else self.__corrupt(line, rng)
+                statistics['corrupted'] += 1
+            if self.__write(hand, line):
+                statistics['written'] += 1
+            else:
+                statistics['dropped'] += 1
+
+            next_time += max(0.0, period + rng.uniform(-self.jitter, self.jitter))
+
+    def __write(self, hand: str, data: bytes) -> bool:
+        """
+        Writes bytes to the pty of a glove without blocking.
+
+        Returns:
+            bool: Whether the whole data was written.
+        """
+        try:
+            return os.write(self._masters[hand], data) == len(data)
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EIO):
+                return False  # The pty buffer is full, or nobody has the port open
+            raise
+
+    def __read(self, hand: str) -> bytes:
+        """
+        Reads what the host sent to a glove, without blocking.
+        """
+        try:
+            return os.read(self._masters[hand], 1024)
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EIO):
+                return b''
+            raise
+
+    def __time_to_disconnection(self, rng: np.random.Generator) -> float:
+        if self.disconnect_every <= 0:
+            return math.inf
+        return rng.exponential(self.disconnect_every)
+
+    @staticmethod
+    def __initial_state(rng: np.random.Generator) -> dict:
+        return {
+            'euler': rng.uniform((0.0, -60.0, -90.0), (360.0, 60.0, 90.0)),
+            'euler_velocity': np.zeros(3),
+            'flex': rng.uniform(0.0, 1023.0, 5),
+        }
+
+    @staticmethod
+    def __next_frame(state: dict, period: float, rng: np.random.Generator) -> np.ndarray:
+        """
+        Moves the simulated hand by one period and returns the frame the glove would send.
+        """
+        state['euler_velocity'] = 0.9 * state['euler_velocity'] + rng.normal(0.0, 20.0, 3)
+        state['euler'] = state['euler'] + state['euler_velocity'] * period
+        state['euler'][0] %= 360.0
+        state['euler'][1:] = np.clip(state['euler'][1:], (-90.0, -180.0), (90.0, 180.0))
+        state['flex'] = np.clip(state['flex'] + rng.normal(0.0, 5.0, 5), 0.0, 1023.0)
+
+        frame = np.empty(18)
+        frame[0:3] = state['euler']
+        frame[3:6] = np.radians(state['euler_velocity']) + rng.normal(0.0, 0.01, 3)
+        frame[6:9] = rng.normal(0.0, 0.05, 3)
+        frame[9:14] = np.round(state['flex'])
+        frame[14:18] = 3
+        return frame
+
+    @staticmethod
+    def format_frame(frame: np.ndarray) -> bytes:
+        """
+        Formats a frame as read_all_data.ino prints it: floats with two decimals, integers for the flex and
+        calibration values, groups separated by '*' and a CRLF at the end.
+
+        Args:
+            frame (np.ndarray): The 18 values of the frame, laid out as described in controllers.frame_parser.
+
+        Returns:
+            bytes: The line.
+        """
+        floats = ','.join(f'{value:.2f}' for value in frame[0:3]), ','.join(f'{value:.2f}' for value in frame[3:6]), ','.join(f'{value:.2f}' for value in frame[6:9])
+        integers = ','.join(str(int(value)) for value in frame[9:14]), ','.join(str(int(value)) for value in frame[14:18])
+        return ('*'.join(floats + integers) + '\r\n').encode('ascii')
+
+    @staticmethod
+    def __flip_byte(frame: bytes, rng: np.random.Generator) -> bytes:
+        """
+        Damages a binary frame with a flipped byte after its sync bytes, which its CRC must catch.
+        """
+        position = int(rng.integers(2, len(frame)))
+        return frame[:position] + bytes([frame[position] ^ 0xFF]) + frame[position + 1:]
+
+    @staticmethod
+    def __corrupt(line: bytes, rng: np.random.Generator) -> bytes:
+        """
+        Damages a line the way a noisy link does: a lost tail, a flipped byte or a lost separator.
+        """
+        kind = rng.integers(3)
+        body = line[:-2]
+        position = int(rng.integers(len(body)))
+        if kind == 0:
+            body = body[:position]
+        elif kind == 1:
+            body = body[:position] + bytes([int(rng.integers(128, 256))]) + body[position + 1:]
+        else:
+            separators = [i for i, byte in enumerate(body) if byte in b',*']
+            position = separators[int(rng.integers(len(separators)))]
+            body = body[:position] + body[position + 1:]
+        return body + b'\r\n'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rate', type=float, default=1000.0 / 300.0, help='lines per second per glove (default: the firmware rate)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='largest random deviation of the send period, in seconds')
+    parser.add_argument('--corrupt', type=float, default=0.0, help='probability of a corrupted line')
+    parser.add_argument('--skew', type=float, default=0.0, help='seconds the right glove lags behind the left one')
+    parser.add_argument('--disconnect-every', type=float, default=0.0, help='mean seconds between disconnections, 0 for none')
+    parser.add_argument('--disconnect-for', type=float, default=2.0, help='seconds a disconnected glove stays silent')
+    parser.add_argument('--duration', type=float, default=0.0, help='seconds to run, 0 to run until interrupted')
+    parser.add_argument('--seed', type=int, help='seed of the random generator')
+    args = parser.parse_args()
+
+    simulator = GloveSimulator(args.rate, args.jitter, args.corrupt, args.skew, args.disconnect_every, args.disconnect_for, args.seed)
+    left, right = simulator.open()
+    print(f'Left glove: {left}\nRight glove: {right}\nRun: python signify.py --ports {left} {right}')
+    simulator.start()
+    try:
+        if args.duration > 0:
+            time.sleep(args.duration)
+        else:
+            while True:
+                time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+        for hand, statistics in simulator.statistics.items():
+            print(f'{hand}: {statistics}')
+
+if __name__ == '__main__':
+    main()
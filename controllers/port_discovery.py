@@ -0,0 +1,205 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import serial
+from serial.tools import list_ports
+
+from controllers.frame_parser import FrameParser
+from controllers.binary_protocol import FrameStreamSplitter, SYNC
+
+# Sent to a glove to ask which hand it is worn on, answered with HANDSHAKE_REPLY followed by 'left' or 'right'
+HANDSHAKE_REQUEST = b'?'
+HANDSHAKE_REPLY = b'SIGNIFY,'
+
+_HANDS = ('left', 'right')
+
+class PortDiscovery:
+    """
+    Finds the serial ports of the two gloves and tells the left one from the right one.
+
+    Candidates are the USB serial devices the operating system lists, which costs no port access. They are all opened
+    and probed in parallel: a port is a glove once it sends a valid text line or binary frame, and only then is it
+    asked for its hand, so other devices never receive a byte. Gloves whose firmware does not answer are identified by
+    the mapping cached on the previous run, or else by the order of their device names.
+
+    The mapping from each USB device to its hand is cached in a file. Ports of the cache are asked for their hand as
+    soon as they are open, so known gloves are identified within one firmware loop. Once both gloves have answered,
+    the probes of the other ports are stopped instead of waiting for their timeout.
+    """
+
+    def __init__(self, baud_rate: int = 115200, cache_path: str = 'resources/glove_ports.json', timeout: float = 3.0, handshake_timeout: float = 0.5):
+        """
+        Initializes the PortDiscovery class.
+
+        Args:
+            baud_rate (int): The baud rate of the gloves.
+            cache_path (str, optional): The file the mapping from USB devices to hands is cached in, None to not cache it.
+            timeout (float): The longest time to wait for a port to send a frame, covering a board that reboots when
+                its port is opened.
+            handshake_timeout (float): The longest time to wait for the answer of a glove to the handshake.
+        """
+        self.baud_rate = baud_rate
+        self.cache_path = cache_path
+        self.timeout = timeout
+        self.handshake_timeout = handshake_timeout
+        self.__parser = FrameParser()
+
+    @staticmethod
+    def get_port_key(port) -> str:
+        """
+        Returns what identifies a USB serial device across restarts.
+
+        Args:
+            port (ListPortInfo): The port, as listed by serial.tools.list_ports.
+
+        Returns:
+            str: The serial number of the adapter, or its USB location for adapters without one, e.g. the CH340.
+        """
+        return port.serial_number or port.location or port.hwid or port.device
+
+    def list_candidates(self) -> dict:
+        """
+        Lists the USB serial devices, without opening any of them.
+
+        Returns:
+            dict: The key of each device, see `get_port_key`, by device name.
+        """
+        return {port.device: self.get_port_key(port) for port in list_ports.comports() if port.vid is not None}
+
+    def discover(self, devices=None) -> dict:
+        """
+        Opens the ports of both gloves.
+
+        Args:
+            devices (iterable, optional): The device names to probe, each used as its own key in the cache. Defaults
+                to every candidate of `list_candidates`.
+
+        Returns:
+            dict: The open serial.Serial of each hand, keyed by 'left' and 'right'.
+
+        Raises:
+            serial.SerialException: If two gloves were not found.
+        """
+        start = time.monotonic()
+        keys = self.list_candidates() if devices is None else {device: device for device in devices}
+        cache = self.__load_cache()
+        if not keys:
+            raise serial.SerialException('No USB serial device was found, check that both gloves are plugged in.')
+
+        stop_event = threading.Event()
+        gloves = []
+        with ThreadPoolExecutor(max_workers=len(keys)) as pool:
+            probes = {pool.submit(self._probe, device, keys[device] in cache, stop_event): device for device in keys}
+            for probe in as_completed(probes):
+                ser, hand = probe.result()
+                if ser is None:
+                    continue
+                if stop_event.is_set():
+                    ser.close()  # Both gloves were already found
+                    continue
+                gloves.append((probes[probe], ser, hand))
+                if {hand for _, _, hand in gloves} >= set(_HANDS):
+                    stop_event.set()  # Both gloves answered, the other ports are not worth waiting for
+        order = list(keys)
+        gloves.sort(key=lambda glove: order.index(glove[0]))  # In the order of the devices, whichever answered first
+
+        ports, unknown = {}, []
+        for device, ser, hand in gloves:
+            if hand is not None and hand not in ports:
+                ports[hand] = ser
+            else:
+                unknown.append((device, ser))
+        for device, ser in list(unknown):
+            hand = cache.get(keys[device])
+            if hand in _HANDS and hand not in ports:
+                ports[hand] = ser
+                unknown.remove((device, ser))
+        for device, ser in sorted(unknown, key=lambda glove: glove[0]):
+            free_hands = [hand for hand in _HANDS if hand not in ports]
+            if not free_hands:
+                ser.close()
+                continue
+            print(f"Warning: the glove on {device} did not say which hand it is, assuming {free_hands[0]}.")
+            ports[free_hands[0]] = ser
+
+        if len(ports) < len(_HANDS):
+            for ser in ports.values():
+                ser.close()
+            raise serial.SerialException(f"Found {len(gloves)} of the 2 gloves among {sorted(keys)}.")
+
+        for ser in ports.values():
+            ser.reset_input_buffer()  # Drop the handshake answer and any partial line
+        self.__save_cache({**cache, **{keys[ser.port]: hand for hand, ser in ports.items()}})
+        print(f"Gloves found in {time.monotonic() - start:.2f} s: left {ports['left'].port}, right {ports['right'].port}.")
+        return ports
+
+    def _probe(self, device: str, known: bool, stop_event: threading.Event = None) -> tuple:
+        """
+        Opens a port and checks whether a glove is on it, and which hand it is.
+
+        Args:
+            device (str): The device name of the port.
+            known (bool): Whether the port is a glove of the cache, which is asked for its hand right away.
+            stop_event (threading.Event, optional): Set to give up probing, once both gloves were found elsewhere.
+
+        Returns:
+            tuple: The open serial.Serial and the hand, which is None for a glove that did not answer the handshake,
+                or (None, None) if there is no glove on the port or the probe was stopped.
+        """
+        ser = serial.Serial()
+        ser.port = device
+        ser.baudrate = self.baud_rate
+        ser.timeout = 0.05
+        ser.exclusive = True
+        ser.dtr = False  # Do not reboot the board where the operating system lets us keep DTR low
+        try:
+            ser.open()
+        except (serial.SerialException, OSError):
+            return None, None
+
+        try:
+            deadline = time.monotonic() + self.timeout
+            if known:
+                ser.write(HANDSHAKE_REQUEST)
+            is_glove = False
+            splitter = FrameStreamSplitter()
+            while time.monotonic() < deadline and not (stop_event is not None and stop_event.is_set()):
+                for line in splitter.feed(ser.read(ser.in_waiting or 1)):
+                    if line.startswith(HANDSHAKE_REPLY):
+                        hand = line[len(HANDSHAKE_REPLY):].strip().decode('ascii', 'replace').lower()
+                        return ser, hand if hand in _HANDS else None
+                    if not is_glove and (line.startswith(SYNC) or self.__parser.parse(line) is not None):
+                        is_glove = True  # Binary frames only come out of the splitter with a valid CRC
+                        ser.write(HANDSHAKE_REQUEST)
+                        deadline = min(deadline, time.monotonic() + self.handshake_timeout)
+        except (serial.SerialException, OSError):
+            is_glove = False
+
+        if is_glove and not (stop_event is not None and stop_event.is_set()):
+            return ser, None
+        ser.close()
+        return None, None
+
+    def __load_cache(self) -> dict:
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            print(f'Ignoring the cached glove ports: {e}')
+            return {}
+
+    def __save_cache(self, cache: dict):
+        if self.cache_path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            with open(self.cache_path + '.tmp', 'w', encoding='utf-8') as file:
+                json.dump(cache, file, indent=2)
+            os.replace(self.cache_path + '.tmp', self.cache_path)
+        except OSError as e:
+            print(f'Could not cache the glove ports: {e}')
@@ -0,0 +1,144 @@
+import os
+import struct
+import threading
+import time
+from threading import Event
+
+# File header: magic, format version
+_HEADER = struct.Struct('<8sH')
+_MAGIC = b'SGNFYLOG'
+_VERSION = 1
+# Record header: hand (0 left, 1 right), monotonic host time in seconds, length of the raw line
+_RECORD = struct.Struct('<BdH')
+_HANDS = ('left', 'right')
+
+class SessionRecorder:
+    """
+    Appends the raw lines received from the gloves to a compact binary log.
+
+    Every record holds the hand, the monotonic host time at which the line was read and the line exactly as it came
+    off the serial port, malformed lines included, so a session can be replayed through the same parsing path.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initializes the SessionRecorder class, opening the log for appending.
+
+        Args:
+            path (str): The path of the log file. A header is written if the file is new.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.records = 0
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'ab')
+        if is_new:
+            self._file.write(_HEADER.pack(_MAGIC, _VERSION))
+
+        print(f'Recording session to {path}.')
+
+    def record(self, hand: str, timestamp: float, line: bytes):
+        """
+        Appends a raw line to the log. Safe to call from both port reader threads.
+
+        Args:
+            hand (str): 'left' or 'right'.
+            timestamp (float): The monotonic host time at which the line was read.
+            line (bytes): The raw line.
+        """
+        line = line[:0xFFFF]
+        with self._lock:
+            self._file.write(_RECORD.pack(_HANDS.index(hand), timestamp, len(line)))
+            self._file.write(line)
+            self.records += 1
+
+    def close(self):
+        """
+        Flushes and closes the log.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+class SessionReplayer:
+    """
+    Feeds a log written by SessionRecorder back into a SerialPortReader, without serial hardware.
+
+    Lines go through `SerialPortReader.handle_line`, the same parsing, buffering and pairing path as live data. Each
+    line is stamped with its place on the timeline of the recording, the start of the replay plus its recorded offset
+    divided by `speed`, so frames are paired and aged as they were live. The original spacing between lines is kept,
+    divided by `speed`; a speed of 0 replays as fast as possible, with the recorded offsets as a virtual clock.
+    """
+
+    def __init__(self, path: str, reader, stop_event: Event, speed: float = 1.0):
+        """
+        Initializes the SessionReplayer class.
+
+        Args:
+            path (str): The path of the log file.
+            reader (SerialPortReader): The reader whose `handle_line` receives the replayed lines.
+            stop_event (Event): An event used to stop the replay.
+            speed (float): The replay speed relative to the recording, 0 for as fast as possible.
+        """
+        self.path = path
+        self.speed = speed
+        self._reader = reader
+        self._stop_event = stop_event
+        self.replayed = 0
+        self.elapsed = 0.0
+
+    @staticmethod
+    def read_records(path: str):
+        """
+        Reads the records of a log file.
+
+        Args:
+            path (str): The path of the log file.
+
+        Yields:
+            tuple: (hand, timestamp, line) for each record, in the order they were written.
+
+        Raises:
+            ValueError: If the file is not a session log.
+        """
+        with open(path, 'rb') as file:
+            header = file.read(_HEADER.size)
+            if len(header) != _HEADER.size or _HEADER.unpack(header)[0] != _MAGIC:
+                raise ValueError(f'{path} is not a Signify session log.')
+
+            while True:
+                record = file.read(_RECORD.size)
+                if len(record) < _RECORD.size:
+                    return  # End of file, or a record cut short by an interrupted recording
+                hand, timestamp, length = _RECORD.unpack(record)
+                line = file.read(length)
+                if len(line) < length:
+                    return
+                yield _HANDS[hand], timestamp, line
+
+    def start(self):
+        """
+        Replays the whole log, or until the stop event is set.
+        """
+        start = time.monotonic()
+        first_timestamp = None
+        try:
+            for hand, timestamp, line in self.read_records(self.path):
+                if self._stop_event.is_set():
+                    break
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+
+                replay_time = start + (timestamp - first_timestamp) / (self.speed or 1.0)
+                if self.speed > 0:
+                    delay = replay_time - time.monotonic()
+                    if delay > 0 and self._stop_event.wait(delay):
+                        break
+
+                self._reader.handle_line(hand, replay_time, line)
+                self.replayed += 1
+        except (OSError, ValueError) as e:
+            print(f'Error replaying the session: {e}')
+
+        self.elapsed = time.monotonic() - start
+        print(f'Replayed {self.replayed} lines in {self.elapsed:.2f} s ({self.replayed / max(self.elapsed, 1e-9):.0f} lines/s).')
@@ -0,0 +1,168 @@
+import json
+import os
+import numpy as np
+from scipy.spatial import KDTree
+from classes.FeatureTransform import FeatureTransform
+
+# Bump when the layout of the cached files or of the indexed features changes
+INDEX_SCHEMA_VERSION = 2
+
+class GestureTree:
+    """
+    Nearest-neighbour lookup over one group of stored gestures (single hand or both hands).
+
+    Attributes:
+        names (np.ndarray): The name of each stored gesture.
+        features (np.ndarray): The raw features of each stored gesture, one row per gesture.
+        transformed (np.ndarray): The transformed features the tree is built over, one row per gesture.
+        tree (KDTree): The tree over the transformed features, or None if the group is empty.
+    """
+
+    def __init__(self, names: np.ndarray, features: np.ndarray, transform: FeatureTransform, transformed: np.ndarray = None):
+        """
+        Initializes the GestureTree class and builds its KD-tree.
+
+        Args:
+            names (np.ndarray): The name of each stored gesture.
+            features (np.ndarray): The raw features of each stored gesture.
+            transform (FeatureTransform): The transform applied to the features before they are indexed.
+            transformed (np.ndarray, optional): The features already transformed, e.g. memory-mapped from the cache.
+        """
+        self.names = names
+        self.features = features
+        self._transform = transform
+        if transformed is None:
+            transformed = transform.transform(features) if len(features) > 0 else np.empty((0, 0))
+        self.transformed = transformed
+        self.tree = KDTree(transformed) if len(features) > 0 else None
+
+    def query(self, points):
+        """
+        Finds the nearest stored gesture of each query point, in the transformed space.
+
+        Args:
+            points (array_like): Raw features of one point, or of shape (n, d) for several points.
+
+        Returns:
+            tuple: (distance, index) of the nearest gesture, as scalars or arrays of shape (n,). Points with
+            missing (non-finite) values, or queries on an empty group, get an infinite distance and index -1.
+        """
+        transformed = self._transform.transform(points)
+        single = transformed.ndim == 1
+        transformed = np.atleast_2d(transformed)
+
+        distances = np.full(len(transformed), np.inf)
+        indexes = np.full(len(transformed), -1, dtype=np.intp)
+        if self.tree is not None:
+            valid = np.isfinite(transformed).all(axis=1)
+            if valid.all():
+                distances, indexes = self.tree.query(transformed, k=1)
+            elif valid.any():
+                distances[valid], indexes[valid] = self.tree.query(transformed[valid], k=1)
+
+        if single:
+            return distances[0], indexes[0]
+        return distances, indexes
+
+    def __len__(self):
+        return len(self.names)
+
+class GestureIndex:
+    """
+    The searchable vocabulary: one GestureTree for single-hand gestures and one for two-hand gestures.
+
+    The service reads the whole index through a single reference, so an index can be replaced by a new one without
+    readers ever seeing a mix of both.
+
+    Attributes:
+        single (GestureTree): The gestures made with one hand, indexed on that hand's 14 features.
+        both (GestureTree): The gestures made with both hands, indexed on the 28 features of left and right hand.
+        transform (FeatureTransform): The transform both trees were built with.
+    """
+
+    def __init__(self, single: GestureTree, both: GestureTree, transform: FeatureTransform):
+        self.single = single
+        self.both = both
+        self.transform = transform
+
+    def get_names(self):
+        """
+        Returns the names of every gesture in the index.
+
+        Returns:
+            list: The gesture names, single-hand gestures first.
+        """
+        return self.single.names.tolist() + self.both.names.tolist()
+
+    def save(self, directory: str, key: dict):
+        """
+        Saves the names and the raw and transformed feature matrices of the index into a cache directory.
+
+        Only plain `.npy` arrays are saved, never the trees themselves, so the cache does not depend on the scipy
+        version. The trees are rebuilt from the memory-mapped transformed features, which takes milliseconds.
+
+        The key is written last, so an interrupted save leaves a cache that `load` rejects instead of a partial one.
+
+        Args:
+            directory (str): The cache directory, created if needed.
+            key (dict): The fingerprint of the data the index was built from.
+        """
+        os.makedirs(directory, exist_ok=True)
+        key_path = os.path.join(directory, 'key.json')
+        if os.path.exists(key_path):
+            os.remove(key_path)
+
+        for group, tree in (('single', self.single), ('both', self.both)):
+            self.__write(os.path.join(directory, f'{group}_names.npy'), lambda file: np.save(file, tree.names))
+            self.__write(os.path.join(directory, f'{group}_features.npy'), lambda file: np.save(file, tree.features))
+            self.__write(os.path.join(directory, f'{group}_transformed.npy'), lambda file: np.save(file, tree.transformed))
+            if os.path.exists(os.path.join(directory, f'{group}_tree.pkl')):
+                os.remove(os.path.join(directory, f'{group}_tree.pkl'))  # Left by caches of schema version 1
+
+        self.__write(key_path, lambda file: file.write(json.dumps(key, sort_keys=True).encode('utf-8')))
+
+    @classmethod
+    def load(cls, directory: str, key: dict, transform: FeatureTransform):
+        """
+        Loads an index saved by `save`, with the feature matrices and names memory-mapped, and rebuilds its trees.
+
+        Args:
+            directory (str): The cache directory.
+            key (dict): The fingerprint of the current data. The cache is only used if it was saved with the same key.
+            transform (FeatureTransform): The transform the cached features were transformed with.
+
+        Returns:
+            GestureIndex or None: The cached index, or None if there is no usable cache. A cache that cannot be read,
+                whatever the reason, is a miss and the index is rebuilt from the database.
+        """
+        try:
+            with open(os.path.join(directory, 'key.json'), 'r', encoding='utf-8') as file:
+                if json.load(file) != json.loads(json.dumps(key)):
+                    return None
+
+            trees = []
+            for group in ('single', 'both'):
+                names = np.load(os.path.join(directory, f'{group}_names.npy'), mmap_mode='r')
+                features = np.load(os.path.join(directory, f'{group}_features.npy'), mmap_mode='r')
+                transformed = np.load(os.path.join(directory, f'{group}_transformed.npy'), mmap_mode='r')
+                if len(transformed) != len(features) or len(names) != len(features):
+                    raise ValueError(f'the {group} arrays have different lengths')
+                trees.append(GestureTree(names, features, transform, transformed))
+            
+            return cls(trees[0], trees[1], transform)
+
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f'Ignoring the gesture index cache: {e}')
+            return None
+
+    @staticmethod
+    def __write(path: str, write):
+        """
+        Writes a file through a temporary one, so readers never see it half written.
+        """
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'wb') as file:
+            write(file)
+        os.replace(temporary_path, path)
@@ -1,9 +1,14 @@
 import sqlite3
+import hashlib
+import json
+import os
+import threading
 import numpy as np
-from scipy.spatial import KDTree
 import classes.DynamicGesture as DynamicGesture
 import classes.StaticGesture as StaticGesture
 import classes.GestureFactory as GestureFactory
+from classes.FeatureTransform import FeatureTransform, HAND_FEATURES
+from repositories.gesture_index import GestureIndex, GestureTree, INDEX_SCHEMA_VERSION
 class GestureRepository:
     """
     A class that represents a repository for storing and retrieving gesture data.
@@ -13,49 +18,224 @@ class GestureRepository:
         db_dynamic_path (str): The path to the dynamic gestures database file.
     """
 
-    def __init__(self, db_path='resources/SQL/int_dataBase/gestures.db'):
+    def __init__(self, db_path='resources/SQL/int_dataBase/gestures.db', transform: FeatureTransform = None, use_cache: bool = True):
         """
         Initializes a new instance of the GestureRepository class.
 
         Args:
-            db_static_path (str, optional): The path to the static gestures database file. Defaults to 'resources/SQL/int_dataBase/staticGestures.db'.
-            db_dynamic_path (str, optional): The path to the dynamic gestures database file. Defaults to 'resources/SQL/int_dataBase/dynamicGestures.db'.
+            db_path (str, optional): The path to the gestures database file. Defaults to 'resources/SQL/int_dataBase/gestures.db'.
+            transform (FeatureTransform, optional): The transform the gesture features are indexed with. Defaults to the identity.
+            use_cache (bool, optional): Whether to load the index from, and save it to, a cache next to the database file.
         """
         self.__factory = GestureFactory.GestureFactory()
         self._db_path = db_path
-        self.__single_names, self.__single_tree, self.__both_names, self.__both_tree = self._get_all_gestures()
+        self._transform = transform if transform is not None else FeatureTransform()
+        self._use_cache = use_cache
+        self.__watch_thread = None
+        self.__watch_stop = threading.Event()
+        self.__loaded_key = None
+        self.__index = self._load_gestures()
         print('DynamicGesture repository initialized successfully.')
 
+    def _load_gestures(self):
+        """
+        Loads the index from the cache if it was built from the current database, otherwise builds and caches it.
+
+        Returns:
+            GestureIndex: The index of the stored gestures, or None if they could not be fetched.
+        """
+        if not self._use_cache:
+            return self._get_all_gestures()
+        
+        cache_directory = self._get_cache_directory()
+        try:
+            key = self._get_fingerprint()
+        except OSError as e:
+            print(f'Failed to fingerprint the gestures database: {e}')
+            return self._get_all_gestures()
+        
+        index = GestureIndex.load(cache_directory, key, self._transform)
+        if index is None:
+            index = self._get_all_gestures()
+            if index is not None:
+                try:
+                    index.save(cache_directory, key)
+                except OSError as e:
+                    print(f'Failed to save the gesture index cache: {e}')
+                    
+        if index is not None:
+            self.__loaded_key = key
+        return index
+
+    def watch(self, on_change, interval: float = 2.0):
+        """
+        Starts a background thread that rebuilds the index whenever the database changes.
+
+        Changes are detected by polling `PRAGMA data_version`, which moves when another connection commits, and the
+        identity, size and modification time of the file, which catch the file being replaced. The new index is built
+        on the watcher thread and only handed to `on_change` once it is complete.
+
+        Args:
+            on_change (callable): Called with the new GestureIndex after each successful rebuild.
+            interval (float): Seconds between two checks.
+        """
+        if self.__watch_thread is not None:
+            return
+        self.__watch_stop.clear()
+        self.__watch_thread = threading.Thread(target=self.__watch_database, args=(on_change, interval), name='gesture-db-watcher', daemon=True)
+        self.__watch_thread.start()
+
+    def stop_watching(self):
+        """
+        Stops the thread started by `watch` and waits for it to finish.
+        """
+        self.__watch_stop.set()
+        if self.__watch_thread is not None:
+            self.__watch_thread.join()
+            self.__watch_thread = None
+
+    def __watch_database(self, on_change, interval: float):
+        """
+        Body of the watcher thread.
+
+        Args:
+            on_change (callable): Called with the new GestureIndex after each successful rebuild.
+            interval (float): Seconds between two checks.
+        """
+        conn = None
+        file_state = self.__get_file_state()
+        data_version = None
+        try:
+            while not self.__watch_stop.wait(interval):
+                current_file_state = self.__get_file_state()
+                if current_file_state is None:
+                    continue  # The file is being replaced, look again on the next check
+                
+                if conn is None or current_file_state[:2] != (file_state or (None, None))[:2]:
+                    # A replaced file needs a new connection, data_version is only comparable within one connection
+                    if conn is not None:
+                        conn.close()
+                    conn = sqlite3.connect(self._db_path)
+                    data_version = None
+                    
+                try:
+                    current_data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+                except sqlite3.Error as e:
+                    print(f'Failed to poll the gestures database: {e}')
+                    continue
+                
+                changed = current_file_state != file_state or (data_version is not None and current_data_version != data_version)
+                file_state = current_file_state
+                data_version = current_data_version
+                if not changed or self.__is_loaded_version():
+                    continue
+                
+                index = self._load_gestures()
+                if index is None:
+                    print('Keeping the current gestures, the changed database could not be indexed.')
+                    continue
+                
+                self.__index = index
+                print(f'Gesture vocabulary reloaded: {len(index.single) + len(index.both)} gestures.')
+                on_change(index)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def __is_loaded_version(self):
+        """
+        Checks whether the database still has the content the current index was built from, as it does after a commit
+        that touched the file without changing any data.
+
+        Returns:
+            bool: True if the index is known to be up to date, False otherwise.
+        """
+        if self.__loaded_key is None:
+            return False
+        try:
+            return self._get_fingerprint()['sha256'] == self.__loaded_key['sha256']
+        except OSError:
+            return False
+
+    def __get_file_state(self):
+        """
+        Returns what identifies the current version of the database file on disk.
+
+        Returns:
+            tuple or None: (device, inode, size, mtime_ns) of the file, or None if it does not exist right now.
+        """
+        try:
+            stat = os.stat(self._db_path)
+        except OSError:
+            return None
+        return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _get_cache_directory(self):
+        """
+        Returns the cache directory of the current transform, next to the database file.
+
+        Returns:
+            str: The cache directory path.
+        """
+        transform_digest = hashlib.sha256(json.dumps(self._transform.get_config(), sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        return os.path.join(f'{self._db_path}.index', transform_digest)
+
+    def _get_fingerprint(self):
+        """
+        Computes the key a cached index has to match: the content hash, size and modification time of the database
+        file, the index schema version and the transform.
+
+        Returns:
+            dict: The fingerprint of the database and of the way it is indexed.
+
+        Raises:
+            OSError: If the database file cannot be read.
+        """
+        digest = hashlib.sha256()
+        with open(self._db_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+        stat = os.stat(self._db_path)
+        
+        return {
+            'sha256': digest.hexdigest(),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'schema_version': INDEX_SCHEMA_VERSION,
+            'transform': self._transform.get_config(),
+        }
+
     def _get_all_gestures(self):
         """
-        Retrieves all static gestures from the database.
+        Retrieves all gestures from the database and indexes them.
 
         Returns:
-            list: A list of tuples representing the static gestures data.
+            GestureIndex: The index of the stored gestures, or None if they could not be fetched.
         """
         gestures = self._fetch_gesture()
         if gestures is None:
             print('Failed to fetch gestures from the database.')
-            return None, None
+            return None
         
-        gesture_features = np.array([self.__extract_hand_features(gesture.left_hand) + self.__extract_hand_features(gesture.right_hand) for gesture in gestures])
-        single_hand_points = np.array([points for points in gesture_features if len(points) == 14])
-        both_hands_points = np.array([points for points in gesture_features if len(points) == 28])
+        gesture_features = [self.__extract_hand_features(gesture.left_hand) + self.__extract_hand_features(gesture.right_hand) for gesture in gestures]
+        single_hand_points = np.array([points for points in gesture_features if len(points) == HAND_FEATURES], dtype=float).reshape(-1, HAND_FEATURES)
+        both_hands_points = np.array([points for points in gesture_features if len(points) == 2 * HAND_FEATURES], dtype=float).reshape(-1, 2 * HAND_FEATURES)
                 
-        single_tree = KDTree(single_hand_points)
-        single_names = np.array([gesture.name for gesture in gestures if gesture.left_hand is None or gesture.right_hand is None])
-        
-        both_tree = KDTree(both_hands_points)
-        both_names = np.array([gesture.name for gesture in gestures if gesture.left_hand is not None and gesture.right_hand is not None])
+        single_names = np.array([gesture.name for gesture in gestures if gesture.left_hand is None or gesture.right_hand is None], dtype=str)
+        both_names = np.array([gesture.name for gesture in gestures if gesture.left_hand is not None and gesture.right_hand is not None], dtype=str)
         
-        return single_names, single_tree, both_names, both_tree
+        return GestureIndex(
+            GestureTree(single_names, single_hand_points, self._transform),
+            GestureTree(both_names, both_hands_points, self._transform),
+            self._transform
+        )
         
     def __extract_hand_features(self, hand: DynamicGesture.Hand):
         if hand is None:
             return []
         return [
                 hand.roll, hand.pitch, hand.yaw, *hand.finger_flex,
-                hand.mean_acceleration, hand.std_acceleration, hand.mean_angular_velocity, hand.std_acceleration, hand.accel_axis, hand.gyro_axis
+                hand.mean_acceleration, hand.std_acceleration, hand.mean_angular_velocity, hand.std_angular_velocity, hand.accel_axis, hand.gyro_axis
         ]
         
     def _fetch_gesture(self):
@@ -102,9 +282,9 @@ class GestureRepository:
             
     def get_gestures(self):
         """
-        Retrieves all static gestures from the database.
+        Retrieves the index of all the gestures of the database.
 
         Returns:
-            list: A list of tuples representing the static gestures data.
+            GestureIndex: The index of the stored gestures, or None if they could not be fetched.
         """
-        return self.__single_names, self.__single_tree, self.__both_names, self.__both_tree
\ No newline at end of file
+        return self.__index
\ No newline at end of file
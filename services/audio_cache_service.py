@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import threading
+import wave
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from classes.AudioClip import AudioClip
+from services.synthesis_service import SPEAK_NOW, PRERENDER
+
+class AudioCache:
+    """
+    In-memory cache of the speech of each text, so a recognized sign is spoken by playing a buffer.
+
+    Clips are keyed by the text and by the backend, voice and rate they were rendered with, and evicted least recently
+    used first once the cache exceeds its size. With a directory, rendered clips are also saved as `.wav` files and
+    loaded from there on the next start instead of being synthesized again.
+
+    Missing clips are rendered by the workers of a SynthesisService, so the vocabulary can be pre-rendered in the
+    background while words that have to be spoken now skip the line.
+    """
+
+    def __init__(self, tts, max_bytes: int = 32 * 1024 * 1024, max_entries: int = None, directory: str = None):
+        """
+        Initializes the AudioCache class.
+
+        Args:
+            tts (SynthesisService): The service clips are rendered with.
+            max_bytes (int): The largest total size of the cached samples.
+            max_entries (int, optional): The largest number of cached clips.
+            directory (str, optional): A directory where rendered clips are persisted.
+        """
+        self._tts = tts
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+        self._clips = OrderedDict()
+        self._bytes = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._finish_lock = threading.Lock()  # Held while a rendered clip is cached, so get only returns once it is
+        self._statistics = {'hits': 0, 'misses': 0, 'rendered': 0, 'loaded': 0, 'evicted': 0}
+
+    def get_key(self, text: str) -> tuple:
+        """
+        Returns the key the clip of a text is cached under.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            tuple: (text, backend, voice, rate).
+        """
+        config = self._tts.backend.get_config()
+        return (text, config['backend'], config['voice'], config['rate'])
+
+    def get(self, text: str, timeout: float = None):
+        """
+        Returns the clip of a text, rendering it first if it is not cached.
+
+        Args:
+            text (str): The text.
+            timeout (float, optional): The longest time to wait for a clip to be rendered.
+
+        Returns:
+            AudioClip or None: The clip, or None if the backend produced no speech.
+
+        Raises:
+            TimeoutError: If the clip was not rendered within the timeout.
+        """
+        key = self.get_key(text)
+        with self._lock:
+            clip = self._clips.get(key)
+            if clip is not None:
+                self._clips.move_to_end(key)
+                self._statistics['hits'] += 1
+                return clip
+            self._statistics['misses'] += 1
+        future = self.__render(key, text, SPEAK_NOW)
+        clip = future.result(timeout)
+        self.__finish(key, future)
+        return clip
+
+    def get_phrase(self, words, join: bool = True, gap: float = 0.08):
+        """
+        Returns the speech of a phrase, either joined from the clips of its words or synthesized in one call.
+
+        Joining reuses the pre-rendered vocabulary and costs no synthesis at all. Synthesizing the whole phrase costs one
+        call, which neural backends split into sentences themselves, and sounds more natural. Phrases rarely repeat, so
+        a synthesized phrase is neither cached nor saved, and never evicts the clips of the vocabulary.
+
+        Args:
+            words (tuple): The words of the phrase.
+            join (bool): Whether to join the clips of the words instead of synthesizing the phrase.
+            gap (float): Seconds of silence between two joined words.
+
+        Returns:
+            AudioClip or None: The speech, or None if the backend produced none.
+        """
+        if join:
+            clips = [clip for clip in (self.get(word) for word in words) if clip is not None]
+            try:
+                return AudioClip.concatenate(clips, gap) if clips else None
+            except ValueError:
+                pass  # Clips of different formats, e.g. recorded at different sample rates
+        return self._tts.submit(' '.join(words), SPEAK_NOW).result()
+
+    def prerender(self, texts):
+        """
+        Queues the rendering of texts that are not cached yet, behind any word that has to be spoken now.
+
+        Args:
+            texts (iterable): The texts, e.g. the names of every gesture.
+        """
+        for text in texts:
+            key = self.get_key(text)
+            with self._lock:
+                if key in self._clips:
+                    continue
+            self.__render(key, text, PRERENDER)
+
+    def __render(self, key: tuple, text: str, priority: int) -> Future:
+        """
+        Loads a persisted clip, or asks the synthesis service for it. A text already being rendered is not asked twice.
+        """
+        clip = self.__load(key)
+        if clip is not None:
+            self.__store(key, clip)
+            future = Future()
+            future.set_result(clip)
+            return future
+
+        future = self._tts.submit(text, priority)
+        with self._lock:
+            if self._pending.get(key) is future:
+                return future
+            self._pending[key] = future
+        future.add_done_callback(lambda done: self.__finish(key, done))
+        return future
+
+    def __finish(self, key: tuple, future: Future):
+        """
+        Caches and persists a rendered clip. Runs once per render, from whichever of the synthesis service and the
+        waiting caller gets there first, and the other one waits until it is done.
+        """
+        with self._finish_lock:
+            with self._lock:
+                if self._pending.get(key) is not future:
+                    return
+                del self._pending[key]
+            try:
+                clip = future.result()
+            except Exception as e:
+                print(f'Error rendering the speech of "{key[0]}": {e}')
+                return
+            with self._lock:
+                self._statistics['rendered'] += 1
+            self.__save(key, clip)
+            self.__store(key, clip)
+
+    def __store(self, key: tuple, clip: AudioClip):
+        """
+        Adds a clip to the cache, evicting the least recently used clips beyond the size bounds.
+        """
+        if clip is None or len(clip) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._clips.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)  # Stored again, e.g. by two callers loading the same persisted clip
+            self._clips[key] = clip
+            self._bytes += len(clip)
+            while self._bytes > self.max_bytes or (self.max_entries is not None and len(self._clips) > self.max_entries):
+                _, evicted = self._clips.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._statistics['evicted'] += 1
+
+    def __get_path(self, key: tuple) -> str:
+        digest = hashlib.sha256(json.dumps(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{digest[:32]}.wav')
+
+    def __load(self, key: tuple):
+        """
+        Loads a persisted clip, if persistence is enabled and the clip was rendered before.
+        """
+        if self.directory is None or not os.path.exists(self.__get_path(key)):
+            return None
+        try:
+            clip = AudioClip.from_wave_file(self.__get_path(key))
+            with self._lock:
+                self._statistics['loaded'] += 1
+            return clip
+        except (OSError, EOFError, wave.Error) as e:
+            print(f'Ignoring the cached speech of "{key[0]}": {e}')
+            return None
+
+    def __save(self, key: tuple, clip: AudioClip):
+        """
+        Persists a clip, through a temporary file so an interrupted save never leaves a truncated clip.
+        """
+        if self.directory is None or clip is None:
+            return
+        path = self.__get_path(key)
+        clip.to_wave_file(path + '.tmp')
+        os.replace(path + '.tmp', path)
+
+    def get_statistics(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: The number of cached clips and bytes, and the hits, misses, rendered, loaded and evicted counts.
+        """
+        with self._lock:
+            return {'entries': len(self._clips), 'bytes': self._bytes, **self._statistics}
+
+    def close(self):
+        """
+        Stops caching the clips still being rendered, once the clip being cached is done.
+        """
+        with self._finish_lock, self._lock:
+            self._pending.clear()
@@ -1,98 +1,308 @@
 # /main/Calibration.py
 
-import time
 import sys
-from queue import Queue
+import time
+from collections import deque, namedtuple
+
+# The calibration status of a frame is (accel, gyro, mag, system), each from 0 to 3
+ACCEL, GYRO, MAG, SYSTEM = range(4)
+
+# The calibration stages of a sensor, in order, with the calibration value each one waits for
+STAGES = (('gyroscope', GYRO), ('magnetometer', MAG), ('accelerometer', ACCEL))
+
+INSTRUCTIONS = {
+    'gyroscope': "Gyroscope Calibration: Place the sensor on a flat surface.",
+    'magnetometer': "Magnetometer Calibration: Move the sensor slowly in different orientations while rotating it around all three axes.",
+    'accelerometer': "Accelerometer Calibration: Move the sensor slowly in a figure-eight motion around all three axes.",
+}
+
+CalibrationEvent = namedtuple('CalibrationEvent', ['hand', 'kind', 'stage', 'calibration'])
+CalibrationEvent.__doc__ = """
+A change in the calibration of a sensor.
+
+Attributes:
+    hand (str): 'left' or 'right', or None for the events about both sensors.
+    kind (str): 'started', 'stage' when the sensor moves on to a new stage, 'progress' when its calibration values
+        change, 'calibrated' when it is done or recovered on its own, and 'finished' when every sensor is done.
+    stage (str): The stage the sensor is in, or None once it is calibrated.
+    calibration (tuple): The latest (accel, gyro, mag, system) values of the sensor.
+"""
+
+class CalibrationMonitor:
+    """
+    Decides when a sensor needs calibration, from a window of its recent calibration values.
+
+    The BNO055 calibration status flickers in normal use, so a single low reading is not a loss. A sensor needs
+    calibration once, over the last `enter_after` seconds, at least `enter_ratio` of its readings had a value below
+    `enter_below`. It stops needing it once every reading of the last `exit_after` seconds reached `exit_at`, which is
+    higher than `enter_below` so a sensor hovering around a threshold does not go back and forth.
+
+    The thresholds are per sensor, in the (accel, gyro, mag, system) order of the calibration values. The system value
+    is derived from the other three and flickers the most, so it is ignored by default.
+    """
+
+    def __init__(self, enter_below=(2, 2, 2, 0), exit_at=(3, 3, 3, 0), enter_after: float = 1.0, exit_after: float = 1.0, enter_ratio: float = 0.8):
+        """
+        Initializes the CalibrationMonitor class.
+
+        Args:
+            enter_below (tuple): Per sensor, the value below which a reading is low.
+            exit_at (tuple): Per sensor, the value a reading must reach to count as recovered.
+            enter_after (float): Seconds of mostly low readings after which calibration is needed.
+            exit_after (float): Seconds of recovered readings after which calibration is no longer needed.
+            enter_ratio (float): The share of low readings within `enter_after` seconds that counts as a loss.
+
+        Raises:
+            ValueError: If a sensor would count as recovered below the value that makes it low.
+        """
+        if len(enter_below) != 4 or len(exit_at) != 4:
+            raise ValueError('There must be one threshold per calibration value: accel, gyro, mag and system.')
+        if any(exit_value < enter_value for enter_value, exit_value in zip(enter_below, exit_at)):
+            raise ValueError('The exit thresholds must not be lower than the enter thresholds.')
+        self.enter_below = tuple(enter_below)
+        self.exit_at = tuple(exit_at)
+        self.enter_after = enter_after
+        self.exit_after = exit_after
+        self.enter_ratio = enter_ratio
+        self._hands = {hand: {'needed': False, 'window': deque(), 'low': 0, 'since': None, 'last_unrecovered': None}
+                       for hand in ('left', 'right')}
+        self.episodes = 0
+
+    @property
+    def needed_hands(self):
+        """
+        Gets the hands whose sensors need calibration.
+
+        Returns:
+            list: The hands, 'left' and/or 'right'.
+        """
+        return [hand for hand, state in self._hands.items() if state['needed']]
+
+    def update(self, calibration_left, calibration_right, now: float = None):
+        """
+        Adds the calibration values of a new frame.
+
+        Args:
+            calibration_left (list): The (accel, gyro, mag, system) calibration values of the left sensor.
+            calibration_right (list): The (accel, gyro, mag, system) calibration values of the right sensor.
+            now (float, optional): The monotonic time of the frame. Defaults to the current time.
+
+        Returns:
+            tuple: The hands that started needing calibration with this frame, and those that stopped needing it.
+        """
+        now = time.monotonic() if now is None else now
+        entered, recovered = [], []
+        for hand, calibration in (('left', calibration_left), ('right', calibration_right)):
+            state = self._hands[hand]
+            if not state['needed']:
+                if self.__is_lost(state, calibration, now):
+                    state['needed'] = True
+                    state['last_unrecovered'] = now
+                    self.episodes += 1
+                    entered.append(hand)
+            elif not all(value >= threshold for value, threshold in zip(calibration, self.exit_at)):
+                state['last_unrecovered'] = now
+            elif now - state['last_unrecovered'] >= self.exit_after:
+                state.update(needed=False, since=None)
+                recovered.append(hand)
+        return entered, recovered
+
+    def reset(self, hands):
+        """
+        Marks sensors as calibrated, e.g. once the calibrator took them through every stage, so the next sustained loss
+        is detected as a new episode.
+
+        Args:
+            hands (iterable): The hands whose sensors are calibrated.
+        """
+        for hand in hands:
+            state = self._hands[hand]
+            state['window'].clear()
+            state.update(needed=False, low=0, since=None, last_unrecovered=None)
+
+    def __is_lost(self, state: dict, calibration, now: float) -> bool:
+        """
+        Adds a reading to the window of a calibrated sensor and checks whether it shows a sustained loss.
+        """
+        window = state['window']
+        low = any(value < threshold for value, threshold in zip(calibration, self.enter_below))
+        window.append((now, low))
+        state['low'] += low
+        while window[0][0] < now - self.enter_after:
+            state['low'] -= window.popleft()[1]
+        if state['since'] is None:
+            state['since'] = now
+
+        if now - state['since'] >= self.enter_after and state['low'] >= self.enter_ratio * len(window):
+            window.clear()
+            state['low'] = 0
+            return True
+        return False
 
 class BNO055Calibrator:
-    """Class for calibrating BNO055 sensors."""
+    """
+    Calibration of the BNO055 sensors as a state machine fed with the calibration values of every frame.
+
+    The calibrator never reads the data queue or waits: the main loop hands it the values of each frame it processes,
+    so both sensors are tracked in parallel and recognition keeps running meanwhile. Each sensor goes through the
+    gyroscope, magnetometer and accelerometer stages until all three reach `target`, and every change is reported
+    as a CalibrationEvent.
+
+    With `observe`, the calibrator also decides when to start: its CalibrationMonitor tells which sensors lost their
+    calibration, and is reset as soon as a sensor is calibrated again, so both agree on which sensors need calibration.
+    """
 
-    def __init__(self, serial_data_queue: Queue, stop_event):
+    def __init__(self, on_event=None, target: int = 3, monitor: CalibrationMonitor = None):
         """
-        Initialize the calibrator with a reference to an existing data queue.
-        
-        :param serial_data_queue: A queue object that provides sensor data.
+        Initializes the calibrator.
+
+        Args:
+            on_event (callable, optional): Receives every CalibrationEvent. Defaults to printing the progress.
+            target (int): The calibration value every sensor must reach.
+            monitor (CalibrationMonitor, optional): Decides when a sensor needs calibration, for `observe`. Defaults to
+                a CalibrationMonitor with its default thresholds and durations.
         """
-        self.__data_queue = serial_data_queue
-        self._stop_event = stop_event
-        self._last_saved_calibration = [0,0,0,0]
-        
+        self._on_event = on_event if on_event is not None else self._print_event
+        self.target = target
+        self.monitor = monitor if monitor is not None else CalibrationMonitor()
+        self._stages = {}
+        self._last_calibration = {}
+
         print('Calibrator initialized successfully.')
 
+    @property
+    def is_calibrating(self):
+        """
+        Gets whether a sensor is being calibrated, in which case recognition has low confidence.
 
-    def _get_calibration_data(self, data_source):
+        Returns:
+            bool: True until every started sensor is calibrated.
         """
-        Retrieve calibration data from the queue for the specified sensor index.
+        return bool(self._stages)
 
-        :param data_source: Index (0 for left, 1 for right) to specify sensor.
-        :return: List of calibration values as floats.
+    def get_stages(self):
         """
-        if not self.__data_queue.empty():
-            try:
-                with self.__data_queue.mutex: self.__data_queue.queue.clear()
-                time.sleep(1)
-                
-                data_izq, data_der = self.__data_queue.get()
-                if data_source == 0 or data_source == "left":
-                    self._last_saved_calibration = list(map(int, data_izq[4]))
-                else:
-                    self._last_saved_calibration = list(map(int, data_der[4]))
-                        
-            except Exception:
-                return self._last_saved_calibration
-        return self._last_saved_calibration
+        Returns the stage each sensor being calibrated is in.
 
-    def _perform_calibration_routine(self, sensor_name):
+        Returns:
+            dict: The stage name of each hand being calibrated.
         """
-        Display calibration instructions to the user for the specified sensor.
+        return dict(self._stages)
 
-        :param sensor_name: Name of the sensor (left or right) for user instructions.
+    def start(self, hands=('left', 'right')):
         """
-        self.accel, self.gyro, self.mag, self.sys = self._get_calibration_data(sensor_name)
-        print("Calibrating " + sensor_name + " BNO055 sensor...")
-     
-        print("\nGyroscope Calibration: Place the sensor on a flat surface.")
-        while self.gyro < 3 and not self._stop_event.is_set():
-            self.accel, self.gyro, self.mag, self.sys = self. _get_calibration_data(sensor_name)          
-            sys.stdout.write(f"\rSystem: {self.sys}/3, Gyroscope: {self.gyro}/3, Accelerometer: {self.accel}/3, Magnetometer: {self.mag}/3")
-            sys.stdout.flush()
-                
-        print("\nMagnetometer Calibration: Move the sensor slowly in different orientations while rotating it around all three axes.")
-        while self.mag < 3 and not self._stop_event.is_set():
-            self.accel, self.gyro, self.mag, self.sys = self. _get_calibration_data(sensor_name)            
-            sys.stdout.write(f"\rSystem: {self.sys}/3, Gyroscope: {self.gyro}/3, Accelerometer: {self.accel}/3, Magnetometer: {self.mag}/3")
-            sys.stdout.flush()
-            
-        print("\nAccelerometer Calibration: Move the sensor slowly in a figure-eight motion around all three axes.")
-        while self.accel < 3 and not self._stop_event.is_set():
-            self.accel, self.gyro, self.mag, self.sys = self. _get_calibration_data(sensor_name)            
-            sys.stdout.write(f"\rSystem: {self.sys}/3, Gyroscope: {self.gyro}/3, Accelerometer: {self.accel}/3, Magnetometer: {self.mag}/3")
-            sys.stdout.flush()
-           
-    def _wait_for_calibration(self, data_source, sensor_name):
+        Starts calibrating sensors. The progress is tracked by `update`.
+
+        Args:
+            hands (iterable): The hands whose sensors need calibration.
+        """
+        for hand in hands:
+            if hand not in self._stages:
+                self._stages[hand] = STAGES[0][0]
+                self._last_calibration.pop(hand, None)
+                self.__emit(hand, 'started', STAGES[0][0], None)
+
+    def stop(self, hands=('left', 'right')):
+        """
+        Stops calibrating sensors whose calibration recovered on its own.
+
+        Args:
+            hands (iterable): The hands whose sensors no longer need calibration.
         """
-        Continuously check and guide calibration until the sensor is fully calibrated.
+        stopped = False
+        for hand in hands:
+            if self._stages.pop(hand, None) is not None:
+                stopped = True
+                self.__emit(hand, 'calibrated', None, self._last_calibration.get(hand))
+        if stopped and not self._stages:
+            self.__emit(None, 'finished', None, None)
 
-        :param data_source: Sensor index (0 for left, 1 for right).
-        :param sensor_name: Name of the sensor for display purposes.
+    def observe(self, calibration_left, calibration_right, now: float = None):
         """
-        
-        self._perform_calibration_routine(sensor_name)
-        self._get_calibration_data(data_source)
-        
+        Feeds the calibration values of a new frame to the monitor, starts or stops calibrating the sensors it reports,
+        and advances the calibration.
 
-    def calibrate(self):
+        Args:
+            calibration_left (list): The (accel, gyro, mag, system) calibration values of the left sensor.
+            calibration_right (list): The (accel, gyro, mag, system) calibration values of the right sensor.
+            now (float, optional): The monotonic time of the frame. Defaults to the current time.
+
+        Returns:
+            list: The hands that started needing calibration with this frame.
+        """
+        lost, recovered = self.monitor.update(calibration_left, calibration_right, now)
+        if lost:
+            self.start(lost)
+        if recovered:
+            self.stop(recovered)
+        self.update(calibration_left, calibration_right)
+        return lost
+
+    def update(self, calibration_left, calibration_right):
+        """
+        Advances the calibration with the values of a new frame.
+
+        Args:
+            calibration_left (list): The (accel, gyro, mag, system) calibration values of the left sensor.
+            calibration_right (list): The (accel, gyro, mag, system) calibration values of the right sensor.
+
+        Returns:
+            bool: True if the calibration of both sensors finished with this frame.
         """
-        Perform calibration routines for both sensors.
+        if not self._stages:
+            return False
+
+        for hand, calibration in (('left', calibration_left), ('right', calibration_right)):
+            if hand not in self._stages:
+                continue
+            calibration = tuple(int(value) for value in calibration)
+            if calibration != self._last_calibration.get(hand):
+                self._last_calibration[hand] = calibration
+                self.__emit(hand, 'progress', self._stages[hand], calibration)
+            self.__advance(hand, calibration)
+
+        if not self._stages:
+            self.__emit(None, 'finished', None, None)
+            return True
+        return False
 
-        :return: Calibration data tuple for both sensors.
+    def __advance(self, hand: str, calibration: tuple):
         """
+        Moves a sensor past every stage whose calibration value reached the target.
+        """
+        for stage, sensor in STAGES:
+            if calibration[sensor] < self.target:
+                if self._stages[hand] != stage:
+                    self._stages[hand] = stage
+                    self.__emit(hand, 'stage', stage, calibration)
+                return
+        del self._stages[hand]
+        self.monitor.reset([hand])  # Calibrated for the monitor too, so a later loss starts over
+        self.__emit(hand, 'calibrated', None, calibration)
+
+    def __emit(self, hand, kind, stage, calibration):
         try:
-            print("\nStarting calibration of left sensor.")
-            self._wait_for_calibration(0, "left")
-            print("\nCalibration of left sensors complete, starting right sensor.")
-            self._wait_for_calibration(1, "right")
+            self._on_event(CalibrationEvent(hand, kind, stage, calibration))
+        except Exception as e:
+            print(f'Error reporting the calibration progress: {e}')
+
+    @staticmethod
+    def _print_event(event: CalibrationEvent):
+        """
+        Prints the calibration progress and the instructions of each stage.
+
+        Args:
+            event (CalibrationEvent): The event to print.
+        """
+        if event.kind == 'started':
+            print(f"\nStarting calibration of {event.hand} sensor. {INSTRUCTIONS[event.stage]}")
+        elif event.kind == 'stage':
+            print(f"\n{event.hand.capitalize()} sensor: {INSTRUCTIONS[event.stage]}")
+        elif event.kind == 'progress':
+            accel, gyro, mag, system = event.calibration
+            sys.stdout.write(f"\r{event.hand.capitalize()} - System: {system}/3, Gyroscope: {gyro}/3, Accelerometer: {accel}/3, Magnetometer: {mag}/3")
+            sys.stdout.flush()
+        elif event.kind == 'calibrated':
+            print(f"\nCalibration of {event.hand} sensor complete.")
+        elif event.kind == 'finished':
             print("\nBNO055 sensors calibrated.")
-            
-        except KeyboardInterrupt:
-                self._stop_event.set()
\ No newline at end of file
@@ -46,6 +46,33 @@ class SpeechFileManager:
         except sa.simpleaudio.AudioPlaybackError as e:
             print(f'Error playing audio: {e}')
             
+    def start_clip(self, clip):
+        """
+        Start playing speech held in memory, without going through a file, and return immediately.
+
+        Args:
+            clip (AudioClip): The speech to play.
+
+        Returns:
+            simpleaudio.PlayObject or None: The playback, to wait for or stop, or None if it could not start.
+        """
+        try:
+            return sa.play_buffer(clip.data, clip.channels, clip.sample_width, clip.sample_rate)
+        except sa.simpleaudio.AudioPlaybackError as e:
+            print(f'Error playing audio: {e}')
+            return None
+
+    def play_clip(self, clip):
+        """
+        Play speech held in memory, without going through a file, until it is finished.
+
+        Args:
+            clip (AudioClip): The speech to play.
+        """
+        play_obj = self.start_clip(clip)
+        if play_obj is not None:
+            play_obj.wait_done()  # Wait until playback is finished
+            
     def play_speech_file(self):
-        # Start a new thread for audio playback
+        # Plays synchronously, use PlaybackWorker to speak without blocking the caller
         self._play_audio()
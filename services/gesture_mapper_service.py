@@ -2,15 +2,35 @@ import classes.DynamicGesture as DynamicGesture
 import classes.StaticGesture as StaticGesture
 import classes.BaseGesture as BaseGesture
 import classes.GestureFactory as GestureFactory
+from classes.SlidingWindowStatistics import SlidingWindowStatistics
 from typing import List
+import math
 import numpy as np
+from controllers.frame_parser import EULER, GYRO, ACCEL, FLEX
+
+# Layout of the per-frame sample tracked by the streaming statistics of a hand
+_STREAM_EULER = slice(0, 3)
+_STREAM_FLEX = slice(3, 8)
+_STREAM_GYRO = slice(8, 11)
+_STREAM_ACCEL = slice(11, 14)
+_STREAM_RESULTANT_ACCELERATION = 14
+_STREAM_RESULTANT_ANGULAR_VELOCITY = 15
+_STREAM_MOVING = 16
+_STREAM_SAMPLE_SIZE = 17
 
 class GestureMapperService:
-    def __init__(self):
+    def __init__(self, stream_window: int = 0):
         """
         Initializes a new instance of the GestureMapperService class.
+
+        Args:
+            stream_window (int): The number of frames per hand the streaming statistics are kept over. 0 disables
+                the streaming mode.
         """
         self.__factory = GestureFactory.GestureFactory()
+        self.stream_window = stream_window
+        self.__streams = {hand: SlidingWindowStatistics(stream_window, _STREAM_SAMPLE_SIZE) for hand in ('left', 'right')} if stream_window > 0 else None
+        self.__sample = np.zeros(_STREAM_SAMPLE_SIZE)
         
     def static_gesture_to_dynamic_gesture(self, gestures: List[StaticGesture.StaticGesture]) -> DynamicGesture.DynamicGesture:
         """
@@ -27,6 +47,110 @@ class GestureMapperService:
 
         return self.__factory.create_dynamic_gesture(left_hand, right_hand)
     
+    def frames_to_dynamic_gesture(self, left_frames: np.ndarray, right_frames: np.ndarray) -> DynamicGesture.DynamicGesture:
+        """
+        Converts windows of parsed frames, as returned by FrameRingBuffer.latest, to a dynamic gesture.
+
+        Args:
+            left_frames (np.ndarray): The (n, FRAME_WIDTH) frames of the left hand. May be empty.
+            right_frames (np.ndarray): The (n, FRAME_WIDTH) frames of the right hand. May be empty.
+
+        Returns:
+            DynamicGesture.DynamicGesture: The converted dynamic gesture.
+        """
+        left_hand = self.__frames_to_dynamic_hand(left_frames) if len(left_frames) else None
+        right_hand = self.__frames_to_dynamic_hand(right_frames) if len(right_frames) else None
+
+        return self.__factory.create_dynamic_gesture(left_hand, right_hand)
+    
+    def update_stream(self, hand: str, frame: np.ndarray):
+        """
+        Adds a frame to the streaming statistics of a hand, in constant time regardless of the window size.
+
+        Args:
+            hand (str): 'left' or 'right'.
+            frame (np.ndarray): The parsed frame row.
+        """
+        sample = self.__sample
+        gyro = frame[GYRO]
+        accel = frame[ACCEL]
+        sample[_STREAM_EULER] = frame[EULER]
+        sample[_STREAM_FLEX] = frame[FLEX]
+        sample[_STREAM_GYRO] = gyro
+        sample[_STREAM_ACCEL] = accel
+        sample[_STREAM_RESULTANT_ACCELERATION] = math.sqrt(accel.dot(accel))
+        sample[_STREAM_RESULTANT_ANGULAR_VELOCITY] = math.sqrt(gyro.dot(gyro))
+        # Its running mean tells whether any frame of the window moved, the check the batch path does per frame
+        sample[_STREAM_MOVING] = 1.0 if (gyro > 0.5).all() and (accel > 0.5).all() else 0.0
+        self.__streams[hand].update(sample)
+
+    def is_stream_ready(self) -> bool:
+        """
+        Checks if the streaming window of both hands is full.
+
+        Returns:
+            bool: True if both hands have `stream_window` frames, False otherwise.
+        """
+        return all(stream.count == self.stream_window for stream in self.__streams.values())
+
+    def is_stream_moving(self) -> bool:
+        """
+        Checks if any frame in the streaming window of either hand has every gyro and accelerometer value above 0.5.
+
+        Returns:
+            bool: True if a hand moved within the window, False otherwise.
+        """
+        # mean * count is the number of moving frames; compare against 0.5 to absorb the rounding of the running mean
+        return any(stream.mean[_STREAM_MOVING] * stream.count > 0.5 for stream in self.__streams.values())
+
+    def stream_to_dynamic_gesture(self) -> DynamicGesture.DynamicGesture:
+        """
+        Builds a dynamic gesture from the current streaming statistics of both hands.
+
+        Returns:
+            DynamicGesture.DynamicGesture: The dynamic gesture described by the current windows.
+        """
+        left_hand = self.__stream_to_dynamic_hand(self.__streams['left'])
+        right_hand = self.__stream_to_dynamic_hand(self.__streams['right'])
+
+        return self.__factory.create_dynamic_gesture(left_hand, right_hand)
+
+    def reset_stream(self):
+        """
+        Discards the frames of the streaming windows of both hands.
+        """
+        for stream in self.__streams.values():
+            stream.reset()
+
+    def __stream_to_dynamic_hand(self, stream: SlidingWindowStatistics) -> DynamicGesture.Hand:
+        """
+        Converts the streaming statistics of a hand to a DynamicGesture.Hand object.
+
+        Args:
+            stream (SlidingWindowStatistics): The statistics of the hand.
+
+        Returns:
+            DynamicGesture.Hand: The converted DynamicGesture.Hand object, or None if no frame was streamed.
+        """
+        if stream.count == 0:
+            return None
+        mean = stream.mean
+        std = stream.std
+        roll, pitch, yaw = mean[_STREAM_EULER].tolist()
+
+        return DynamicGesture.Hand(
+            roll=roll,
+            pitch=pitch,
+            yaw=yaw,
+            finger_flex=mean[_STREAM_FLEX].astype(int).tolist(),
+            mean_acceleration=float(mean[_STREAM_RESULTANT_ACCELERATION]),
+            std_acceleration=float(std[_STREAM_RESULTANT_ACCELERATION]),
+            mean_angular_velocity=float(mean[_STREAM_RESULTANT_ANGULAR_VELOCITY]),
+            std_angular_velocity=float(std[_STREAM_RESULTANT_ANGULAR_VELOCITY]),
+            gyro_axis=self.__get_movement_axis(mean[_STREAM_GYRO]).value,
+            accel_axis=self.__get_movement_axis(mean[_STREAM_ACCEL]).value
+        )
+    
     def __get_movement_axis(self, mean):
         """
         Get the movement axis based on the mean values.
@@ -83,4 +207,37 @@ class GestureMapperService:
             std_angular_velocity=std_angular_velocity,
             gyro_axis=gyro_axis.value,
             accel_axis=accel_axis.value
-        )
\ No newline at end of file
+        )
+
+    def __frames_to_dynamic_hand(self, frames: np.ndarray) -> DynamicGesture.Hand:
+        """
+        Converts a window of parsed frames of one hand to a DynamicGesture.Hand object.
+
+        Args:
+            frames (np.ndarray): The (n, FRAME_WIDTH) frames of the hand, n > 0.
+
+        Returns:
+            DynamicGesture.Hand: The converted DynamicGesture.Hand object.
+        """
+        gyros = frames[:, GYRO]
+        accels = frames[:, ACCEL]
+        roll, pitch, yaw = np.mean(frames[:, EULER], axis=0).tolist()
+
+        gyro_axis = self.__get_movement_axis(np.mean(gyros, axis=0))
+        accel_axis = self.__get_movement_axis(np.mean(accels, axis=0))
+
+        resultant_acceleration = np.linalg.norm(accels, axis=1)
+        resultant_angular_velocity = np.linalg.norm(gyros, axis=1)
+
+        return DynamicGesture.Hand(
+            roll=roll,
+            pitch=pitch,
+            yaw=yaw,
+            finger_flex=np.mean(frames[:, FLEX], axis=0).astype(int).tolist(),
+            mean_acceleration=float(np.mean(resultant_acceleration)),
+            std_acceleration=float(np.std(resultant_acceleration)),
+            mean_angular_velocity=float(np.mean(resultant_angular_velocity)),
+            std_angular_velocity=float(np.std(resultant_angular_velocity)),
+            gyro_axis=gyro_axis.value,
+            accel_axis=accel_axis.value
+        )
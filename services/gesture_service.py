@@ -28,9 +28,14 @@ sys.path.append(os.path.join(script_dir, '..'))
 import repositories.gesture_repository
 import classes.DynamicGesture as DynamicGesture
 import classes.StaticGesture as StaticGesture
+from classes.FeatureTransform import FeatureTransform, HAND_FEATURES
+from controllers.frame_parser import EULER, FLEX
 
 import numpy as np
 
+# Thresholds for the identity transform, in the raw units of the features
+DEFAULT_ERROR_RANGES = {'static': 150.0, 'static_both': 950.0, 'dynamic': 30.0}
+
 class GestureService:
     """
     Service class for recognizing static and dynamic gestures.
@@ -39,9 +44,50 @@ class GestureService:
         gesture_repository (GestureRepository): The repository for accessing predefined gestures.
     """
 
-    def __init__(self):
-         
-        self.__single_names, self.__single_tree, self.__both_names, self.__both_tree  = repositories.gesture_repository.GestureRepository().get_gestures()
+    def __init__(self, transform: FeatureTransform = None, hot_reload: bool = False, reload_interval: float = 2.0):
+        """
+        Initializes the GestureService class, indexing the stored gestures.
+
+        Args:
+            transform (FeatureTransform, optional): The feature transform the gestures are indexed and queried with. Its
+                error ranges, if any, replace the defaults. Defaults to the identity transform.
+            hot_reload (bool, optional): Whether to pick up changes to the gestures database while running.
+            reload_interval (float, optional): Seconds between two checks of the database when hot reload is enabled.
+        """
+        self.__transform = transform if transform is not None else FeatureTransform()
+        self.__error_ranges = dict(DEFAULT_ERROR_RANGES)
+        self.__error_ranges.update(self.__transform.error_ranges or {})
+        self.__repository = repositories.gesture_repository.GestureRepository(transform=self.__transform)
+        self.__index = self.__repository.get_gestures()
+        if hot_reload:
+            self.__repository.watch(self.swap_index, reload_interval)
+        
+    def swap_index(self, index):
+        """
+        Replaces the gesture index used for recognition.
+
+        The index is swapped with a single reference assignment and every recognition reads the reference once, so a
+        recognition running during the swap completes entirely on the old or entirely on the new index.
+
+        Args:
+            index (GestureIndex): The new, fully built, index.
+        """
+        self.__index = index
+
+    def get_gesture_names(self):
+        """
+        Returns the names of every gesture that can currently be recognised.
+
+        Returns:
+            list: The gesture names.
+        """
+        return self.__index.get_names()
+
+    def close(self):
+        """
+        Stops watching the gestures database.
+        """
+        self.__repository.stop_watching()
         
     def _extract_static_hand_features(self, hand: StaticGesture.Hand):
         """
@@ -71,71 +117,206 @@ class GestureService:
             hand.accel_axis, hand.gyro_axis
         ])
     
-    def recognise_static_gesture(self, gesture: StaticGesture.StaticGesture, error_range=150.0): 
+    def recognise_static_gesture(self, gesture: StaticGesture.StaticGesture, error_range=None): 
         """
         Recognizes a gesture by comparing it with a set of predefined gestures.
 
         Args:
             gesture (StaticGesture.StaticGesture): The gesture to be recognized.
-            error_range (float, optional): The allowed error range for matching the gesture. Defaults to 0.1.
+            error_range (float, optional): The allowed error range for matching a single-hand gesture, two-hand gestures
+                allow the configured margin on top of it. Defaults to the configured 'static' error range.
 
         Returns:
             str or None: The name of the recognized gesture, or None if no matching gesture is found within the error range.
         """
+        if error_range is None:
+            error_range = self.__error_ranges['static']
+        both_error_range = error_range + self.__error_ranges['static_both'] - self.__error_ranges['static']
         
+        index = self.__index
         left_hand_features = self._extract_static_hand_features(gesture.left_hand)
         right_hand_features = self._extract_static_hand_features(gesture.right_hand)
         points = np.concatenate((left_hand_features, right_hand_features))
         queries = [
-            (self.__both_tree, points, self.__both_names, error_range+800.0),
-            (self.__single_tree, right_hand_features, self.__single_names, error_range)
+            (index.both, points, both_error_range),
+            (index.single, right_hand_features, error_range)
         ]
 
-        for tree, features, names, error in queries:
-            distance, index = tree.query(features, k=1)
+        for tree, features, error in queries:
+            distance, nearest = tree.query(features)
             if distance <= error:
-                return names[index]
+                return tree.names[nearest]
         
         return None
                 
-    def recognise_dynamic_gesture(self, gesture: DynamicGesture.DynamicGesture, error_range=30.0): 
+    def recognise_dynamic_gesture(self, gesture: DynamicGesture.DynamicGesture, error_range=None): 
         """
         Recognizes a dynamic gesture by comparing it with the set of predefined gestures.
 
         Args:
             gesture (DynamicGesture.DynamicGesture): The dynamic gesture to be recognized.
-            error_range (float, optional): The error range allowed for matching the gesture. Defaults to 30.0.
+            error_range (float, optional): The error range allowed for matching the gesture. Defaults to the configured
+                'dynamic' error range.
 
         Returns:
             str or None: The name of the nearest matching gesture if it falls within the error range and movement bounds, 
             otherwise returns None.
         """
+        if error_range is None:
+            error_range = self.__error_ranges['dynamic']
                 
+        index = self.__index
         left_hand_features = self._extract_dynamic_hand_features(gesture.left_hand)
         right_hand_features = self._extract_dynamic_hand_features(gesture.right_hand)
         points = np.concatenate((left_hand_features, right_hand_features))
         
         queries = [
-            (self.__both_tree, points, self.__both_names),
-            (self.__single_tree, right_hand_features, self.__single_names)
+            (index.both, points),
+            (index.single, right_hand_features)
         ]
         
-        for tree, features, names in queries:
-            distance, index = tree.query(features, k=1)
-            nearest_name = names[index]
-            nearest_point = tree.data[index]
-            
-            within_movement_bounds = (
-                (((points[8] > nearest_point[8]) and (points[9] < nearest_point[9]) and (points[12] == nearest_point[12])) or
-                (points[10] > nearest_point[10]) and (points[11] < nearest_point[11]) and (points[13] == nearest_point[13])) 
-                or
-                ((((points[22] > nearest_point[22]) and (points[23] < nearest_point[23]) and (points[26] == nearest_point[26])) or
-                (points[24] > nearest_point[24]) and (points[25] < nearest_point[25]) and (points[27] == nearest_point[27]))
-                if len(nearest_point) > 27 else False)
-            )
+        for tree, features in queries:
+            distance, nearest = tree.query(features)
+            if nearest < 0:
+                continue
+            nearest_name = tree.names[nearest]
+            # The movement bounds compare raw features, whatever space the tree was built in
+            nearest_point = tree.features[nearest]
+            within_movement_bounds = self.__within_movement_bounds(points[np.newaxis], nearest_point[np.newaxis])[0]
             
             if distance <= error_range or within_movement_bounds:
                 print(f'Nearest gesture: {nearest_name} with distance: {distance}.')
                 return nearest_name
         
-        return None
\ No newline at end of file
+        return None
+
+    def static_features_from_frames(self, left_frames: np.ndarray, right_frames: np.ndarray) -> np.ndarray:
+        """
+        Builds the static features of many frames at once, as `recognise_static_gesture` does for one gesture.
+
+        Args:
+            left_frames (np.ndarray): The (n, FRAME_WIDTH) parsed frames of the left hand.
+            right_frames (np.ndarray): The (n, FRAME_WIDTH) parsed frames of the right hand.
+
+        Returns:
+            np.ndarray: The (n, 28) feature matrix, left hand features first.
+        """
+        features = np.zeros((len(left_frames), 2 * HAND_FEATURES))
+        for offset, frames in ((0, left_frames), (HAND_FEATURES, right_frames)):
+            features[:, offset:offset + 3] = frames[:, EULER]
+            features[:, offset + 3:offset + 8] = frames[:, FLEX]
+        return features
+
+    def recognise_static_gestures(self, features: np.ndarray, error_range=None):
+        """
+        Recognizes many static gestures at once, with one vectorized query per tree.
+
+        Applies the same rules as `recognise_static_gesture`: a two-hand gesture within its error range wins, otherwise
+        the right hand is matched against the single-hand gestures.
+
+        Args:
+            features (np.ndarray): The (n, 28) raw features of the gestures, left hand first.
+            error_range (float, optional): The allowed error range for matching a single-hand gesture, two-hand gestures
+                allow the configured margin on top of it. Defaults to the configured 'static' error range.
+
+        Returns:
+            tuple: (names, distances), arrays of shape (n,). Names is an object array holding None where nothing
+            matched, and distances holds the distance to the recognized gesture, or infinity.
+        """
+        if error_range is None:
+            error_range = self.__error_ranges['static']
+        both_error_range = error_range + self.__error_ranges['static_both'] - self.__error_ranges['static']
+
+        index = self.__index
+        features = np.asarray(features, dtype=float)
+        names = np.full(len(features), None, dtype=object)
+        distances = np.full(len(features), np.inf)
+        unmatched = np.ones(len(features), dtype=bool)
+
+        queries = [
+            (index.both, features, both_error_range),
+            (index.single, features[:, HAND_FEATURES:], error_range)
+        ]
+
+        for tree, points, error in queries:
+            if not unmatched.any():
+                break
+            distance, nearest = tree.query(points[unmatched])
+            matched = distance <= error
+            rows = np.flatnonzero(unmatched)[matched]
+            names[rows] = tree.names[nearest[matched]]
+            distances[rows] = distance[matched]
+            unmatched[rows] = False
+
+        return names, distances
+
+    def recognise_dynamic_gestures(self, features: np.ndarray, error_range=None):
+        """
+        Recognizes many dynamic gestures at once, with one vectorized query per tree.
+
+        Applies the same rules as `recognise_dynamic_gesture`: the nearest gesture of each tree is accepted if it is
+        within the error range or within the movement bounds, two-hand gestures first.
+
+        Args:
+            features (np.ndarray): The (n, 28) raw features of the gestures, left hand first.
+            error_range (float, optional): The error range allowed for matching the gesture. Defaults to the configured
+                'dynamic' error range.
+
+        Returns:
+            tuple: (names, distances), arrays of shape (n,). Names is an object array holding None where nothing
+            matched, and distances holds the distance to the recognized gesture, or infinity.
+        """
+        if error_range is None:
+            error_range = self.__error_ranges['dynamic']
+
+        index = self.__index
+        features = np.asarray(features, dtype=float)
+        names = np.full(len(features), None, dtype=object)
+        distances = np.full(len(features), np.inf)
+        unmatched = np.ones(len(features), dtype=bool)
+
+        queries = [
+            (index.both, features),
+            (index.single, features[:, HAND_FEATURES:])
+        ]
+
+        for tree, points in queries:
+            if not unmatched.any():
+                break
+            rows = np.flatnonzero(unmatched)
+            distance, nearest = tree.query(points[rows])
+            found = nearest >= 0
+            rows, distance, nearest = rows[found], distance[found], nearest[found]
+
+            within_movement_bounds = self.__within_movement_bounds(features[rows], tree.features[nearest])
+            matched = (distance <= error_range) | within_movement_bounds
+            rows = rows[matched]
+            names[rows] = tree.names[nearest[matched]]
+            distances[rows] = distance[matched]
+            unmatched[rows] = False
+
+        return names, distances
+
+    def __within_movement_bounds(self, points: np.ndarray, nearest_points: np.ndarray) -> np.ndarray:
+        """
+        Checks, for each query, whether the movement of a hand exceeds the mean and stays under the deviation of the
+        nearest stored gesture along the same axis, for acceleration or angular velocity.
+
+        Args:
+            points (np.ndarray): The (n, 28) raw features of the queries.
+            nearest_points (np.ndarray): The (n, 14) or (n, 28) raw features of their nearest stored gestures.
+
+        Returns:
+            np.ndarray: A boolean array of shape (n,).
+        """
+        def hand_within_bounds(offset):
+            p = points[:, offset:offset + HAND_FEATURES]
+            n = nearest_points[:, offset:offset + HAND_FEATURES]
+            acceleration = (p[:, 8] > n[:, 8]) & (p[:, 9] < n[:, 9]) & (p[:, 12] == n[:, 12])
+            angular_velocity = (p[:, 10] > n[:, 10]) & (p[:, 11] < n[:, 11]) & (p[:, 13] == n[:, 13])
+            return acceleration | angular_velocity
+
+        within = hand_within_bounds(0)
+        if nearest_points.shape[1] == 2 * HAND_FEATURES:
+            within |= hand_within_bounds(HAND_FEATURES)
+        return within
@@ -0,0 +1,335 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds, in seconds, of the latency buckets: from the microseconds of parsing a frame to the seconds of speech
+LATENCY_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """
+    Counts observations into fixed buckets, cheaply enough to observe every frame.
+
+    Observations take no lock: each histogram is observed by a single thread, and a scrape running meanwhile may see an
+    observation in its bucket before it is added to the sum.
+
+    Attributes:
+        bounds (tuple): The upper bounds of the buckets, in increasing order. A last bucket holds everything above.
+        counts (list): The number of observations in each bucket.
+        sum (float): The sum of the observations.
+    """
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """
+        Adds an observation.
+
+        Args:
+            value (float): The observed value, e.g. a duration in seconds.
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self):
+        """
+        Gets the number of observations.
+
+        Returns:
+            int: The number of observations.
+        """
+        return sum(self.counts)
+
+    def quantile(self, q: float):
+        """
+        Estimates a quantile by interpolating within its bucket.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            float or None: The estimate, or None if nothing was observed. Quantiles in the last bucket are reported as
+                its lower bound.
+        """
+        counts = list(self.counts)
+        total = sum(counts)
+        if not total:
+            return None
+        rank, seen = q * total, 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+class Counter:
+    """
+    A count that only goes up, incremented by a single thread.
+
+    Attributes:
+        value (float): The count.
+    """
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        """
+        Increments the count.
+
+        Args:
+            amount (float): The increment.
+        """
+        self.value += amount
+
+class MetricsRegistry:
+    """
+    The metrics of the pipeline, rendered in the Prometheus text format or as a snapshot for structured logs.
+
+    Hot paths own Histogram and Counter objects obtained once from the registry, so recording costs a few additions.
+    Counters the components already keep, such as the statistics of the serial reader, are read from collectors only
+    when the metrics are rendered.
+    """
+
+    def __init__(self):
+        self._families = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, description: str, bounds=LATENCY_BUCKETS, **labels) -> Histogram:
+        """
+        Returns the histogram of a name and labels, creating it on first use.
+
+        Args:
+            name (str): The metric name, e.g. 'signify_stage_seconds'.
+            description (str): The help text of the metric.
+            bounds (tuple): The upper bounds of the buckets of a new histogram.
+            **labels: The labels of the histogram, e.g. stage='parse'.
+
+        Returns:
+            Histogram: The histogram.
+        """
+        return self.__get(name, 'histogram', description, labels, lambda: Histogram(bounds))
+
+    def stage(self, stage: str, **labels) -> Histogram:
+        """
+        Returns the latency histogram of a stage of the pipeline.
+
+        Args:
+            stage (str): The stage, e.g. 'parse' or 'playback'.
+            **labels: More labels, e.g. hand='left'.
+
+        Returns:
+            Histogram: The 'signify_stage_seconds' histogram of the stage.
+        """
+        return self.histogram('signify_stage_seconds', 'Seconds spent in each stage of the pipeline.', stage=stage, **labels)
+
+    def counter(self, name: str, description: str, **labels) -> Counter:
+        """
+        Returns the counter of a name and labels, creating it on first use.
+
+        Args:
+            name (str): The metric name, ending in '_total'.
+            description (str): The help text of the metric.
+            **labels: The labels of the counter.
+
+        Returns:
+            Counter: The counter.
+        """
+        return self.__get(name, 'counter', description, labels, Counter)
+
+    def add_collector(self, collect):
+        """
+        Adds a source of metrics read when the metrics are rendered.
+
+        Args:
+            collect (callable): Returns an iterable of (name, kind, description, labels, value) samples, where kind is
+                'counter' or 'gauge' and labels is a dict.
+        """
+        with self._lock:
+            self._collectors.append(collect)
+
+    def collect(self) -> dict:
+        """
+        Gathers every metric.
+
+        Returns:
+            dict: (kind, description, samples) by metric name, where samples is a list of (labels, value) and the
+                value of a histogram sample is the Histogram itself.
+        """
+        with self._lock:
+            families = {name: (kind, description, [(dict(labels), metric) for labels, metric in metrics.items()])
+                        for name, (kind, description, metrics) in self._families.items()}
+            collectors = list(self._collectors)
+        for collect in collectors:
+            try:
+                for name, kind, description, labels, value in collect():
+                    families.setdefault(name, (kind, description, []))[2].append((labels, value))
+            except Exception as e:
+                print(f'Error collecting metrics: {e}')
+        return families
+
+    def render(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics.
+        """
+        lines = []
+        for name, (kind, description, samples) in sorted(self.collect().items()):
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                if kind != 'histogram':
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value.value if isinstance(value, Counter) else value)}')
+                    continue
+                counts, cumulative = list(value.counts), 0
+                for bound, count in zip(value.bounds + (float('inf'),), counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(value.sum)}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> dict:
+        """
+        Summarizes the metrics for a structured log.
+
+        Returns:
+            dict: The value of every counter and gauge, and the count, mean, median and 99th percentile of every
+                histogram, keyed by the metric name followed by its labels.
+        """
+        snapshot = {'counters': {}, 'gauges': {}, 'histograms': {}}
+        for name, (kind, _, samples) in self.collect().items():
+            for labels, value in samples:
+                key = name + _format_labels(labels)
+                if kind == 'histogram':
+                    count = value.count
+                    snapshot['histograms'][key] = {'count': count, 'mean': value.sum / count if count else None,
+                                                   'p50': value.quantile(0.5), 'p99': value.quantile(0.99)}
+                else:
+                    snapshot[kind + 's'][key] = value.value if isinstance(value, Counter) else value
+        return snapshot
+
+    def __get(self, name, kind, description, labels, create):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._families.setdefault(name, (kind, description, {}))
+            if family[0] != kind:
+                raise ValueError(f"Metric '{name}' is already a {family[0]}.")
+            metrics = family[2]
+            if key not in metrics:
+                metrics[key] = create()
+            return metrics[key]
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class MetricsServer:
+    """
+    Serves the metrics on a local HTTP endpoint for Prometheus to scrape, on its own thread.
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: int = 9464, host: str = '127.0.0.1'):
+        """
+        Initializes the MetricsServer class and starts serving `/metrics`.
+
+        Args:
+            registry (MetricsRegistry): The metrics to serve.
+            port (int): The port to listen on, 0 for any free port.
+            host (str): The address to listen on. Defaults to this machine only.
+        """
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes every few seconds would flood the console
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+        print(f'Serving metrics on http://{host}:{self.port}/metrics')
+
+    def close(self):
+        """
+        Stops serving the metrics.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+class MetricsLogger:
+    """
+    Prints a snapshot of the metrics as one JSON line at a fixed interval, with the rate of every counter since the
+    previous line.
+    """
+
+    def __init__(self, registry: MetricsRegistry, interval: float = 10.0, write=print):
+        """
+        Initializes the MetricsLogger class and starts its thread.
+
+        Args:
+            registry (MetricsRegistry): The metrics to log.
+            interval (float): Seconds between two lines.
+            write (callable): Receives each line. Defaults to printing it.
+        """
+        self._registry = registry
+        self.interval = interval
+        self._write = write
+        self._stop_event = threading.Event()
+        self._previous = None
+        self._thread = threading.Thread(target=self.__log_metrics, name='metrics-log', daemon=True)
+        self._thread.start()
+
+    def log(self):
+        """
+        Writes a line now.
+        """
+        now = time.monotonic()
+        snapshot = self._registry.snapshot()
+        if self._previous is not None:
+            previous_time, previous_counters = self._previous
+            elapsed = now - previous_time
+            snapshot['rates'] = {key: (value - previous_counters.get(key, 0)) / elapsed
+                                 for key, value in snapshot['counters'].items()} if elapsed > 0 else {}
+        self._previous = (now, snapshot['counters'])
+        self._write(json.dumps({'time': time.time(), 'metrics': snapshot}, sort_keys=True))
+
+    def close(self):
+        """
+        Stops the thread after writing a last line.
+        """
+        self._stop_event.set()
+        self._thread.join()
+
+    def __log_metrics(self):
+        while not self._stop_event.wait(self.interval):
+            self.log()
+        self.log()
@@ -0,0 +1,79 @@
+import time
+
+class PhraseAssembler:
+    """
+    Collects recognized words into phrases, so fluent signing is spoken as one utterance instead of word by word.
+
+    A phrase ends when no new word arrives for `pause` seconds, when an end-of-phrase gesture is recognized, or when it
+    reaches `max_words`. The finished phrase is handed to `speak` as a tuple of words.
+    """
+
+    def __init__(self, speak, pause: float = 1.0, end_gestures=(), max_words: int = 16):
+        """
+        Initializes the PhraseAssembler class.
+
+        Args:
+            speak (callable): Receives each finished phrase, e.g. PlaybackWorker.speak.
+            pause (float): Seconds without a new word after which the phrase is finished.
+            end_gestures (iterable): Names of the gestures that finish the phrase. They are not spoken.
+            max_words (int): The largest number of words in a phrase.
+        """
+        self._speak = speak
+        self.pause = pause
+        self.end_gestures = frozenset(end_gestures)
+        self.max_words = max_words
+        self._words = []
+        self._last_word_time = None
+        self.phrases = 0
+
+    def add(self, word: str, now: float = None):
+        """
+        Adds a recognized word to the phrase, finishing it if the word is an end-of-phrase gesture or fills it.
+
+        Args:
+            word (str): The name of the recognized gesture.
+            now (float, optional): The monotonic time the word was recognized at. Defaults to the current time.
+        """
+        if word in self.end_gestures:
+            self.flush()
+            return
+        self._words.append(word)
+        self._last_word_time = time.monotonic() if now is None else now
+        if len(self._words) >= self.max_words:
+            self.flush()
+
+    def poll(self, now: float = None):
+        """
+        Finishes the phrase if the signer paused. Called on every iteration of the main loop.
+
+        Args:
+            now (float, optional): The current monotonic time. Defaults to the current time.
+        """
+        if self._words and (time.monotonic() if now is None else now) - self._last_word_time >= self.pause:
+            self.flush()
+
+    def flush(self):
+        """
+        Speaks the words collected so far as one phrase, if there are any.
+
+        Returns:
+            tuple or None: The phrase that was spoken, or None if there were no words.
+        """
+        if not self._words:
+            return None
+        phrase = tuple(self._words)
+        self._words.clear()
+        self._last_word_time = None
+        self.phrases += 1
+        self._speak(phrase)
+        return phrase
+
+    @property
+    def pending_words(self):
+        """
+        Gets the words of the phrase being collected.
+
+        Returns:
+            tuple: The words, in the order they were recognized.
+        """
+        return tuple(self._words)
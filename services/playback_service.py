@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import deque
+
+class PlaybackWorker:
+    """
+    Speaks words on a dedicated thread, so the main loop never waits for synthesis or playback.
+
+    Words are queued with `speak` and played one at a time. When words are recognized faster than they can be spoken,
+    the policy decides what is kept:
+
+    * 'queue': every word is spoken in order. New words are rejected once `max_pending` are waiting.
+    * 'coalesce': a word equal to the one being spoken or the last one waiting is merged with it. Once `max_pending`
+      words are waiting, the oldest one is dropped.
+    * 'drop_stale': words that waited longer than `max_age` seconds are skipped when their turn comes. Once
+      `max_pending` words are waiting, the oldest one is dropped.
+    """
+
+    POLICIES = ('queue', 'coalesce', 'drop_stale')
+
+    def __init__(self, player, render, policy: str = 'coalesce', max_pending: int = 4, max_age: float = 2.0, metrics=None):
+        """
+        Initializes the PlaybackWorker class and starts its thread.
+
+        Args:
+            player (SpeechFileManager): Plays the clips, through its `start_clip` method.
+            render (callable): Returns the AudioClip of a word, or None if there is nothing to play, e.g. AudioCache.get.
+            policy (str): What to do when words arrive faster than they are spoken, one of POLICIES.
+            max_pending (int): The largest number of words waiting to be spoken.
+            max_age (float): Seconds after which a waiting word is stale, for the 'drop_stale' policy.
+            metrics (MetricsRegistry, optional): Receives the time spent rendering and playing each word, and the
+                playback counters.
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown playback policy '{policy}', expected one of {self.POLICIES}.")
+        self.policy = policy
+        self.max_pending = max_pending
+        self.max_age = max_age
+        self._player = player
+        self._render = render
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._speaking = None
+        self._play_obj = None
+        self._generation = 0  # Incremented by cancel, so a word rendered meanwhile is not played
+        self._closed = False
+        self._statistics = {'queued': 0, 'spoken': 0, 'rejected': 0, 'coalesced': 0, 'dropped': 0, 'stale': 0, 'cancelled': 0}
+        if metrics is not None:
+            self._render_seconds = metrics.stage('synthesis')
+            self._play_seconds = metrics.stage('playback')
+            metrics.add_collector(lambda: (('signify_words_total', 'counter', 'Words handed to the playback worker, by outcome.', {'outcome': outcome}, value)
+                                           for outcome, value in self.get_statistics().items()))
+        else:
+            self._render_seconds = self._play_seconds = None
+        self._thread = threading.Thread(target=self.__play_words, name='speech-playback', daemon=True)
+        self._thread.start()
+
+    def speak(self, text: str) -> bool:
+        """
+        Queues a word to be spoken, without waiting.
+
+        Args:
+            text (str): The word.
+
+        Returns:
+            bool: False if the word was rejected or merged with another one, True if it was queued.
+        """
+        with self._condition:
+            if self.policy == 'coalesce':
+                last = self._pending[-1][0] if self._pending else self._speaking
+                if text == last:
+                    self._statistics['coalesced'] += 1
+                    return False
+
+            if len(self._pending) >= self.max_pending:
+                if self.policy == 'queue':
+                    self._statistics['rejected'] += 1
+                    return False
+                self._pending.popleft()
+                self._statistics['dropped'] += 1
+
+            self._pending.append((text, time.monotonic()))
+            self._statistics['queued'] += 1
+            self._condition.notify()
+            return True
+
+    def cancel(self):
+        """
+        Stops the word being spoken and discards every waiting word.
+        """
+        with self._condition:
+            self._statistics['cancelled'] += len(self._pending) + (self._speaking is not None)
+            self._pending.clear()
+            self._generation += 1
+            if self._play_obj is not None:
+                self._play_obj.stop()
+
+    def __play_words(self):
+        """
+        Speaks the queued words until the worker is closed.
+        """
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                text, queued_at = self._pending.popleft()
+                if self.policy == 'drop_stale' and time.monotonic() - queued_at > self.max_age:
+                    self._statistics['stale'] += 1
+                    continue
+                self._speaking = text
+                generation = self._generation
+
+            try:
+                started = time.perf_counter()
+                clip = self._render(text)
+                rendered = time.perf_counter()
+                if self._render_seconds is not None:
+                    self._render_seconds.observe(rendered - started)
+                with self._condition:
+                    if generation != self._generation or clip is None:
+                        continue  # Cancelled while rendering, or nothing to play
+                    self._play_obj = play_obj = self._player.start_clip(clip)
+                if play_obj is not None:
+                    play_obj.wait_done()
+                if self._play_seconds is not None:
+                    self._play_seconds.observe(time.perf_counter() - rendered)
+                with self._condition:
+                    if generation == self._generation:
+                        self._statistics['spoken'] += 1
+            except Exception as e:
+                print(f'Error speaking "{text}": {e}')
+            finally:
+                with self._condition:
+                    self._speaking = None
+                    self._play_obj = None
+
+    def get_statistics(self):
+        """
+        Returns the playback counters.
+
+        Returns:
+            dict: The number of words queued, spoken, rejected, coalesced, dropped, skipped as stale and cancelled.
+        """
+        with self._condition:
+            return dict(self._statistics)
+
+    def close(self):
+        """
+        Stops the word being spoken, discards the waiting ones and stops the thread.
+        """
+        self.cancel()
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
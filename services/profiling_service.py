@@ -0,0 +1,209 @@
+import cProfile
+import os
+import re
+import sys
+import threading
+import tracemalloc
+from collections import Counter, defaultdict
+
+class PipelineProfiler:
+    """
+    Profiles every thread of the pipeline, and optionally tracks memory allocations, writing one profile per thread.
+
+    Two profilers are available:
+
+    * 'sample': a background thread records the stack of every other thread every `interval` seconds. The overhead is
+      low and spread evenly, so timings stay realistic. Each thread gets a `<thread>.folded` file of collapsed stacks
+      with their sample counts, which flame graph tools such as speedscope or flamegraph.pl read.
+    * 'cprofile': every thread started after `start` gets its own cProfile.Profile, written as `<thread>.pstats` for
+      pstats or snakeviz. Every call is counted, at the cost of slowing the profiled threads down.
+
+    Recording stops with `stop`, or once the window given by `duration` or `frames` is over, while the pipeline keeps
+    running. With the 'cprofile' profiler, threads other than the one stopping keep their profiler until they end.
+    """
+
+    MODES = ('sample', 'cprofile')
+
+    def __init__(self, output_dir: str = 'profiles', mode: str = 'sample', trace_memory: bool = False, duration: float = None, frames: int = None, interval: float = 0.005):
+        """
+        Initializes the PipelineProfiler class.
+
+        Args:
+            output_dir (str): The directory the profiles are written to.
+            mode (str, optional): The profiler, one of MODES, or None to only track allocations.
+            trace_memory (bool): Whether to track memory allocations with tracemalloc, written to `tracemalloc.txt`
+                and `tracemalloc.snapshot`.
+            duration (float, optional): Seconds after which recording stops.
+            frames (int, optional): The number of processed frames after which recording stops.
+            interval (float): Seconds between two samples, for the 'sample' profiler.
+
+        Raises:
+            ValueError: If the profiler is unknown, or there is nothing to record.
+        """
+        if mode is not None and mode not in self.MODES:
+            raise ValueError(f"Unknown profiler '{mode}', expected one of {self.MODES}.")
+        if mode is None and not trace_memory:
+            raise ValueError('Choose a profiler, memory tracking or both.')
+        self.output_dir = output_dir
+        self.mode = mode
+        self.trace_memory = trace_memory
+        self.duration = duration
+        self.frames = frames
+        self.interval = interval
+        self._frames_seen = 0
+        self._lock = threading.Lock()
+        self._started = self._stopped = False
+        self._timer = None
+        self._sampler = None
+        self._sampling_stopped = threading.Event()
+        self._samples = defaultdict(Counter)
+        self._profiles = []
+
+    def start(self):
+        """
+        Starts recording. Threads started before this call are only covered by the 'sample' profiler, so the profiler
+        must be started before the pipeline.
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.trace_memory:
+            tracemalloc.start(10)
+        if self.mode == 'sample':
+            self._sampler = threading.Thread(target=self.__sample, name='profiler-sampler', daemon=True)
+            self._sampler.start()
+        elif self.mode == 'cprofile':
+            threading.setprofile(self.__profile_new_thread)
+            self.__enable_thread_profile()
+        if self.duration is not None:
+            self._timer = threading.Timer(self.duration, self.stop)
+            self._timer.daemon = True
+            self._timer.start()
+        window = f" for {self.duration} s" if self.duration is not None else f" for {self.frames} frames" if self.frames else ""
+        print(f"Profiling{window} into {self.output_dir}.")
+
+    def on_frame(self):
+        """
+        Counts a processed frame, stopping the recording once the frame window is over.
+        """
+        self._frames_seen += 1
+        if self.frames is not None and self._frames_seen == self.frames:
+            self.stop()
+
+    def stop(self):
+        """
+        Stops recording and writes the profiles. Later calls do nothing.
+        """
+        with self._lock:
+            if not self._started or self._stopped:
+                return
+            self._stopped = True
+        if self._timer is not None:
+            self._timer.cancel()
+
+        written = []
+        if self.mode == 'sample':
+            self._sampling_stopped.set()
+            self._sampler.join()
+            written += self.__write_samples()
+        elif self.mode == 'cprofile':
+            threading.setprofile(None)
+            written += self.__write_profiles()
+        if self.trace_memory:
+            written += self.__write_allocations()
+        print(f"Profiling stopped, {len(written)} files written to {self.output_dir}.")
+
+    def __sample(self):
+        """
+        Records the stack of every other thread until the sampling is stopped.
+        """
+        own = threading.get_ident()
+        while not self._sampling_stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                    frame = frame.f_back
+                self._samples[names.get(ident, f'thread-{ident}')][';'.join(reversed(stack))] += 1
+
+    def __write_samples(self) -> list:
+        written = []
+        for name, stacks in sorted(self._samples.items()):
+            path = self.__path(name, '.folded', written)
+            with open(path, 'w', encoding='utf-8') as file:
+                for stack, count in stacks.most_common():
+                    file.write(f'{stack} {count}\n')
+            written.append(path)
+
+            leaves = Counter()
+            for stack, count in stacks.items():
+                leaves[stack.rsplit(';', 1)[-1]] += count
+            total = sum(stacks.values())
+            top = ', '.join(f'{function} {count * 100 / total:.0f}%' for function, count in leaves.most_common(3))
+            print(f"  {name}: {total} samples, mostly in {top}")
+        return written
+
+    def __profile_new_thread(self, frame, event, arg):
+        """
+        Set by threading.setprofile in every new thread, and replaced by the thread's own profile on its first event.
+        """
+        self.__enable_thread_profile()
+
+    def __enable_thread_profile(self):
+        sys.setprofile(None)
+        with self._lock:
+            if self._stopped:
+                return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:  # Python 3.12 and later allow a single active cProfile
+            print(f"Cannot profile thread {threading.current_thread().name}: {e}")
+            return
+        with self._lock:
+            self._profiles.append((threading.current_thread().name, profile))
+
+    def __write_profiles(self) -> list:
+        written = []
+        with self._lock:
+            profiles = list(self._profiles)
+        for name, profile in profiles:
+            path = self.__path(name, '.pstats', written)
+            profile.dump_stats(path)
+            written.append(path)
+        return written
+
+    def __write_allocations(self) -> list:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        snapshot_path = os.path.join(self.output_dir, 'tracemalloc.snapshot')
+        snapshot.dump(snapshot_path)
+        report_path = os.path.join(self.output_dir, 'tracemalloc.txt')
+        with open(report_path, 'w', encoding='utf-8') as file:
+            file.write(f'Traced memory: {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB\n\n')
+            for statistic in snapshot.statistics('lineno')[:25]:
+                file.write(f'{statistic}\n')
+        print(f"  Allocations: {current / 1024:.1f} KiB traced, peak {peak / 1024:.1f} KiB")
+        return [snapshot_path, report_path]
+
+    def __path(self, thread_name: str, extension: str, written: list) -> str:
+        """
+        Returns the file a profile of a thread is written to, numbered if another thread had the same name.
+        """
+        base = os.path.join(self.output_dir, re.sub(r'[^\w.-]', '_', thread_name))
+        path, i = base + extension, 1
+        while path in written:
+            i += 1
+            path = f'{base}-{i}{extension}'
+        return path
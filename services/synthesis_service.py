@@ -0,0 +1,205 @@
+import itertools
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future
+
+from services.text_to_speech_service import BACKENDS, TTSBackend
+
+# Priorities of the requests: a word that has to be spoken now goes before the pre-rendering of the vocabulary
+SPEAK_NOW = 0
+PRERENDER = 1
+
+def _run_worker(backend, options: dict, requests, results):
+    """
+    Body of a synthesis worker: loads its own backend once, then serves requests until it receives None.
+
+    Args:
+        backend (type or TTSBackend): The TTSBackend class, or an instance to use as is.
+        options (dict): The arguments of the backend class.
+        requests (Queue): The (request_id, text, speaker_wav, language) requests.
+        results (Queue): Where (request_id, clip, error) results are put.
+    """
+    if isinstance(backend, type):
+        backend = backend(**options)
+    try:
+        backend.load()
+    except Exception as e:
+        print(f'Error loading the TTS backend: {e}')
+
+    while True:
+        request = requests.get()
+        if request is None:
+            return
+        request_id, text, speaker_wav, language = request
+        try:
+            results.put((request_id, backend.synthesize(text, speaker_wav, language), None))
+        except Exception as e:
+            results.put((request_id, None, f'{type(e).__name__}: {e}'))
+
+class SynthesisService:
+    """
+    Long-lived synthesis workers that keep the speech engine or model loaded and take requests over a queue.
+
+    Each worker, a thread or a separate process, creates and loads its own backend when it starts, so the model is
+    warmed up in the background and the engine is only ever used by the thread that created it. Requests are served
+    highest priority first, and identical requests waiting at the same time are synthesized once.
+
+    Backends that can run side by side (see TTSBackend.PARALLEL) can have several workers. With processes, CPU-heavy
+    neural synthesis scales across cores and never holds the interpreter lock of the recognition thread.
+
+    Attributes:
+        backend (TTSBackend): An unloaded instance of the backend, describing the speech the workers produce.
+    """
+
+    def __init__(self, backend='pyttsx3', workers: int = 1, processes: bool = False, **options):
+        """
+        Initializes the SynthesisService class and starts its workers.
+
+        Args:
+            backend (str, type or TTSBackend): The name of one of BACKENDS, or a TTSBackend class. An instance is used as
+                is, by a single worker thread.
+            workers (int): The number of workers. Backends that cannot run in parallel get one.
+            processes (bool): Whether the workers are separate processes instead of threads.
+            **options: Arguments of the backend class, e.g. model_name for 'coqui'.
+
+        Raises:
+            ValueError: If the backend is unknown, or is an instance and processes are requested.
+        """
+        if isinstance(backend, TTSBackend):
+            if processes:
+                raise ValueError('A backend instance cannot be moved to worker processes, pass its class instead.')
+            backend_class, workers, self.backend = backend, 1, backend
+        else:
+            backend_class = backend if isinstance(backend, type) and issubclass(backend, TTSBackend) else BACKENDS.get(backend)
+            if backend_class is None:
+                raise ValueError(f"Unknown TTS backend '{backend}', expected one of {tuple(BACKENDS)}.")
+            if workers > 1 and not backend_class.PARALLEL:
+                print(f"The '{backend_class.NAME}' backend cannot synthesize in parallel, using a single worker.")
+                workers = 1
+            self.backend = backend_class(**options)
+        self.workers = workers
+
+        self._pending = {}
+        self._waiting = queue.PriorityQueue()
+        self._lock = threading.Lock()
+        self._idle_workers = threading.Semaphore(workers)
+        self._sequence = itertools.count()
+        self._closed = False
+
+        if processes:
+            context = multiprocessing.get_context('spawn')
+            self._requests, self._results = context.Queue(), context.Queue()
+            self._workers = [context.Process(target=_run_worker, args=(backend_class, options, self._requests, self._results),
+                                             name=f'tts-worker-{i}', daemon=True) for i in range(workers)]
+        else:
+            self._requests, self._results = queue.Queue(), queue.Queue()
+            self._workers = [threading.Thread(target=_run_worker, args=(backend_class, options, self._requests, self._results),
+                                              name=f'tts-worker-{i}', daemon=True) for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+        self._dispatcher = threading.Thread(target=self.__dispatch_requests, name='tts-dispatcher', daemon=True)
+        self._collector = threading.Thread(target=self.__collect_results, name='tts-collector', daemon=True)
+        self._dispatcher.start()
+        self._collector.start()
+
+    def submit(self, text: str, priority: int = SPEAK_NOW, speaker_wav: str = None, language: str = None) -> Future:
+        """
+        Queues the synthesis of a text, without waiting.
+
+        Args:
+            text (str): The text to speak.
+            priority (int): SPEAK_NOW or PRERENDER, lower values are served first.
+            speaker_wav (str, optional): A recording of the voice to imitate, for backends that support voice cloning.
+            language (str, optional): The language of the text, for multilingual backends.
+
+        Returns:
+            Future: Resolves to the AudioClip, or None if the backend produced no speech.
+        """
+        key = (text, speaker_wav, language)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('The synthesis service is closed.')
+            request = self._pending.get(key)
+            if request is None:
+                request = self._pending[key] = {'future': Future(), 'priority': priority, 'dispatched': False}
+            elif request['dispatched'] or request['priority'] <= priority:
+                return request['future']
+            request['priority'] = priority
+        self._waiting.put((priority, next(self._sequence), key))
+        return request['future']
+
+    def convert_text_to_clip(self, text: str, speaker_wav: str = None, language: str = None):
+        """
+        Synthesizes a text and waits for the result.
+
+        Args:
+            text (str): The text to speak.
+            speaker_wav (str, optional): A recording of the voice to imitate. Used together with language.
+            language (str, optional): The language of the text.
+
+        Returns:
+            AudioClip or None: The speech, or None if the backend produced none.
+        """
+        return self.submit(text, SPEAK_NOW, speaker_wav, language).result()
+
+    def __dispatch_requests(self):
+        """
+        Hands the most urgent waiting request to the workers whenever one of them is idle.
+        """
+        while True:
+            self._idle_workers.acquire()
+            _, _, key = self._waiting.get()
+            if key is None:
+                return
+            with self._lock:
+                request = self._pending.get(key)
+                if request is None or request['dispatched']:
+                    self._idle_workers.release()  # Queued again with a higher priority, and already handed out
+                    continue
+                request['dispatched'] = True
+            self._requests.put((key, *key))
+
+    def __collect_results(self):
+        """
+        Resolves the future of each request as the workers finish them.
+        """
+        while True:
+            result = self._results.get()
+            if result is None:
+                return
+            key, clip, error = result
+            self._idle_workers.release()
+            with self._lock:
+                request = self._pending.pop(key, None)
+            if request is None:
+                continue
+            if error is None:
+                request['future'].set_result(clip)
+            else:
+                request['future'].set_exception(RuntimeError(f'Synthesis of "{key[0]}" failed: {error}'))
+
+    def close(self):
+        """
+        Stops the workers once they finish the text they are synthesizing. Waiting requests fail.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._waiting.put((-1, next(self._sequence), None))
+        self._idle_workers.release()
+        for _ in self._workers:
+            self._requests.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._results.put(None)
+        self._dispatcher.join()
+        self._collector.join()
+
+        with self._lock:
+            for request in self._pending.values():
+                if not request['future'].done():
+                    request['future'].set_exception(RuntimeError('The synthesis service was closed.'))
+            self._pending.clear()
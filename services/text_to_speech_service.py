@@ -1,49 +1,323 @@
-from TTS.api import TTS
-import pyttsx3
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from classes.AudioClip import AudioClip
 
-class TTSConverter:
-    def __init__(self, model_name: str):
+class TTSBackend(ABC):
+    """
+    A speech synthesizer that returns the speech of a text as an in-memory AudioClip.
+
+    Backends import their libraries and load their models in `load`, not when they are created, so choosing a backend
+    costs nothing until it is used.
+
+    Attributes:
+        NAME (str): The name the backend is registered with in BACKENDS.
+        WARM_UP_IN_BACKGROUND (bool): Whether `load` is slow enough to be worth running in a background thread at start
+            up, and safe to run in a thread other than the one that synthesizes.
+        PARALLEL (bool): Whether several instances of the backend can synthesize at the same time, each in its own
+            thread or process.
+    """
+
+    NAME = None
+    WARM_UP_IN_BACKGROUND = False
+    PARALLEL = False
+
+    def __init__(self):
+        self._loaded = False
+
+    @property
+    def is_loaded(self):
         """
-        Initialize the TTS model once.
+        Gets whether the backend has been loaded.
+
+        Returns:
+            bool: True once `load` has completed.
+        """
+        return self._loaded
+
+    def load(self):
+        """
+        Imports the libraries and loads the models of the backend. Does nothing if it is already loaded.
+        """
+        if not self._loaded:
+            self._load()
+            self._loaded = True
+
+    def get_config(self) -> dict:
+        """
+        Returns what determines the sound of the speech, so audio rendered with other settings can be told apart.
+
+        Returns:
+            dict: The backend name, voice and rate.
+        """
+        return {'backend': self.NAME, 'voice': None, 'rate': None}
+
+    @abstractmethod
+    def _load(self):
+        pass
+
+    @abstractmethod
+    def synthesize(self, text: str, speaker_wav: str = None, language: str = None):
+        """
+        Synthesizes the speech of a text in memory. The backend is loaded first if needed.
 
         Args:
-            model_name (str): The name of the TTS model to use.
+            text (str): The text to speak.
+            speaker_wav (str, optional): A recording of the voice to imitate, for backends that support voice cloning.
+            language (str, optional): The language of the text, for multilingual backends.
+
+        Returns:
+            AudioClip or None: The speech, or None if the backend produced none.
         """
-        self.tts = TTS(model_name)
-        self.output_file = 'resources/audioResources/audioTracks/audio.wav'
-        self.speaker_wav = 'resources/audioResources/speaker.wav'
-        self.language = 'es'
-        
+
+    def synthesize_to_file(self, text: str, file_path: str, speaker_wav: str = None, language: str = None):
+        """
+        Writes the speech of a text to a `.wav` file. Nothing is written if the backend produced no speech.
+
+        Args:
+            text (str): The text to speak.
+            file_path (str): The path of the `.wav` file to write.
+            speaker_wav (str, optional): A recording of the voice to imitate, for backends that support voice cloning.
+            language (str, optional): The language of the text, for multilingual backends.
+        """
+        clip = self.synthesize(text, speaker_wav, language)
+        if clip is not None:
+            clip.to_wave_file(file_path)
+
+class Pyttsx3Backend(TTSBackend):
+    """
+    Synthesizes speech with the voices of the operating system, through pyttsx3.
+
+    The engine is created in the thread that first synthesizes, as some platform drivers must be used from the thread
+    that created them. pyttsx3 can only synthesize to a file, so `synthesize` goes through a private temporary file.
+    """
+
+    NAME = 'pyttsx3'
+
+    def __init__(self, rate: int = 150, volume: float = 1.0, language: str = 'spanish'):
+        """
+        Initializes the Pyttsx3Backend class.
+
+        Args:
+            rate (int): Speed of speech, in words per minute.
+            volume (float): Volume, from 0.0 to 1.0.
+            language (str): Voices whose languages contain this string are preferred.
+        """
+        super().__init__()
+        self.rate = rate
+        self.volume = volume
+        self.language = language
+        self.engine = None
+
+    def get_config(self) -> dict:
+        return {'backend': self.NAME, 'voice': self.language, 'rate': self.rate, 'volume': self.volume}
+
+    def _load(self):
+        import pyttsx3
         self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 150)  # Speed of speech
-        self.engine.setProperty('volume', 1)  # Volume (0.0 to 1.0)
-        
+        self.engine.setProperty('rate', self.rate)  # Speed of speech
+        self.engine.setProperty('volume', self.volume)  # Volume (0.0 to 1.0)
+
         # Check and set the available voices
         voices = self.engine.getProperty('voices')
         for voice in voices:
-            if 'spanish' in voice.languages:
+            if self.language in voice.languages:
                 self.engine.setProperty('voice', voice.id)
 
+    def synthesize(self, text: str, speaker_wav: str = None, language: str = None):
+        descriptor, file_path = tempfile.mkstemp(suffix='.wav')
+        os.close(descriptor)
+        try:
+            self.synthesize_to_file(text, file_path)
+            if os.path.getsize(file_path) == 0:
+                return None
+            return AudioClip.from_wave_file(file_path)
+        finally:
+            os.remove(file_path)
+
+    def synthesize_to_file(self, text: str, file_path: str, speaker_wav: str = None, language: str = None):
+        self.load()
+        self.engine.save_to_file(text, file_path)
+        self.engine.runAndWait()
+
+class CoquiBackend(TTSBackend):
+    """
+    Synthesizes speech with a Coqui TTS neural model.
+
+    Importing TTS pulls in torch and loading a model takes seconds, so this backend is worth warming up in the
+    background.
+    """
+
+    NAME = 'coqui'
+    WARM_UP_IN_BACKGROUND = True
+    PARALLEL = True
+
+    def __init__(self, model_name: str = 'tts_models/es/css10/vits'):
+        """
+        Initializes the CoquiBackend class.
+
+        Args:
+            model_name (str): The name of the TTS model to use.
+        """
+        super().__init__()
+        self.model_name = model_name
+        self.tts = None
+
+    def get_config(self) -> dict:
+        return {'backend': self.NAME, 'voice': self.model_name, 'rate': None}
+
+    def _load(self):
+        from TTS.api import TTS
+        self.tts = TTS(self.model_name)
+
+    def synthesize(self, text: str, speaker_wav: str = None, language: str = None):
+        self.load()
+        if speaker_wav is not None and language is not None:
+            samples = self.tts.tts(text=text, speaker_wav=speaker_wav, language=language, split_sentences=True)
+        else:
+            samples = self.tts.tts(text=text)
+        return AudioClip.from_float_samples(samples, self.tts.synthesizer.output_sample_rate)
+
+class NullBackend(TTSBackend):
+    """
+    Produces no speech, for running the pipeline silently.
+    """
+
+    NAME = 'null'
+    PARALLEL = True
+
+    def _load(self):
+        pass
+
+    def synthesize(self, text: str, speaker_wav: str = None, language: str = None):
+        return None
+
+class FileBackend(TTSBackend):
+    """
+    Speaks texts with pre-recorded clips, `<text>.wav` files in a directory.
+    """
+
+    NAME = 'file'
+    PARALLEL = True
+
+    def __init__(self, directory: str = 'resources/audioResources/clips'):
+        """
+        Initializes the FileBackend class.
+
+        Args:
+            directory (str): The directory holding one `.wav` file per text.
+        """
+        super().__init__()
+        self.directory = directory
+
+    def get_config(self) -> dict:
+        return {'backend': self.NAME, 'voice': os.path.abspath(self.directory), 'rate': None}
+
+    def _load(self):
+        if not os.path.isdir(self.directory):
+            print(f'Warning: the speech clips directory "{self.directory}" does not exist.')
+
+    def synthesize(self, text: str, speaker_wav: str = None, language: str = None):
+        self.load()
+        clip_path = os.path.join(self.directory, f'{text}.wav')
+        if not os.path.exists(clip_path):
+            print(f'Warning: there is no recorded clip for "{text}".')
+            return None
+        return AudioClip.from_wave_file(clip_path)
+
+BACKENDS = {
+    'pyttsx3': Pyttsx3Backend,
+    'coqui': CoquiBackend,
+    'null': NullBackend,
+    'file': FileBackend,
+}
+
+def create_backend(name: str, **options) -> TTSBackend:
+    """
+    Creates a speech backend by name.
+
+    Args:
+        name (str): One of the keys of BACKENDS.
+        **options: Arguments of the backend class.
+
+    Returns:
+        TTSBackend: The backend, not loaded yet.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TTS backend '{name}', expected one of {tuple(BACKENDS)}.")
+    return BACKENDS[name](**options)
+
+class TTSConverter:
+    def __init__(self, backend='pyttsx3', warm_up: bool = True, output_file: str = 'resources/audioResources/audioTracks/audio.wav', **options):
+        """
+        Initialize the converter with a speech backend, without loading it.
+
+        Args:
+            backend (str or TTSBackend): The backend, or the name of one of BACKENDS.
+            warm_up (bool): Whether to load a slow backend in a background thread right away, instead of on first use.
+            output_file (str): The path of the `.wav` file speech is written to.
+            **options: Arguments of the backend class when a name is given, e.g. model_name for 'coqui'.
+        """
+        self.backend = create_backend(backend, **options) if isinstance(backend, str) else backend
+        self.output_file = output_file
+        self.__load_lock = threading.Lock()
+        self.__warm_up_thread = None
+        os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
+
+        if warm_up and self.backend.WARM_UP_IN_BACKGROUND:
+            self.__warm_up_thread = threading.Thread(target=self.__load_backend, name='tts-warm-up', daemon=True)
+            self.__warm_up_thread.start()
+
+    def __load_backend(self):
+        """
+        Loads the backend once, whichever of the warm-up thread and the first conversion gets there first.
+        """
+        with self.__load_lock:
+            try:
+                self.backend.load()
+            except Exception as e:
+                print(f'Error loading the TTS backend: {e}')
+
     def convert_text_to_audio(self, text: str, speaker_wav: str = None, language: str = None):
         """
-        Convert text to audio using the initialized TTS model.
+        Convert text to audio with the backend, imitating the speaker's voice if the backend supports it.
 
         Args:
             text (str): Text to convert to speech.
-            output_file (str): Path to the output audio file (typically ending in `.wav`).
-            speaker_idx (int, optional): The ID of the specific speaker to use for synthesis.
+            speaker_wav (str, optional): A recording of the voice to imitate. Used together with language.
+            language (str, optional): The language of the text.
         """
+        self.__load_backend()
         if speaker_wav is not None and language is not None:
-            self.tts.tts_to_file(text=text, file_path = self.output_file, speaker_wav=self.speaker_wav, language=self.language, split_sentences=True)
+            self.backend.synthesize_to_file(text, self.output_file, speaker_wav=speaker_wav, language=language)
         else:
-            self.tts.tts_to_file(text=text, file_path = self.output_file)
-            
+            self.backend.synthesize_to_file(text, self.output_file)
+
     def convert_text_to_audio_with_engine(self, text: str):
         """
-        Convert text to audio using the initialized pyttsx3 model.
+        Convert text to audio with the backend.
 
         Args:
             text (str): Text to convert to speech.
         """
-        self.engine.save_to_file(text, "resources/audioResources/audioTracks/audio.wav")
-        self.engine.runAndWait()
\ No newline at end of file
+        self.__load_backend()
+        self.backend.synthesize_to_file(text, self.output_file)
+
+    def convert_text_to_clip(self, text: str, speaker_wav: str = None, language: str = None):
+        """
+        Convert text to audio with the backend and return it in memory, without writing any file.
+
+        Args:
+            text (str): Text to convert to speech.
+            speaker_wav (str, optional): A recording of the voice to imitate. Used together with language.
+            language (str, optional): The language of the text.
+
+        Returns:
+            AudioClip or None: The speech, or None if the backend produced none.
+        """
+        self.__load_backend()
+        return self.backend.synthesize(text, speaker_wav, language)
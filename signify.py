@@ -52,39 +52,151 @@ script_dir = os.path.dirname("classes/AbstractGestureFactory.py")
 sys.path.append(os.path.join(script_dir, '..'))
 
 import controllers.bno055_controller
+import controllers.session_recorder
+import controllers.port_discovery
+import controllers.frame_handoff
+from controllers.frame_parser import EULER, GYRO, ACCEL, FLEX, CALIBRATION
 import services.calibration_service
 import services.text_to_speech_service
+import services.synthesis_service
+import services.audio_cache_service
+import services.playback_service
+import services.phrase_service
+import services.metrics_service
+import services.profiling_service
 import services.file_management_service
 import services.gesture_service
 import classes.StaticGesture as StaticGesture
 import services.gesture_mapper_service
 import classes.GestureFactory as GestureFactory
+from classes.FrameRingBuffer import FrameRingBuffer
+from classes.FeatureTransform import FeatureTransform
 
 import time
+import argparse
+import functools
 import threading
 import numpy as np
-from queue import Queue
+from collections import deque
 
 class ApiController:
-    def __init__(self):
+    def __init__(self, poll_timeout: float = 0.1, history_size: int = 256, dynamic_window: int = 2, streaming_dynamic: bool = False, feature_transform: FeatureTransform = None, hot_reload: bool = True, record_path: str = None, replay_path: str = None, replay_speed: float = 1.0, tts=None, file_controller=None, ports: tuple = None, identify_ports: bool = False, binary_frames: bool = False, tts_backend: str = 'pyttsx3', tts_options: dict = None, tts_workers: int = 1, tts_processes: bool = False, audio_cache_size: int = 32 * 1024 * 1024, audio_cache_dir: str = None, playback_policy: str = 'coalesce', phrase_mode: str = None, phrase_pause: float = 1.0, end_gestures=(), calibration_monitor=None, handoff_policy: str = None, handoff_capacity: int = 50, handoff_rate: float = None, max_frame_age: float = None, metrics_port: int = None, metrics_log_interval: float = None, profiler=None):
+        """
+        Initializes the ApiController and all the services of the pipeline.
+
+        Args:
+            poll_timeout (float): Seconds the main loop blocks waiting for a frame before re-checking the stop event.
+            history_size (int): The number of recent frames kept per hand.
+            dynamic_window (int): The number of recent frames per hand a dynamic gesture is recognised from.
+            streaming_dynamic (bool): Whether to keep running statistics over the window and recognise dynamic gestures
+                on every frame, instead of computing them from scratch every `dynamic_window` frames.
+            feature_transform (FeatureTransform, optional): The feature space gestures are matched in, e.g.
+                FeatureTransform.normalized(). Defaults to the raw features.
+            hot_reload (bool): Whether to pick up new signs added to the gestures database without restarting.
+            record_path (str, optional): A file the raw lines read from the gloves are recorded to.
+            replay_path (str, optional): A recorded session to replay instead of reading the gloves. The program stops
+                once the whole session has been processed.
+            replay_speed (float): The replay speed relative to the recording, 0 for as fast as possible.
+            tts (SynthesisService, optional): The speech synthesizer. Defaults to a SynthesisService with `tts_backend`.
+            file_controller (SpeechFileManager, optional): The speech player. Defaults to a new SpeechFileManager.
+            ports (tuple, optional): The serial ports of the left and right gloves. Defaults to discovering the gloves
+                among the USB serial devices.
+            identify_ports (bool): Whether to tell the left glove from the right one with their handshake, so `ports`
+                can be given in any order.
+            binary_frames (bool): Whether to ask the gloves for compact binary frames instead of text lines.
+            tts_backend (str): The speech backend, one of services.text_to_speech_service.BACKENDS. It is loaded by the
+                synthesis workers, so recognition starts without waiting for it.
+            tts_options (dict, optional): Arguments of the speech backend, e.g. {'model_name': ...} for 'coqui'.
+            tts_workers (int): The number of speech synthesis workers, for backends that can synthesize in parallel.
+            tts_processes (bool): Whether the synthesis workers are separate processes, so neural synthesis runs on
+                other cores.
+            audio_cache_size (int): The largest size, in bytes, of the speech kept in memory.
+            audio_cache_dir (str, optional): A directory the speech of each sign is saved to and loaded from on the next start.
+            playback_policy (str): What to do with signs recognized faster than they can be spoken, one of
+                services.playback_service.PlaybackWorker.POLICIES.
+            phrase_mode (str, optional): None to speak every sign on its own, or how to speak the signs of a phrase as
+                one utterance: 'join' the clips of its words, or 'synthesize' the whole phrase in one call.
+            phrase_pause (float): Seconds without a new sign after which a phrase is spoken, in phrase mode.
+            end_gestures (iterable): Names of the gestures that end a phrase, in phrase mode.
+            calibration_monitor (CalibrationMonitor, optional): Decides when the sensors need calibration. Defaults to
+                a CalibrationMonitor with its default thresholds and durations.
+            handoff_policy (str, optional): What to do with frames read faster than they are processed, one of
+                controllers.frame_handoff.FrameHandoff.POLICIES: keep only the 'latest' one for the lowest latency,
+                queue them in a bounded 'fifo' to keep every frame of short bursts, 'decimate' them to
+                `handoff_rate` frames per second, or make the reader wait for the main loop so none is 'lossless'.
+                Defaults to 'lossless' when replaying a session, so every recorded frame is processed, and to 'latest'
+                otherwise.
+            handoff_capacity (int): The largest number of frames waiting for the main loop, with the 'fifo',
+                'decimate' and 'lossless' policies. It must be smaller than `history_size`, as waiting frames live in the frame history.
+            handoff_rate (float, optional): The frames per second processed with the 'decimate' policy.
+            max_frame_age (float, optional): Seconds after which a waiting frame is skipped as stale.
+            metrics_port (int, optional): A local port to serve the metrics of the pipeline on, in the Prometheus text
+                format at `/metrics`.
+            metrics_log_interval (float, optional): Seconds between two structured log lines of the metrics.
+            profiler (PipelineProfiler, optional): A started profiler, told about every processed frame so it can stop
+                after a number of frames.
+
+        Raises:
+            ValueError: If the phrase mode or the handoff policy is unknown, 'decimate' is given no rate, or the
+                handoff capacity does not fit in the frame history.
+        """
         print("Initializing ApiController...")
         self._last_gesture = None
-        self._potential_dynamic_gestures = []
+        self._frame_buffers = {hand: FrameRingBuffer(history_size) for hand in ('left', 'right')}
+        self._dynamic_window = dynamic_window
+        self._frames_since_dynamic = 0
+        self._streamed_counts = {hand: 0 for hand in self._frame_buffers}
         self._last_gesture_time = 0
         self._cooldown_time = 2
-        self._serial_data_queue = Queue(maxsize=50)
+        if handoff_policy is None:
+            handoff_policy = 'lossless' if replay_path else 'latest'
+        if handoff_policy != 'latest' and handoff_capacity >= history_size:
+            raise ValueError(f'The handoff capacity must be smaller than the frame history of {history_size} frames.')
+        self._serial_data_queue = controllers.frame_handoff.FrameHandoff(handoff_policy, handoff_capacity, handoff_rate, max_frame_age)
         self._stop_event = threading.Event()
+        self._poll_timeout = poll_timeout
+        self._processed_frames = 0
+        self._latencies = deque(maxlen=4096)
+        self._profiler = profiler
+        self._metrics = services.metrics_service.MetricsRegistry()
+        self._stage_seconds = {stage: self._metrics.stage(stage) for stage in ('handoff', 'static', 'dynamic', 'frame')}
+        self._recognitions = {kind: self._metrics.counter('signify_recognitions_total', 'Gestures looked up in the database.', kind=kind) for kind in ('static', 'dynamic')}
+        self._recognition_hits = {kind: self._metrics.counter('signify_recognition_hits_total', 'Gestures found in the database.', kind=kind) for kind in ('static', 'dynamic')}
         
-        self._tts = services.text_to_speech_service.TTSConverter("tts_models/es/css10/vits")
-        self._calibration = services.calibration_service.BNO055Calibrator(self._serial_data_queue, self._stop_event)
-        self._file_controller = services.file_management_service.SpeechFileManager()
-        self._gesture_service = services.gesture_service.GestureService()
-        self._gesture_mapper = services.gesture_mapper_service.GestureMapperService()
+        self._tts = tts if tts is not None else services.synthesis_service.SynthesisService(tts_backend, tts_workers, tts_processes, **(tts_options or {}))
+        self._audio_cache = services.audio_cache_service.AudioCache(self._tts, audio_cache_size, directory=audio_cache_dir)
+        self._calibration_monitor = calibration_monitor if calibration_monitor is not None else services.calibration_service.CalibrationMonitor()
+        self._calibration = services.calibration_service.BNO055Calibrator(monitor=self._calibration_monitor)
+        self._low_confidence_gestures = 0
+        self._file_controller = file_controller if file_controller is not None else services.file_management_service.SpeechFileManager()
+        if phrase_mode is None:
+            self._phrases = None
+            self._playback = services.playback_service.PlaybackWorker(self._file_controller, self._audio_cache.get, playback_policy, metrics=self._metrics)
+        elif phrase_mode in ('join', 'synthesize'):
+            render = functools.partial(self._audio_cache.get_phrase, join=phrase_mode == 'join')
+            self._playback = services.playback_service.PlaybackWorker(self._file_controller, render, playback_policy, metrics=self._metrics)
+            self._phrases = services.phrase_service.PhraseAssembler(self._playback.speak, phrase_pause, end_gestures)
+        else:
+            raise ValueError(f"Unknown phrase mode '{phrase_mode}', expected 'join' or 'synthesize'.")
+        self._gesture_service = services.gesture_service.GestureService(feature_transform, hot_reload=hot_reload)
+        self._gesture_mapper = services.gesture_mapper_service.GestureMapperService(dynamic_window if streaming_dynamic else 0)
         self.__factory = GestureFactory.GestureFactory()
+        self._audio_cache.prerender(self._gesture_service.get_gesture_names())
         
-        self._bno_controller = controllers.bno055_controller.SerialPortReader('COM3', 'COM4', self._serial_data_queue, self._stop_event)
-        self._serial_data_thread = threading.Thread(target=self._bno_controller.start, daemon=True)
-
+        self._recorder = controllers.session_recorder.SessionRecorder(record_path) if record_path and not replay_path else None
+        port_left, port_right = ports if ports is not None else (None, None)
+        discovery = controllers.port_discovery.PortDiscovery() if identify_ports else None
+        self._bno_controller = controllers.bno055_controller.SerialPortReader(port_left, port_right, self._serial_data_queue, self._stop_event, frame_buffers=self._frame_buffers, recorder=self._recorder, discovery=discovery, binary=binary_frames, metrics=self._metrics)
+        if replay_path:
+            self._replayer = controllers.session_recorder.SessionReplayer(replay_path, self._bno_controller, self._stop_event, replay_speed)
+            self._serial_data_thread = threading.Thread(target=self._replay_session, name='serial-data', daemon=True)
+        else:
+            self._replayer = None
+            self._serial_data_thread = threading.Thread(target=self._bno_controller.start, name='serial-data', daemon=True)
+
+        self._metrics.add_collector(self.__collect_metrics)
+        self._metrics_server = services.metrics_service.MetricsServer(self._metrics, metrics_port) if metrics_port is not None else None
+        self._metrics_logger = services.metrics_service.MetricsLogger(self._metrics, metrics_log_interval) if metrics_log_interval else None
         
     def _read_serial_ports(self):
         """Function to read data from the serial ports.
@@ -101,21 +213,21 @@ class ApiController:
             print(f"Error starting the BNO controller: {e}")
             self._stop_event.set()
             
-    def _is_calibration_needed(self, calibration_left, calibration_right):
-        """Check if calibration is needed based on the calibration data.
-
-        Args:
-            calibration_left (list): The calibration data for the left side.
-            calibration_right (list): The calibration data for the right side.
-
-        Returns:
-            bool: True if calibration is needed, False otherwise.
+    def _replay_session(self):
+        """
+        Replays the recorded session through the serial reader, then stops the program once the main loop has taken
+        the last frame.
         """
-        return any(value < 2 for value in calibration_left) or any(value < 2 for value in calibration_right)
+        self._replayer.start()
+        while not self._serial_data_queue.empty() and not self._stop_event.is_set():
+            time.sleep(self._poll_timeout)
+        self.stop()
 
     def _process_gesture(self, gesture: str):
         """
-        Process the given gesture, transforming it into an audio track and reproducing it.
+        Process the given gesture, queuing its speech on the playback worker so the loop does not wait for it. In
+        phrase mode the gesture is added to the phrase being collected instead. Gestures recognized while a sensor is
+        being calibrated are flagged as low confidence.
 
         Args:
             gesture (BaseGesture.BaseGesture): The gesture to be processed.
@@ -124,43 +236,53 @@ class ApiController:
             None
         """
         if gesture != self._last_gesture:
-            self._tts.convert_text_to_audio_with_engine(gesture)
+            if self._calibration.is_calibrating:
+                self._low_confidence_gestures += 1
+                print(f"\nRecognized {gesture} with low confidence, the sensors are being calibrated.")
+            if self._phrases is not None:
+                self._phrases.add(gesture)
+            else:
+                self._playback.speak(gesture)
             self._last_gesture = gesture
             self._last_gesture_time = time.time()
-            self._file_controller.play_speech_file()
 
     def _parse_sensor_data(self, data_left, data_right) -> StaticGesture.StaticGesture:
         """
         Parses the sensor data for the left and right hand and creates a StaticGesture object.
 
         Args:
-            data_left (list): The sensor data for the left hand.
-            data_right (list): The sensor data for the right hand.
+            data_left (np.ndarray): The parsed frame row of the left hand.
+            data_right (np.ndarray): The parsed frame row of the right hand.
 
         Returns:
             StaticGesture.StaticGesture: The created StaticGesture object.
 
         """
-        left_hand = StaticGesture.Hand(
-            roll=data_left[0][0],
-            pitch=data_left[0][1],
-            yaw=data_left[0][2],
-            finger_flex=list(map(int, data_left[3])),
-            gyro=data_left[1],
-            accel=data_left[2],
-            calibration=list(map(int, data_left[4]))
-        )
-        right_hand = StaticGesture.Hand(
-            roll=data_right[0][0],
-            pitch=data_right[0][1],
-            yaw=data_right[0][2],
-            finger_flex=list(map(int, data_right[3])),
-            gyro=data_right[1],
-            accel=data_right[2],
-            calibration=list(map(int, data_right[4]))
-        )
+        left_hand = self.__row_to_hand(data_left)
+        right_hand = self.__row_to_hand(data_right)
         return self.__factory.create_static_gesture(left_hand, right_hand)
 
+    def __row_to_hand(self, row) -> StaticGesture.Hand:
+        """
+        Creates a StaticGesture.Hand from a parsed frame row.
+
+        Args:
+            row (np.ndarray): The parsed frame row, laid out as described in controllers.frame_parser.
+
+        Returns:
+            StaticGesture.Hand: The hand described by the row.
+        """
+        roll, pitch, yaw = row[EULER].tolist()
+        return StaticGesture.Hand(
+            roll=roll,
+            pitch=pitch,
+            yaw=yaw,
+            finger_flex=row[FLEX].astype(int).tolist(),
+            gyro=row[GYRO].tolist(),
+            accel=row[ACCEL].tolist(),
+            calibration=row[CALIBRATION].astype(int).tolist()
+        )
+
     def _process_static_gesture(self, static_gesture: StaticGesture.StaticGesture):
         """
         Process a static gesture.
@@ -172,54 +294,98 @@ class ApiController:
             None
         """
         static_gesture = self._gesture_service.recognise_static_gesture(static_gesture)
+        self._recognitions['static'].inc()
         if static_gesture:
+            self._recognition_hits['static'].inc()
             self._process_gesture(static_gesture)
         
-    def __check_hand(self, hand: StaticGesture.Hand):
-        if hand is None:
-            return False
-        gyro_check = np.all(np.array(hand.gyro) > 0.5)
-        accel_check = np.all(np.array(hand.accel) > 0.5)
-        return gyro_check and accel_check
-
-    def __check_gyro_accel(self, gesture: StaticGesture.StaticGesture):
+    def __check_gyro_accel(self, frames) -> bool:
         """
-        Checks if the gesture contains valid data for gyro and accelerometer readings.
+        Checks if any of the frames contains valid data for gyro and accelerometer readings.
 
         Args:
-            gesture (StaticGesture.StaticGesture): The gesture object to check.
+            frames (np.ndarray): The (n, FRAME_WIDTH) frames of one hand.
 
         Returns:
-            bool: True if the gesture contains valid data for gyro or accelerometer readings, False otherwise.
+            bool: True if at least one frame has every gyro and accelerometer value above 0.5, False otherwise.
         """
-        return self.__check_hand(gesture.left_hand) or self.__check_hand(gesture.right_hand)
+        moving = np.all(frames[:, GYRO] > 0.5, axis=1) & np.all(frames[:, ACCEL] > 0.5, axis=1)
+        return bool(np.any(moving))
 
-    def _process_dynamic_gesture(self, static_gesture: StaticGesture.StaticGesture):
+    def _process_dynamic_gesture(self):
         """
-        Process a dynamic gesture by adding it to the list of potential dynamic gestures.
-        If two potential dynamic gestures are detected and at least one of them passes the gyro and accel check,
-        the dynamic gesture is recognized and processed.
-
-        Args:
-            static_gesture: The static gesture to be processed.
+        Process a dynamic gesture every `dynamic_window` frames, reading the latest window of each hand from the frame buffers.
+        If at least one frame of the window passes the gyro and accel check, the dynamic gesture is recognized and processed.
+        In streaming mode the window statistics are updated incrementally and the gesture is checked on every frame instead.
 
         Returns:
             None
         """
-        self._potential_dynamic_gestures.append(static_gesture)
-        if len(self._potential_dynamic_gestures) == 2 and any(self.__check_gyro_accel(gesture) for gesture in self._potential_dynamic_gestures):
-            dynamic_gesture = self._gesture_service.recognise_dynamic_gesture(self._gesture_mapper.static_gesture_to_dynamic_gesture(self._potential_dynamic_gestures))
+        if self._gesture_mapper.stream_window > 0:
+            self.__process_streamed_dynamic_gesture()
+            return
+        
+        self._frames_since_dynamic += 1
+        if self._frames_since_dynamic < self._dynamic_window:
+            return
+        self._frames_since_dynamic = 0
+        
+        left_frames, _ = self._frame_buffers['left'].latest(self._dynamic_window)
+        right_frames, _ = self._frame_buffers['right'].latest(self._dynamic_window)
+        if self.__check_gyro_accel(left_frames) or self.__check_gyro_accel(right_frames):
+            dynamic_gesture = self._gesture_service.recognise_dynamic_gesture(self._gesture_mapper.frames_to_dynamic_gesture(left_frames, right_frames))
+            self._recognitions['dynamic'].inc()
             if dynamic_gesture:
+                self._recognition_hits['dynamic'].inc()
                 self._process_gesture(dynamic_gesture)
-            self._potential_dynamic_gestures.clear()
             
 
+    def __process_streamed_dynamic_gesture(self):
+        """
+        Feeds every frame committed to the frame buffers since the last call into the streaming statistics and, once the
+        windows are full and one of the hands moved within them, recognizes and processes the dynamic gesture.
+
+        Returns:
+            None
+        """
+        for hand, frame_buffer in self._frame_buffers.items():
+            frames, _, self._streamed_counts[hand] = frame_buffer.since(self._streamed_counts[hand])
+            for frame in frames:
+                self._gesture_mapper.update_stream(hand, frame)
+                
+        if self._gesture_mapper.is_stream_ready() and self._gesture_mapper.is_stream_moving():
+            dynamic_gesture = self._gesture_service.recognise_dynamic_gesture(self._gesture_mapper.stream_to_dynamic_gesture())
+            self._recognitions['dynamic'].inc()
+            if dynamic_gesture:
+                self._recognition_hits['dynamic'].inc()
+                self._process_gesture(dynamic_gesture)
+
+    def _next_frame(self):
+        """
+        Waits for the next frame the handoff policy lets through.
+
+        The call blocks for at most `poll_timeout` seconds, so the loop sleeps while the gloves are idle but still
+        notices a stop request. Which frames are dropped when the loop falls behind is up to the handoff policy.
+
+        Returns:
+            tuple or None: The next (data_left, data_right, timestamp) pair, or None if the timeout expired or a stop was requested.
+        """
+        return self._serial_data_queue.get(self._poll_timeout)
+
+    def stop(self):
+        """
+        Requests the main loop and the serial reader to stop, waking the loop if it is waiting for a frame.
+        """
+        self._stop_event.set()
+        self._serial_data_queue.close()
+
     def run(self):
         """Main loop to read and process serial data.
 
         This method is responsible for reading and processing serial data from the connected device.
-        It continuously checks for data in the serial data queue and performs the necessary operations
-        based on the received data. It also handles calibration and processing of static and dynamic gestures.
+        It blocks on the serial data queue until a frame arrives and performs the necessary operations
+        based on the received data. It also tracks the calibration of the sensors, without pausing recognition, and processes
+        static and dynamic gestures.
 
         Raises:
             KeyboardInterrupt: If the program is interrupted by the user.
@@ -228,36 +394,130 @@ class ApiController:
             self._read_serial_ports()
             while not self._stop_event.is_set():
                 try:
-                    if not self._serial_data_queue.empty():
-                        data_left, data_right = self._serial_data_queue.get()
-                        static_gesture = self._parse_sensor_data(data_left, data_right)
-                        
-                        if self._is_calibration_needed(static_gesture.left_hand.calibration, static_gesture.right_hand.calibration):
-                            print("Calibration needed...")
-                            self._calibration.calibrate()
-                            
-                        else:
-                            self._process_static_gesture(static_gesture)
-                            self._process_dynamic_gesture(static_gesture)
-                            
-                        with self._serial_data_queue.mutex: self._serial_data_queue.queue.clear()
+                    frame = self._next_frame()
+                    if self._phrases is not None:
+                        self._phrases.poll()
+                    if frame is None:
+                        continue
+                    
+                    data_left, data_right, frame_time = frame
+                    self._stage_seconds['handoff'].observe(time.monotonic() - frame_time)
+                    static_gesture = self._parse_sensor_data(data_left, data_right)
+                    
+                    calibration_left, calibration_right = static_gesture.left_hand.calibration, static_gesture.right_hand.calibration
+                    self._calibration.observe(calibration_left, calibration_right, frame_time)  # Announces the sensors that need calibration
+                    
+                    started = time.perf_counter()
+                    self._process_static_gesture(static_gesture)
+                    recognised = time.perf_counter()
+                    self._process_dynamic_gesture()
+                    self._stage_seconds['static'].observe(recognised - started)
+                    self._stage_seconds['dynamic'].observe(time.perf_counter() - recognised)
+                    
+                    self._processed_frames += 1
+                    latency = time.monotonic() - frame_time
+                    self._latencies.append(latency)
+                    self._stage_seconds['frame'].observe(latency)
+                    if self._profiler is not None:
+                        self._profiler.on_frame()
             
                 except Exception as e:
                     print (f"Error processing gesture: {e}")
                     
-        except Exception as e:
-            self._serial_data_queue.get()  # Remove the invalid data 
         except KeyboardInterrupt:
             print("Stopping...")
-            self._stop_event.set()  # Signal the thread to stop
-            with self._serial_data_queue.mutex: self._serial_data_queue.queue.clear()
             
         finally:
+            self.stop()  # Signal the serial reader thread to stop
             self._bno_controller.stop()
-            self._serial_data_thread.join()  # Wait for the thread to finish
-            print("\n\nProgram terminated.")
+            self._gesture_service.close()
+            self._playback.close()
+            self._audio_cache.close()
+            self._tts.close()
+            if self._metrics_logger is not None:
+                self._metrics_logger.close()
+            if self._metrics_server is not None:
+                self._metrics_server.close()
+            if self._serial_data_thread.is_alive():
+                self._serial_data_thread.join()  # Wait for the thread to finish
+            if self._recorder is not None:
+                self._recorder.close()
+            handoff = self._serial_data_queue.get_statistics()
+            print(f"\n\nProgram terminated. Of {handoff['offered']} frames read, {handoff['dropped']} were dropped, "
+                  f"{handoff['decimated']} decimated and {handoff['stale']} skipped as stale.")
+            if self._calibration_monitor.episodes:
+                print(f"The sensors needed calibration {self._calibration_monitor.episodes} times, {self._low_confidence_gestures} gestures were recognized meanwhile.")
+            self.__print_throughput()
+
+    def __collect_metrics(self):
+        """
+        Reports the counters of the hand-off, the audio cache and the calibration as metrics samples, see
+        MetricsRegistry.add_collector.
+        """
+        for outcome, value in self._serial_data_queue.get_statistics().items():
+            yield 'signify_handoff_frames_total', 'counter', 'Frame pairs offered to the main loop, by outcome.', {'outcome': outcome}, value
+        yield 'signify_processed_frames_total', 'counter', 'Frame pairs processed by the main loop.', {}, self._processed_frames
+        cache = self._audio_cache.get_statistics()
+        for event in ('hits', 'misses', 'rendered', 'loaded', 'evicted'):
+            yield 'signify_audio_cache_total', 'counter', 'Audio cache lookups and changes, by event.', {'event': event}, cache[event]
+        yield 'signify_audio_cache_bytes', 'gauge', 'Bytes of speech held in the audio cache.', {}, cache['bytes']
+        yield 'signify_calibration_episodes_total', 'counter', 'Times the sensors needed calibration.', {}, self._calibration_monitor.episodes
+        yield 'signify_low_confidence_gestures_total', 'counter', 'Gestures recognized while a sensor was being calibrated.', {}, self._low_confidence_gestures
+
+    def __print_throughput(self):
+        """
+        Prints the number of frames processed and the latency from reading a frame to finishing its processing.
+        """
+        if not self._latencies:
+            return
+        latencies = np.array(self._latencies) * 1000.0
+        elapsed = self._replayer.elapsed if self._replayer is not None else None
+        rate = f" ({self._processed_frames / elapsed:.0f} frames/s)" if elapsed else ""
+        print(f"{self._processed_frames} frames processed{rate}. Latency: median {np.median(latencies):.2f} ms, "
+              f"p99 {np.percentile(latencies, 99):.2f} ms, max {latencies.max():.2f} ms.")
             
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Translates sign language read from the Signify gloves into speech.')
+    parser.add_argument('--ports', nargs=2, metavar=('LEFT', 'RIGHT'), help='serial ports of the left and right gloves (default: discover them among the USB serial devices)')
+    parser.add_argument('--binary', action='store_true', help='ask the gloves for compact binary frames with sequence numbers and CRCs instead of text lines')
+    parser.add_argument('--identify', action='store_true', help='tell the left glove from the right one by their handshake, so --ports can be given in any order')
+    parser.add_argument('--record', metavar='FILE', help='record the raw data of the gloves to FILE')
+    parser.add_argument('--replay', metavar='FILE', help='replay a recorded session instead of reading the gloves')
+    parser.add_argument('--speed', type=float, default=1.0, help='replay speed, e.g. 1 for real time, 10 for ten times faster, 0 for as fast as possible')
+    parser.add_argument('--tts', choices=sorted(services.text_to_speech_service.BACKENDS), default='pyttsx3', help='speech backend (default: pyttsx3)')
+    parser.add_argument('--tts-model', default='tts_models/es/css10/vits', help="model of the 'coqui' backend")
+    parser.add_argument('--tts-workers', type=int, default=1, help="number of speech synthesis workers, for the 'coqui', 'file' and 'null' backends (default: 1)")
+    parser.add_argument('--tts-processes', action='store_true', help='run the speech synthesis workers as separate processes')
+    parser.add_argument('--audio-cache', metavar='DIR', help='save the speech of each sign to DIR and reuse it on the next start')
+    parser.add_argument('--playback', choices=services.playback_service.PlaybackWorker.POLICIES, default='coalesce', help='what to do with signs recognized faster than they are spoken (default: coalesce)')
+    parser.add_argument('--phrases', choices=('join', 'synthesize'), help='speak the signs of a phrase as one utterance, joining the clips of its words or synthesizing it in one call')
+    parser.add_argument('--phrase-pause', type=float, default=1.0, help='seconds without a new sign that end a phrase (default: 1.0)')
+    parser.add_argument('--end-gesture', action='append', default=[], metavar='NAME', help='gesture that ends a phrase, can be repeated')
+    parser.add_argument('--handoff', choices=controllers.frame_handoff.FrameHandoff.POLICIES, help='what to do with frames read faster than they are processed: keep the latest, queue them in order, decimate them, or make the replay wait so none is lost (default: lossless with --replay, latest otherwise)')
+    parser.add_argument('--handoff-capacity', type=int, default=50, help="frames waiting to be processed with the 'fifo', 'decimate' and 'lossless' policies (default: 50)")
+    parser.add_argument('--handoff-rate', type=float, metavar='HZ', help="frames per second processed with the 'decimate' policy")
+    parser.add_argument('--max-frame-age', type=float, metavar='S', help='skip frames that waited longer than S seconds to be processed')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT', help='serve the pipeline metrics for Prometheus on http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--metrics-log', type=float, metavar='S', help='print the pipeline metrics as a JSON line every S seconds')
+    parser.add_argument('--profile', choices=services.profiling_service.PipelineProfiler.MODES, help='profile every thread with a sampling profiler or cProfile, one file per thread')
+    parser.add_argument('--tracemalloc', action='store_true', help='track memory allocations while profiling')
+    parser.add_argument('--profile-dir', default='profiles', metavar='DIR', help='directory the profiles are written to (default: profiles)')
+    parser.add_argument('--profile-seconds', type=float, metavar='S', help='stop profiling after S seconds')
+    parser.add_argument('--profile-frames', type=int, metavar='N', help='stop profiling after N processed frames')
+    parser.add_argument('--clips', default='resources/audioResources/clips', help="directory of <sign>.wav clips of the 'file' backend")
+    args = parser.parse_args()
     
-    processor = ApiController()
+    profiler = None
+    if args.profile or args.tracemalloc:
+        profiler = services.profiling_service.PipelineProfiler(args.profile_dir, args.profile, args.tracemalloc, args.profile_seconds, args.profile_frames)
+        profiler.start()  # Before the pipeline, so the threads it starts are profiled too
+    tts_options = {'coqui': {'model_name': args.tts_model}, 'file': {'directory': args.clips}}.get(args.tts, {})
+    processor = ApiController(record_path=args.record, replay_path=args.replay, replay_speed=args.speed, ports=args.ports, identify_ports=args.identify, binary_frames=args.binary,
+                              tts_backend=args.tts, tts_options=tts_options, tts_workers=args.tts_workers, tts_processes=args.tts_processes,
+                              audio_cache_dir=args.audio_cache, playback_policy=args.playback,
+                              phrase_mode=args.phrases, phrase_pause=args.phrase_pause, end_gestures=args.end_gesture,
+                              handoff_policy=args.handoff, handoff_capacity=args.handoff_capacity, handoff_rate=args.handoff_rate, max_frame_age=args.max_frame_age,
+                              metrics_port=args.metrics_port, metrics_log_interval=args.metrics_log, profiler=profiler)
     processor.run()
+    if profiler is not None:
+        profiler.stop()